@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CRM.settings')
+# Dùng các view async (login, register, ...) khi chạy dưới ASGI
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'CRM.urls_async')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARM_UP:
+    from CRM.warmup import warm_up  # noqa: E402
+
+    warm_up()
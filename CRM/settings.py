@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'base.middleware.MetricsMiddleware',
+    'base.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,9 +61,11 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'base.middleware.ReplicaRoutingMiddleware',
 ]
 
-ROOT_URLCONF = 'CRM.urls'
+# CRM/asgi.py đặt DJANGO_ROOT_URLCONF=CRM.urls_async để dùng các view async
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'CRM.urls')
 
 TEMPLATES = [
     {
@@ -85,11 +89,115 @@ WSGI_APPLICATION = 'CRM.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE=sqlite (mặc định) hoặc postgresql
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'crm'),
+            'USER': os.environ.get('POSTGRES_USER', 'crm'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Kiểm tra kết nối trước khi pool đưa ra dùng lại
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Pool kết nối của psycopg 3 (Django 5.1+), thay cho CONN_MAX_AGE
+                'pool': {
+                    'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 10)),
+                    'timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', 10)),
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Số giây chờ khi database đang bị khóa trước khi báo "database is locked"
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                # Lấy write lock ngay khi BEGIN để transaction đọc-rồi-ghi không bị
+                # lỗi khóa giữa chừng khi có nhiều writer
+                'transaction_mode': 'IMMEDIATE',
+                # WAL: reader không chặn writer; synchronous=NORMAL an toàn với WAL
+                'init_command': ';'.join([
+                    'PRAGMA journal_mode=WAL',
+                    'PRAGMA synchronous=NORMAL',
+                    f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 134217728))}",
+                    # Số âm: đơn vị KiB
+                    f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))}",
+                    'PRAGMA temp_store=MEMORY',
+                ]),
+            },
+        }
+    }
+
+
+# Read replica: DATABASE_REPLICAS là danh sách (phân cách bằng dấu phẩy) đường dẫn file SQLite
+# hoặc host PostgreSQL của các replica. Request GET/HEAD đọc từ replica (base.routers.ReplicaRouter),
+# client vừa ghi dữ liệu được giữ ở database chính trong REPLICA_PIN_SECONDS giây (pin có chữ ký,
+# gửi lại qua cookie db_pin_primary hoặc header X-DB-Pin).
+DATABASE_REPLICAS = [replica.strip() for replica in os.environ.get('DATABASE_REPLICAS', '').split(',') if replica.strip()]
+for index, replica in enumerate(DATABASE_REPLICAS, start=1):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        ('HOST' if DATABASE_ENGINE == 'postgresql' else 'NAME'): replica,
+        # Khi chạy test, replica dùng chung database test với default
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['base.routers.ReplicaRouter'] if DATABASE_REPLICAS else []
+# round_robin hoặc least_latency (đo bằng SELECT 1 mỗi REPLICA_LATENCY_CHECK_INTERVAL giây)
+REPLICA_STRATEGY = os.environ.get('REPLICA_STRATEGY', 'round_robin')
+REPLICA_LATENCY_CHECK_INTERVAL = int(os.environ.get('REPLICA_LATENCY_CHECK_INTERVAL', 10))
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+# Cache
+# Cache 'catalog' lưu response của API sản phẩm. LocMemCache là LRU theo từng process; version
+# của catalog nằm trong database (base.models.TableVersion) nên thay đổi từ worker khác làm
+# entry cũ hết hiệu lực ngay, không cần backend dùng chung.
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 1000))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Bản sao version token của từng user (JWT_STATELESS_AUTH, bảng base_tokenversion).
+    # Token bị thu hồi ở worker khác vẫn được chấp nhận tối đa TOKEN_VERSION_CACHE_SECONDS giây
+    'token_versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'token_versions',
+        'TIMEOUT': int(os.environ.get('TOKEN_VERSION_CACHE_SECONDS', 30)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TOKEN_VERSION_CACHE_MAX_ENTRIES', 100000)),
+        },
+    },
+    # Các lần xác thực Basic Auth thành công (key là HMAC, không lưu mật khẩu)
+    'credentials': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'credentials',
+        'TIMEOUT': int(os.environ.get('BASIC_AUTH_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('BASIC_AUTH_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': int(os.environ.get('CATALOG_CACHE_TIMEOUT', 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': CATALOG_CACHE_MAX_ENTRIES,
+            # Mỗi lần đầy chỉ evict 1 entry ít dùng nhất (LRU)
+            'CULL_FREQUENCY': CATALOG_CACHE_MAX_ENTRIES,
+        },
+    },
 }
 
 
@@ -139,8 +247,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'base.authentication.ClaimsJWTAuthentication',
+        'base.authentication.CachedBasicAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated', 
@@ -148,7 +256,61 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# JWT_STATELESS_AUTH=True: user được dựng từ claim trong access token (is_staff, role,
+# customer_id, employee_id) thay vì query auth_user mỗi request. Token bị thu hồi qua
+# claim token_version, nên access token nên có thời hạn ngắn.
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH', 'False') == 'True'
+
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 5 if JWT_STATELESS_AUTH else 60))
+    ),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+    'TOKEN_OBTAIN_SERIALIZER': 'account.serializers.ClaimsTokenObtainPairSerializer',
+}
+
+# Keyset pagination cho các API danh sách
+
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+# Số dòng đọc từ database mỗi lần khi trả danh sách dạng stream (?stream=1)
+API_STREAM_CHUNK_SIZE = int(os.environ.get('API_STREAM_CHUNK_SIZE', 2000))
+
+# Giới hạn cho API /api/products/bulk/
+API_BULK_MAX_ITEMS = int(os.environ.get('API_BULK_MAX_ITEMS', 10000))
+API_BULK_BATCH_SIZE = int(os.environ.get('API_BULK_BATCH_SIZE', 500))
+
+# Số ngày giữ Tombstone (id đã bị xóa) cho đồng bộ theo ?updated_since=; updated_since cũ hơn
+# bị từ chối và client phải đồng bộ lại toàn bộ. Xóa Tombstone cũ: python manage.py purge_tombstones
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', 30))
+
+# Giới hạn cho API /api/batch/: số request con tối đa, số thread khi chạy song song (parallel)
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+
+# Pool băm mật khẩu cho login/register async (ASGI). 0 = theo số CPU / 4 lần số worker.
+AUTH_HASH_POOL_WORKERS = int(os.environ.get('AUTH_HASH_POOL_WORKERS', 0))
+AUTH_HASH_POOL_MAX_PENDING = int(os.environ.get('AUTH_HASH_POOL_MAX_PENDING', 0))
+
+# Số liệu của /api/metrics. METRICS_DIR: thư mục dùng chung để cộng số liệu của nhiều worker
+# (mỗi worker ghi metrics-<pid>.json, tối đa mỗi METRICS_FLUSH_INTERVAL giây); xóa thư mục khi deploy lại.
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+
+# Số query tối đa của view (max_queries trên APIView / ModelAdmin): vượt quá thì test fail
+# (QUERY_BUDGET_STRICT, bật bởi TEST_RUNNER) hoặc ghi log cảnh báo cho một phần các request
+TEST_RUNNER = 'base.test_runner.QueryBudgetTestRunner'
+QUERY_BUDGET_STRICT = False
+QUERY_BUDGET_LOG_SAMPLE_RATE = float(os.environ.get('QUERY_BUDGET_LOG_SAMPLE_RATE', 0.1))
+
+# Schema OpenAPI dựng sẵn (python manage.py build_schema), sinh lại khi mã nguồn đổi.
+# CODE_VERSION: phiên bản mã nguồn (ví dụ git commit lúc deploy); để trống thì hash mã nguồn
+CODE_VERSION = os.environ.get('CODE_VERSION', '')
+SCHEMA_DIR = os.environ.get('SCHEMA_DIR', BASE_DIR / '.schema')
+# max-age của /api/schema/ khi không có tham số phiên bản v
+SCHEMA_CACHE_SECONDS = int(os.environ.get('SCHEMA_CACHE_SECONDS', 3600))
+
+# Chuẩn bị worker khi nạp CRM/wsgi.py, CRM/asgi.py (CRM/warmup.py); dùng gunicorn --preload
+# để chạy một lần trước khi fork
+WARM_UP = os.environ.get('WARM_UP', 'True') == 'True'
@@ -1,7 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView,SpectacularRedocView
+from drf_spectacular.views import SpectacularSwaggerView,SpectacularRedocView
+from base.schema import code_version
+from base.views import SchemaView
+
+# Swagger UI/ReDoc tải schema qua URL có phiên bản để trình duyệt cache vĩnh viễn
+SCHEMA_URL = f"/api/schema/?v={code_version()}"
 
 
 urlpatterns = [
@@ -11,10 +16,11 @@ urlpatterns = [
     path('api/', include('taskboard.urls')),
     path('api/', include('customer.urls')),
     path("api/", include("employee.urls")),
+    path('api/', include('base.urls')),
     
-    path("api/schema/",SpectacularAPIView.as_view(),name="schema"),
-    path("",SpectacularSwaggerView.as_view(url_name="schema")),
-    path("redoc/",SpectacularRedocView.as_view(url_name="schema")),
+    path("api/schema/",SchemaView.as_view(),name="schema"),
+    path("",SpectacularSwaggerView.as_view(url=SCHEMA_URL)),
+    path("redoc/",SpectacularRedocView.as_view(url=SCHEMA_URL)),
 ]
 
 urlpatterns += [
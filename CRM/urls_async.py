@@ -0,0 +1,24 @@
+"""
+URLconf cho ASGI (CRM/asgi.py): giống CRM.urls nhưng các endpoint có bản async
+được khai báo trước nên được ưu tiên.
+"""
+from django.urls import path
+from account.async_views import alogin, aregister
+from product.async_views import AsyncProductListView, AsyncProductDetailView
+from taskboard.async_views import AsyncTaskListView, AsyncTaskDetailView
+from customer.async_views import AsyncCustomerListView, AsyncCustomerDetailView
+from employee.async_views import AsyncEmployeeListView, AsyncEmployeeDetailView
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/register/<str:role>/', aregister, name='register'),
+    path('api/login/', alogin, name='login'),
+    path('api/products/', AsyncProductListView.as_view(), name='product-list'),
+    path('api/products/<int:pk>/', AsyncProductDetailView.as_view(), name='product-detail'),
+    path('api/tasks/', AsyncTaskListView.as_view(), name='task-list'),
+    path('api/tasks/<int:pk>/', AsyncTaskDetailView.as_view(), name='task-detail'),
+    path('api/customers/', AsyncCustomerListView.as_view(), name='customer-list'),
+    path('api/customers/<int:pk>/', AsyncCustomerDetailView.as_view(), name='customer-detail'),
+    path('api/employees/', AsyncEmployeeListView.as_view(), name='employee-list'),
+    path('api/employees/<int:pk>/', AsyncEmployeeDetailView.as_view(), name='employee-detail'),
+] + sync_urlpatterns
@@ -0,0 +1,142 @@
+"""
+Chuẩn bị worker trước khi nhận request: import các module, dựng URL resolver, field của
+serializer, template, schema OpenAPI và khởi tạo backend database. Gọi từ CRM/wsgi.py và CRM/asgi.py
+(WARM_UP); khi chạy gunicorn --preload, phần việc này được làm một lần trong process master
+trước khi fork và các worker dùng chung bộ nhớ đã dựng.
+"""
+import logging
+import time
+from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+# Template được biên dịch sẵn (cached loader): trang admin, Swagger UI, ReDoc
+TEMPLATES = (
+    'admin/login.html', 'admin/index.html', 'admin/change_list.html', 'admin/change_form.html',
+    'drf_spectacular/swagger_ui.html', 'drf_spectacular/redoc.html',
+)
+
+# Module của mỗi app được import sẵn (nếu có)
+APP_MODULES = ('models', 'admin', 'serializers', 'views', 'async_views', 'urls', 'signals', 'permissions')
+
+
+def warm_up():
+    """
+    Chạy các bước chuẩn bị, trả về thời gian (giây) của từng bước.
+    """
+    timings = {}
+    for name, step in (
+        ('imports', _import_modules),
+        ('urls', _resolve_urls),
+        ('serializers', _build_serializers),
+        ('templates', _compile_templates),
+        ('schema', _load_schema),
+        ('database', _prime_databases),
+    ):
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    logger.info(
+        "Warm-up done in %.3fs (%s)",
+        sum(timings.values()),
+        ', '.join(f'{name} {seconds:.3f}s' for name, seconds in timings.items())
+    )
+    return timings
+
+
+def _project_apps():
+    base_dir = Path(settings.BASE_DIR).resolve()
+    return [config for config in apps.get_app_configs() if Path(config.path).resolve().is_relative_to(base_dir)]
+
+
+def _import_modules():
+    for config in _project_apps():
+        for name in APP_MODULES:
+            module = f'{config.name}.{name}'
+            if find_spec(module) is not None:
+                import_module(module)
+    # Các lớp trong cấu hình DRF/simplejwt được import ở request đầu tiên nếu không gọi trước
+    for setting in (
+        'DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_RENDERER_CLASSES',
+        'DEFAULT_PARSER_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS', 'DEFAULT_SCHEMA_CLASS',
+    ):
+        getattr(api_settings, setting)
+    import_module('rest_framework_simplejwt.state')
+    get_hashers()
+
+
+def _resolve_urls():
+    """
+    Dựng resolver của mọi urlconf (regex, bảng reverse) và import view của mọi route.
+    """
+    urlconfs = {settings.ROOT_URLCONF, 'CRM.urls', 'CRM.urls_async'}
+    for urlconf in urlconfs:
+        resolver = get_resolver(urlconf)
+        resolver.reverse_dict
+        _walk(resolver)
+
+
+def _walk(resolver):
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            pattern.reverse_dict
+            _walk(pattern)
+        elif isinstance(pattern, URLPattern):
+            pattern.callback
+
+
+def _build_serializers():
+    """
+    Dựng field của mọi serializer trong project và projection (values()) của các
+    serializer dùng cho danh sách.
+    """
+    from base.serializers import DynamicFieldsMixin, projection_for
+
+    modules = tuple(f'{config.name}.' for config in _project_apps())
+    pending = [serializers.BaseSerializer]
+    while pending:
+        serializer_class = pending.pop()
+        pending.extend(serializer_class.__subclasses__())
+        if not serializer_class.__module__.startswith(modules):
+            continue
+        serializer_class().fields
+        if issubclass(serializer_class, DynamicFieldsMixin):
+            projection_for(serializer_class)
+
+
+def _compile_templates():
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def _load_schema():
+    from base.schema import get_schema, FORMATS
+
+    for fmt in FORMATS:
+        get_schema(fmt)
+
+
+def _prime_databases():
+    """
+    Mở kết nối tới từng database (import driver, đọc version/feature của backend) rồi đóng
+    lại: kết nối và pool không được dùng chung giữa các process sau khi fork.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.features.can_return_rows_from_bulk_insert
+        connection.close()
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool is not None:
+            close_pool()
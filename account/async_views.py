@@ -0,0 +1,125 @@
+import json
+
+from django.contrib.auth import authenticate
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+
+from base.models import Customer, Employee
+from .pool import PoolOverloaded, get_password_pool
+from .serializers import UserSerializer, ClaimsTokenObtainPairSerializer
+
+# Các field được phép khi tạo profile theo từng role
+PROFILE_FIELDS = {
+    'customer': (Customer, ['phone', 'address', 'is_active']),
+    'employee': (Employee, ['phone', 'address', 'is_active', 'position']),
+}
+
+
+def _busy_response():
+    response = JsonResponse(
+        {"error": "Server is busy, please retry", "status": status.HTTP_503_SERVICE_UNAVAILABLE},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def _parse_json(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _login(username, password):
+    user = authenticate(username=username, password=password)
+    if user is None:
+        return None
+    refresh = ClaimsTokenObtainPairSerializer.get_token(user)
+    return {
+        "message": "Login successful",
+        "user": {
+            "username": user.username,
+            "email": user.email
+        },
+        "tokens": {
+            "refresh": str(refresh),
+            "access": str(refresh.access_token)
+        },
+        "status": status.HTTP_200_OK
+    }
+
+
+def _register(role, data):
+    user_serializer = UserSerializer(data=data.get('user', {}))
+    if not user_serializer.is_valid():
+        return {"error": user_serializer.errors, "status": status.HTTP_400_BAD_REQUEST}
+
+    model, fields = PROFILE_FIELDS[role]
+    with transaction.atomic():
+        user = user_serializer.save()
+        profile = model.objects.create(user=user, **{field: data[field] for field in fields if field in data})
+    return {
+        "message": "User created",
+        "user": user_serializer.data,
+        "profile": {
+            "phone": profile.phone,
+            "address": profile.address,
+            "is_active": profile.is_active
+        },
+        "status": status.HTTP_201_CREATED
+    }
+
+
+@csrf_exempt
+@require_POST
+async def alogin(request):
+    """
+    Bản async của account.views.login cho ASGI: authenticate() (băm mật khẩu) chạy trong
+    pool giới hạn, trả 503 khi pool quá tải thay vì chặn event loop.
+    """
+    data = _parse_json(request)
+    if data is None:
+        return JsonResponse(
+            {"error": "Invalid JSON body", "status": status.HTTP_400_BAD_REQUEST},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        payload = await get_password_pool().run(_login, data.get('username'), data.get('password'))
+    except PoolOverloaded:
+        return _busy_response()
+    if payload is None:
+        return JsonResponse(
+            {"error": "Invalid credentials", "status": status.HTTP_401_UNAUTHORIZED},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    return JsonResponse(payload, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@require_POST
+async def aregister(request, role):
+    """
+    Bản async của account.views.register cho ASGI: tạo user (băm mật khẩu) và profile
+    trong pool giới hạn, trả 503 khi pool quá tải.
+    """
+    if role not in PROFILE_FIELDS:
+        return JsonResponse(
+            {"error": "Invalid role", "status": status.HTTP_400_BAD_REQUEST},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    data = _parse_json(request)
+    if data is None:
+        return JsonResponse(
+            {"error": "Invalid JSON body", "status": status.HTTP_400_BAD_REQUEST},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        payload = await get_password_pool().run(_register, role, data)
+    except PoolOverloaded:
+        return _busy_response()
+    return JsonResponse(payload, status=payload['status'])
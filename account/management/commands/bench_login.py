@@ -0,0 +1,74 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+
+USERNAME = 'bench_login_user'
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = "Đo số lần đăng nhập/giây (và trên mỗi core) của view login sync và view async (CRM.urls_async)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Số request login mỗi lần đo")
+        parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 1, help="Số request chạy đồng thời")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        cores = os.cpu_count() or 1
+
+        # Đo trên database test để không đụng dữ liệu thật
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            User.objects.create_user(username=USERNAME, password=PASSWORD)
+            body = {'username': USERNAME, 'password': PASSWORD}
+
+            results = [
+                ('sync', self._bench_sync(total, concurrency, body)),
+                ('async', self._bench_async(total, concurrency, body)),
+            ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"{total} logins, concurrency {concurrency}, {cores} cores")
+        for name, (elapsed, failed) in results:
+            rate = total / elapsed
+            self.stdout.write(
+                f"{name:>5}: {rate:8.1f} logins/s  {rate / cores:7.1f} logins/s/core  "
+                f"{elapsed:6.2f}s  {failed} failed"
+            )
+
+    def _bench_sync(self, total, concurrency, body):
+        def login(_):
+            response = Client().post('/api/login/', body, content_type='application/json')
+            return response.status_code == 200
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            ok = sum(executor.map(login, range(total)))
+        return time.perf_counter() - started, total - ok
+
+    def _bench_async(self, total, concurrency, body):
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def login():
+                async with semaphore:
+                    response = await client.post('/api/login/', body, content_type='application/json')
+                    return response.status_code == 200
+
+            return sum(await asyncio.gather(*(login() for _ in range(total))))
+
+        with override_settings(ROOT_URLCONF='CRM.urls_async'):
+            started = time.perf_counter()
+            ok = asyncio.run(run())
+            return time.perf_counter() - started, total - ok
@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class PoolOverloaded(Exception):
+    pass
+
+
+class BoundedPool:
+    """
+    Thread pool có giới hạn số việc đang chờ: khi đã có `max_pending` việc (đang chạy
+    hoặc đang xếp hàng) thì từ chối ngay bằng PoolOverloaded thay vì để hàng đợi dài vô hạn.
+
+    Dùng cho việc băm mật khẩu (PBKDF2): hashlib nhả GIL khi băm nên các thread chạy song song
+    trên nhiều core, còn event loop của ASGI không bị chặn.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='auth-hash')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    async def run(self, func, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolOverloaded()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Chạy trong context của request (contextvars, ví dụ định tuyến database của base.routers)
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(context.run, _call, func, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+def _call(func, *args, **kwargs):
+    # Thread của pool không đi qua request_started/request_finished nên tự đóng kết nối DB
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+_password_pool = None
+_password_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            workers = settings.AUTH_HASH_POOL_WORKERS or os.cpu_count() or 1
+            max_pending = settings.AUTH_HASH_POOL_MAX_PENDING or workers * 4
+            _password_pool = BoundedPool(workers, max_pending)
+    return _password_pool
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from base.models import Customer, Employee, Product, Task
+from base.authentication import add_user_claims
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 # Serializer cho User
 class UserSerializer(serializers.ModelSerializer):
@@ -15,4 +17,11 @@ class UserSerializer(serializers.ModelSerializer):
             email=validated_data['email'],
             password=validated_data['password']
         )
-        return user
\ No newline at end of file
+        return user
+
+
+# Serializer cấp token kèm claim của user (dùng cho /api/token/ và /api/login/)
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
@@ -1,3 +1,232 @@
-from django.test import TestCase
+import base64
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from base.authentication import _token_version_key
+from base.models import Employee, TokenVersion
+from base.testing import PASSWORD, basic, create_user
+from .pool import BoundedPool, get_password_pool
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class TokenRevocationTests(TestCase):
+    url = '/api/customers/'
+
+    def setUp(self):
+        caches['token_versions'].clear()
+        self.admin = create_user('admin', 'admin')
+
+    def login(self, username='admin'):
+        response = self.client.post('/api/login/', {'username': username, 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        return {'HTTP_AUTHORIZATION': f"Bearer {response.json()['tokens']['access']}"}
+
+    def get(self, headers):
+        return self.client.get(self.url, **headers)
+
+    def other_worker_bumps(self):
+        # Worker khác thu hồi token: chỉ database thay đổi, cache của process này giữ version cũ
+        TokenVersion.objects.filter(user=self.admin).update(version=F('version') + 1)
+
+    def assertRevoked(self, response):
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['detail'], "Token has been revoked")
+
+    def test_password_change_revokes_tokens(self):
+        headers = self.login()
+        self.assertEqual(self.get(headers).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.set_password('new-password-456')
+            self.admin.save()
+        self.assertRevoked(self.get(headers))
+
+    def test_profile_change_revokes_tokens_of_unseen_user(self):
+        # Worker chưa từng xác thực user này (không có gì trong cache)
+        headers = self.login()
+        caches['token_versions'].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Employee.objects.create(user=self.admin)
+        self.assertRevoked(self.get(headers))
+
+    def test_own_profile_edit_keeps_token(self):
+        # Sửa phone, address, position không thay đổi claim nào của token
+        for role, body in (('customer', {'phone': '0900000000'}), ('employee', {'position': 'Tester'})):
+            with self.subTest(role=role):
+                user = create_user(role, role)
+                profile = getattr(user, f'{role}_profile')
+                headers = self.login(role)
+                url = f'/api/{role}s/{profile.pk}/'
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.put(url, body, content_type='application/json', **headers)
+                self.assertEqual(response.status_code, 200)
+                response = self.client.get(url, **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['data'][next(iter(body))], next(iter(body.values())))
+
+    def test_profile_delete_revokes_tokens(self):
+        profile = Employee.objects.create(user=self.admin)
+        headers = self.login()
+        self.assertEqual(self.get(headers).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.delete()
+        self.assertRevoked(self.get(headers))
+
+    def test_cache_miss_checks_database(self):
+        headers = self.login()
+        self.other_worker_bumps()
+        caches['token_versions'].delete(_token_version_key(self.admin.pk))
+        self.assertRevoked(self.get(headers))
+
+    def test_login_after_revocation_on_another_worker(self):
+        old_headers = self.login()
+        self.assertEqual(self.get(old_headers).status_code, 200)
+        cached = caches['token_versions'].get(_token_version_key(self.admin.pk))
+        self.other_worker_bumps()
+        headers = self.login()
+        # Đăng nhập lại ở worker khác: cache của process này vẫn giữ version cũ
+        caches['token_versions'].set(_token_version_key(self.admin.pk), cached)
+        self.assertEqual(self.get(headers).status_code, 200)
+        self.assertRevoked(self.get(old_headers))
+
+    def test_inactive_user_is_rejected(self):
+        headers = self.login()
+        self.admin.is_active = False
+        self.admin.save()
+        caches['token_versions'].clear()
+        response = self.get(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['detail'], "User is inactive")
+
+    def test_authenticated_from_claims(self):
+        headers = self.login()
+        self.get(headers)
+        # Version đã có trong cache: user được dựng từ claim, không query auth_user
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(headers).status_code, 200)
+
+
+class CachedBasicAuthenticationCases:
+    url = '/api/customers/'
+
+    def setUp(self):
+        caches['credentials'].clear()
+        self.admin = create_user('admin', 'admin')
+
+    def get(self, headers=None):
+        # Đếm số lần băm mật khẩu (check_password) của request
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=User.check_password) as check:
+            response = self.client.get(self.url, **(headers or basic(self.admin)))
+        return response, check.call_count
+
+    def test_cache_hit_skips_hasher(self):
+        self.assertEqual(self.get(), (mock.ANY, 1))
+        response, hashed = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hashed, 0)
+
+    def test_password_change_invalidates_entry(self):
+        self.get()
+        self.admin.set_password('new-password-456')
+        self.admin.save()
+        response, hashed = self.get()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(hashed, 1)
+
+    def test_deactivation_invalidates_entry(self):
+        self.get()
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        self.assertEqual(self.get()[0].status_code, 401)
+        # Entry đã bị xóa: kích hoạt lại thì phải băm lại mật khẩu
+        User.objects.filter(pk=self.admin.pk).update(is_active=True)
+        response, hashed = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hashed, 1)
+
+    def test_wrong_password_is_not_cached(self):
+        self.get()
+        headers = {'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(b'admin:wrong-password').decode()}
+        for _ in range(2):
+            response, hashed = self.get(headers)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(hashed, 1)
+
+
+class CachedBasicAuthenticationTests(CachedBasicAuthenticationCases, TestCase):
+    pass
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async')
+class AsyncCachedBasicAuthenticationTests(CachedBasicAuthenticationCases, TransactionTestCase):
+    # CachedBasicAuthentication.aauthenticate(): mật khẩu được băm trong thread khác, với kết nối
+    # database riêng, nên dữ liệu của test phải được commit
+    pass
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async', AUTH_HASH_POOL_WORKERS=1, AUTH_HASH_POOL_MAX_PENDING=1)
+class AuthHashPoolTests(TransactionTestCase):
+    # Mật khẩu được băm trong thread của pool, với kết nối database riêng
+
+    def setUp(self):
+        create_user('admin', 'admin')
+        # Pool mới theo AUTH_HASH_POOL_* của test
+        patcher = mock.patch('account.pool._password_pool', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self):
+        body = {'username': 'admin', 'password': PASSWORD}
+        return self.client.post('/api/login/', body, content_type='application/json')
+
+    def occupy(self, pool):
+        """
+        Giữ chỗ duy nhất của pool cho đến khi event được set; trả về (event, thread).
+        """
+        release = threading.Event()
+        thread = threading.Thread(target=async_to_sync(pool.run), args=(release.wait,))
+        thread.start()
+        deadline = time.monotonic() + 5
+        while pool.pending < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return release, thread
+
+    def test_full_pool_returns_503(self):
+        release, thread = self.occupy(get_password_pool())
+        try:
+            response = self.login()
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(response.json(), {"error": "Server is busy, please retry", "status": 503})
+        # Chỗ trong pool được trả lại: request sau được xử lý
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_register_with_full_pool(self):
+        release, thread = self.occupy(get_password_pool())
+        body = {'user': {'username': 'customer', 'email': 'customer@example.com', 'password': PASSWORD}}
+        try:
+            response = self.client.post('/api/register/customer/', body, content_type='application/json')
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username='customer').exists())
+
+    def test_pending_is_released_after_error(self):
+        pool = BoundedPool(max_workers=1, max_pending=1)
+
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            async_to_sync(pool.run)(fail)
+        self.assertEqual(pool.pending, 0)
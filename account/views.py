@@ -3,8 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from base.models import Customer, Employee
-from .serializers import UserSerializer    
-from rest_framework_simplejwt.tokens import RefreshToken
+from .serializers import UserSerializer, ClaimsTokenObtainPairSerializer
 from django.contrib.auth import authenticate
 from rest_framework.decorators import api_view
 from rest_framework.decorators import permission_classes
@@ -151,6 +150,7 @@ def register(request, role):
     methods=["POST"]
 )
 @api_view(['POST'])
+@permission_classes([permissions.AllowAny])
 def login(request):
     username = request.data.get('username')
     password = request.data.get('password')
@@ -162,7 +162,7 @@ def login(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
 
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsTokenObtainPairSerializer.get_token(user)
     return Response(
         {
             "message": "Login successful",
@@ -1,26 +1,43 @@
 from django.contrib import admin
 from .models import Customer, Employee, Product, Task
 
+
+class EmployeeListFilter(admin.RelatedFieldListFilter):
+    # Lựa chọn lọc hiển thị Employee.__str__ (cần user.username): nạp kèm user trong một truy vấn.
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        queryset = Employee.objects.select_related('user').order_by(*ordering)
+        return [(employee.pk, str(employee)) for employee in queryset]
+
+
+# max_queries: ngân sách truy vấn của trang danh sách (xem base/budgets.py).
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ('user', 'phone', 'address', 'is_active')  
     search_fields = ('user__username', 'phone', 'address')    
     list_filter = ('is_active',)                              
+    list_select_related = ('user',)
+    max_queries = 6
 
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ('user', 'phone', 'address', 'position', 'is_active')
     search_fields = ('user__username', 'phone', 'address', 'position')
     list_filter = ('is_active', 'position')  
+    list_select_related = ('user',)
+    max_queries = 7
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'price', 'created_at', 'updated_at')
     search_fields = ('name', 'description')  
     list_filter = ('created_at', 'updated_at')  
+    max_queries = 6
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('title', 'status', 'assigned_to', 'due_date', 'created_at', 'updated_at')
     search_fields = ('title', 'description', 'assigned_to__user__username')  
-    list_filter = ('status', 'assigned_to', 'due_date')  
\ No newline at end of file
+    list_filter = ('status', ('assigned_to', EmployeeListFilter), 'due_date')  
+    list_select_related = ('assigned_to__user',)
+    max_queries = 7
@@ -0,0 +1,145 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def json_response(payload, status_code=status.HTTP_200_OK):
+    """
+    HttpResponse JSON với cùng nội dung (bytes) như Response của DRF dùng JSONRenderer.
+    """
+    return HttpResponse(JSONRenderer().render(payload), status=status_code, content_type='application/json')
+
+
+class AsyncAPIView(View):
+    """
+    View async (ASGI) có cùng authentication/permission như APIView của DRF: handler
+    (get, post, ...) là coroutine và nhận rest_framework.request.Request, nên dùng được
+    request.query_params, request.data và các helper của base như view sync.
+
+    - Authenticator có aauthenticate() thì được await, ngược lại authenticate() chạy trong
+      thread (sync_to_async).
+    - Permission có ahas_permission() thì được await, ngược lại gọi has_permission(): các
+      permission cần đọc database phải định nghĩa ahas_permission(). Tương tự với
+      ahas_object_permission() / has_object_permission(): handler gọi
+      await self.check_object_permissions(request, obj) sau khi đọc object.
+    - Response luôn là JSON (không có Browsable API); lỗi (APIException, Http404) được
+      trả về bằng exception handler của DRF như APIView.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Giống APIView: chỉ SessionAuthentication kiểm tra CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_authenticators(self):
+        return [auth() for auth in self.authentication_classes]
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, parsers=[parser() for parser in self.parser_classes],
+                          authenticators=self.get_authenticators())
+        self.request = request
+        try:
+            await self.perform_authentication(request)
+            await self.check_permissions(request)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        response.headers.setdefault('Allow', ', '.join(self._allowed_methods()))
+        return response
+
+    async def perform_authentication(self, request):
+        for authenticator in request.authenticators:
+            aauthenticate = getattr(authenticator, 'aauthenticate', None)
+            if aauthenticate is not None:
+                user_auth = await aauthenticate(request)
+            else:
+                user_auth = await sync_to_async(authenticator.authenticate)(request)
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._authenticator = None
+        request.user = api_settings.UNAUTHENTICATED_USER() if api_settings.UNAUTHENTICATED_USER else None
+        request.auth = api_settings.UNAUTHENTICATED_TOKEN() if api_settings.UNAUTHENTICATED_TOKEN else None
+
+    async def check_permissions(self, request):
+        for permission in self.get_permissions():
+            ahas_permission = getattr(permission, 'ahas_permission', None)
+            if ahas_permission is not None:
+                allowed = await ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request, getattr(permission, 'message', None), getattr(permission, 'code', None)
+                )
+
+    async def check_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            ahas_object_permission = getattr(permission, 'ahas_object_permission', None)
+            if ahas_object_permission is not None:
+                allowed = await ahas_object_permission(request, self, obj)
+            else:
+                allowed = permission.has_object_permission(request, self, obj)
+            if not allowed:
+                self.permission_denied(
+                    request, getattr(permission, 'message', None), getattr(permission, 'code', None)
+                )
+
+    def permission_denied(self, request, message=None, code=None):
+        if request.authenticators and not request.successful_authenticator:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(detail=message, code=code)
+
+    def handle_exception(self, exc):
+        """
+        Giống APIView.handle_exception: 401 kèm WWW-Authenticate của authenticator đầu tiên
+        (403 nếu không có), các lỗi khác qua EXCEPTION_HANDLER; lỗi không xử lý được raise lại.
+        """
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.request.authenticators
+            auth_header = authenticators[0].authenticate_header(self.request) if authenticators else None
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+
+        context = {'view': self, 'args': self.args, 'kwargs': self.kwargs, 'request': self.request}
+        handled = api_settings.EXCEPTION_HANDLER(exc, context)
+        if handled is None:
+            raise exc
+        response = json_response(handled.data, handled.status_code)
+        for header in ('WWW-Authenticate', 'Retry-After'):
+            if header in handled.headers:
+                response.headers[header] = handled.headers[header]
+        return response
+
+
+async def asave_serializer(serializer):
+    """
+    Bản async của serializer.save() cho ModelSerializer đã is_valid() (không có quan hệ
+    nhiều-nhiều): acreate() khi tạo mới, gán field rồi asave() khi cập nhật.
+    """
+    if serializer.instance is None:
+        model = serializer.Meta.model
+        serializer.instance = await model._default_manager.acreate(**serializer.validated_data)
+    else:
+        for attr, value in serializer.validated_data.items():
+            setattr(serializer.instance, attr, value)
+        await serializer.instance.asave()
+    return serializer.instance
@@ -0,0 +1,235 @@
+import hashlib
+import hmac
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from drf_spectacular.authentication import BasicScheme
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Customer, Employee, TokenVersion
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def _token_version_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def _token_version_row(user_id):
+    # None khi user không tồn tại hoặc bị khóa; (None,) khi user chưa có TokenVersion (version 0)
+    return get_user_model().objects.filter(pk=user_id, is_active=True).values_list('token_version__version')
+
+
+def get_token_version(user_id, refresh=False):
+    """
+    Version token hiện tại của user: đọc từ cache 'token_versions' (bản sao ngắn hạn của
+    TokenVersion trong database), khi không có hoặc refresh=True thì đọc từ database.
+    None khi user không tồn tại hoặc bị khóa.
+    """
+    cache = caches['token_versions']
+    if not refresh:
+        version = cache.get(_token_version_key(user_id))
+        if version is not None:
+            return version
+    row = _token_version_row(user_id).first()
+    if row is None:
+        return None
+    version = row[0] or 0
+    cache.set(_token_version_key(user_id), version)
+    return version
+
+
+async def aget_token_version(user_id, refresh=False):
+    """
+    Bản async của get_token_version().
+    """
+    cache = caches['token_versions']
+    if not refresh:
+        version = cache.get(_token_version_key(user_id))
+        if version is not None:
+            return version
+    row = await _token_version_row(user_id).afirst()
+    if row is None:
+        return None
+    version = row[0] or 0
+    cache.set(_token_version_key(user_id), version)
+    return version
+
+
+def bump_token_version(user_id):
+    """
+    Làm mất hiệu lực mọi access token đã cấp cho user (dùng khi đổi mật khẩu, quyền, profile...).
+    Version tăng trong database (cùng transaction với thay đổi); worker khác thấy version mới
+    khi bản sao trong cache của nó hết hạn (cache 'token_versions', TOKEN_VERSION_CACHE_SECONDS).
+    """
+    TokenVersion.bump(user_id)
+    # Xóa sau khi commit để request khác không đọc lại version cũ vào cache
+    transaction.on_commit(lambda: caches['token_versions'].delete(_token_version_key(user_id)))
+
+
+def add_user_claims(token, user):
+    """
+    Thêm các claim để ClaimsJWTAuthentication và các permission không phải query lại database.
+    """
+    customer_id = Customer.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+    employee_id = Employee.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+    if user.is_staff:
+        role = 'admin'
+    elif employee_id is not None:
+        role = 'employee'
+    elif customer_id is not None:
+        role = 'customer'
+    else:
+        role = None
+
+    token['username'] = user.get_username()
+    token['is_staff'] = user.is_staff
+    token['role'] = role
+    token['customer_id'] = customer_id
+    token['employee_id'] = employee_id
+    token[TOKEN_VERSION_CLAIM] = get_token_version(user.pk, refresh=True) or 0
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication có thêm chế độ stateless (settings.JWT_STATELESS_AUTH):
+    user được dựng từ claim của token (TokenUser) thay vì SELECT bảng auth_user mỗi request.
+    Token bị thu hồi khi token_version trong token khác version hiện tại của user.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self._stateless_user_id(validated_token)
+        if user_id is None:
+            return super().get_user(validated_token)
+        current_version = get_token_version(user_id)
+        if current_version is not None and current_version < validated_token[TOKEN_VERSION_CLAIM]:
+            # Token mới hơn bản sao trong cache (user vừa đăng nhập lại sau khi bị thu hồi)
+            current_version = get_token_version(user_id, refresh=True)
+        if current_version is None:
+            # User không còn hoặc bị khóa: để JWTAuthentication báo lỗi tương ứng
+            return super().get_user(validated_token)
+        return self._token_user(validated_token, current_version)
+
+    async def aauthenticate(self, request):
+        """
+        Bản async của authenticate() cho base.async_views.AsyncAPIView: kiểm tra token
+        không cần I/O; chỉ khi phải đọc user từ database mới chuyển sang thread của ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user_id = self._stateless_user_id(validated_token)
+        if user_id is None:
+            return await sync_to_async(super().get_user)(validated_token), validated_token
+        current_version = await aget_token_version(user_id)
+        if current_version is not None and current_version < validated_token[TOKEN_VERSION_CLAIM]:
+            current_version = await aget_token_version(user_id, refresh=True)
+        if current_version is None:
+            return await sync_to_async(super().get_user)(validated_token), validated_token
+        return self._token_user(validated_token, current_version), validated_token
+
+    def _stateless_user_id(self, validated_token):
+        """
+        Id user nếu được dựng từ claim (JWT_STATELESS_AUTH), None nếu phải đọc user từ database.
+        """
+        if not settings.JWT_STATELESS_AUTH or TOKEN_VERSION_CLAIM not in validated_token:
+            return None
+        return validated_token.get(api_settings.USER_ID_CLAIM)
+
+    def _token_user(self, validated_token, current_version):
+        # Version chỉ tăng: token cũ hơn version hiện tại đã bị thu hồi
+        if validated_token[TOKEN_VERSION_CLAIM] != current_version:
+            raise AuthenticationFailed("Token has been revoked", code='token_revoked')
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+
+def _hmac(*parts):
+    message = '\0'.join(parts).encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication có cache các lần xác thực thành công, để request lặp lại
+    không phải băm lại mật khẩu (PBKDF2) mỗi lần.
+
+    Key là HMAC(SECRET_KEY, username + password) nên cache không chứa mật khẩu gốc.
+    Entry lưu id user và HMAC của password hash; khi user đổi mật khẩu, hash thay đổi
+    nên entry cũ không còn khớp. Thời hạn và kích thước cache: cache 'credentials'.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cache = caches['credentials']
+        key = _hmac(userid, password)
+        cached = cache.get(key)
+        if cached is not None:
+            user = get_user_model().objects.filter(pk=cached[0]).first()
+            if _matches(user, userid, cached[1]):
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(key, (user.pk, _hmac(user.password)))
+        return (user, auth)
+
+    async def aauthenticate(self, request):
+        """
+        Bản async của authenticate() cho base.async_views.AsyncAPIView. Khi chưa có trong
+        cache, việc băm mật khẩu chạy trong thread riêng để không chặn event loop và thread
+        dùng chung của async ORM.
+        """
+        credentials = _BasicCredentials().authenticate(request)
+        if credentials is None:
+            return None
+        userid, password = credentials
+        cache = caches['credentials']
+        key = _hmac(userid, password)
+        cached = cache.get(key)
+        if cached is not None:
+            user = await get_user_model().objects.filter(pk=cached[0]).afirst()
+            if _matches(user, userid, cached[1]):
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = await sync_to_async(
+            super().authenticate_credentials, thread_sensitive=False
+        )(userid, password, request)
+        cache.set(key, (user.pk, _hmac(user.password)))
+        return (user, auth)
+
+
+def _matches(user, userid, password_digest):
+    # Entry trong cache chỉ còn đúng khi user còn hoạt động và chưa đổi username/mật khẩu
+    return (
+        user is not None
+        and user.is_active
+        and user.get_username() == userid
+        and hmac.compare_digest(_hmac(user.password), password_digest)
+    )
+
+
+class _BasicCredentials(BasicAuthentication):
+    # Dùng phần đọc header Authorization của BasicAuthentication, trả về (username, password)
+    def authenticate_credentials(self, userid, password, request=None):
+        return userid, password
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    # Tài liệu OpenAPI giống JWTAuthentication (Bearer token)
+    target_class = 'base.authentication.ClaimsJWTAuthentication'
+
+
+class CachedBasicScheme(BasicScheme):
+    target_class = 'base.authentication.CachedBasicAuthentication'
@@ -0,0 +1,197 @@
+import contextvars
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection, transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Header của response con được trả về cho client (validator để dùng lại với If-None-Match)
+RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'X-Cache')
+
+# Header/biến WSGI của request cha không được chép sang request con
+_PARENT_ONLY_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_ACCEPT', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'PATH_INFO', 'QUERY_STRING', 'REQUEST_METHOD', 'wsgi.input',
+}
+
+
+class InvalidBatch(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def validate(items, batch_path):
+    """
+    Kiểm tra danh sách request con ({"method", "path", "body", "headers"}); raise
+    InvalidBatch với lỗi theo từng phần tử (cùng thứ tự với request).
+    """
+    if not isinstance(items, list) or not items:
+        raise InvalidBatch("requests must be a non-empty list")
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise InvalidBatch(f"Too many requests, the limit is {settings.BATCH_MAX_REQUESTS}")
+    errors = [{} for _ in items]
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index]['non_field_errors'] = ["Expected an object."]
+            continue
+        if str(item.get('method', 'GET')).upper() not in METHODS:
+            errors[index]['method'] = [f"Must be one of {', '.join(METHODS)}."]
+        path = item.get('path')
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            errors[index]['path'] = ["Must be a path starting with /api/."]
+        elif urlsplit(path).path == batch_path:
+            errors[index]['path'] = ["Batch requests cannot be nested."]
+        headers = item.get('headers', {})
+        if not isinstance(headers, dict) or not all(isinstance(value, str) for value in headers.values()):
+            errors[index]['headers'] = ["Must be an object of strings."]
+    if any(errors):
+        raise InvalidBatch(errors)
+
+
+def execute(request, items, atomic=False, parallel=False):
+    """
+    Chạy các request con với user/token đã xác thực của request cha, trả về list
+    {"status", "headers", "body"} theo thứ tự của items và cờ cho biết batch có bị rollback.
+
+    - atomic: mọi request con chạy trong một transaction; dừng ở request con đầu tiên trả
+      về status >= 400, rollback và đánh dấu các request còn lại 424 (Failed Dependency).
+    - parallel: khi mọi request con là GET (và không atomic), chạy song song trong
+      BATCH_MAX_WORKERS thread, mỗi thread một kết nối database.
+    """
+    if atomic:
+        results = []
+        with transaction.atomic():
+            for item in items:
+                result = _dispatch(request, item)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+        rolled_back = len(results) < len(items) or results[-1]['status'] >= 400
+        results += [
+            {"status": status.HTTP_424_FAILED_DEPENDENCY, "headers": {}, "body": {"detail": "Not executed."}}
+            for _ in items[len(results):]
+        ]
+        return results, rolled_back
+
+    if parallel and len(items) > 1 and all(_method(item) == 'GET' for item in items):
+        with ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS) as executor:
+            # copy_context: request con chạy trong context của request cha (định tuyến database, ...)
+            futures = [
+                executor.submit(contextvars.copy_context().run, _dispatch_in_thread, request, item)
+                for item in items
+            ]
+            results = [future.result() for future in futures]
+        # Mỗi thread đếm query vào RequestStats riêng, được cộng vào số liệu của request cha
+        # (base.metrics, base.budgets) sau khi mọi thread đã xong
+        stats = metrics.current_stats()
+        if stats is not None:
+            for _, thread_stats in results:
+                stats.merge(thread_stats)
+        return [result for result, _ in results], False
+    return [_dispatch(request, item) for item in items], False
+
+
+def _method(item):
+    return str(item.get('method', 'GET')).upper()
+
+
+def _dispatch_in_thread(request, item):
+    """
+    Trả về (result, stats): stats là số liệu SQL của request con trong thread này.
+    """
+    stats, token = metrics.start_request()
+    try:
+        return _dispatch(request, item), stats
+    finally:
+        metrics.end_request(token)
+        connection.close()
+
+
+def _dispatch(request, item):
+    sub_request = _sub_request(request, item)
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "headers": {}, "body": {"detail": "Not found."}}
+    try:
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(sub_request, *match.args, **match.kwargs)
+        else:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        content = _content(response)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", sub_request.method, sub_request.get_full_path())
+        return {
+            "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "headers": {},
+            "body": {"detail": "Internal server error."}
+        }
+    return {
+        "status": response.status_code,
+        "headers": {name: response.headers[name] for name in RESPONSE_HEADERS if name in response.headers},
+        "body": _decode(response, content)
+    }
+
+
+def _sub_request(request, item):
+    """
+    WSGIRequest cho request con: header của request cha (trừ body và header điều kiện),
+    cùng user/token đã xác thực (DRF ForcedAuthentication) nên không xác thực lại.
+    """
+    url = urlsplit(item['path'])
+    body = b'' if item.get('body') is None else json.dumps(item['body']).encode()
+    environ = {key: value for key, value in request.META.items() if key not in _PARENT_ONLY_META}
+    environ.update({
+        'REQUEST_METHOD': _method(item),
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    if body:
+        environ['CONTENT_TYPE'] = 'application/json'
+        environ['CONTENT_LENGTH'] = str(len(body))
+    for name, value in item.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    sub_request = WSGIRequest(environ)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _content(response):
+    if not response.streaming:
+        return response.content
+    if response.is_async:
+        return async_to_sync(_acollect)(response.streaming_content)
+    return b''.join(response.streaming_content)
+
+
+async def _acollect(content):
+    return b''.join([chunk async for chunk in content])
+
+
+def _decode(response, content):
+    if not content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content)
+    return content.decode(response.charset)
@@ -0,0 +1,71 @@
+import logging
+import random
+import re
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger('base.query_budget')
+
+# Số fingerprint SQL lặp nhiều nhất được báo cáo
+REPORTED_FINGERPRINTS = 5
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def view_budget(match):
+    """
+    max_queries khai báo cho view của request: thuộc tính của APIView, hoặc của ModelAdmin
+    cho trang changelist trong admin. None nếu view không khai báo.
+    """
+    if match is None:
+        return None
+    model_admin = getattr(match.func, 'model_admin', None)
+    if model_admin is not None:
+        if match.url_name and match.url_name.endswith('_changelist'):
+            return getattr(model_admin, 'max_queries', None)
+        return None
+    view_class = getattr(match.func, 'view_class', None)
+    return getattr(view_class or match.func, 'max_queries', None)
+
+
+def fingerprint(sql):
+    """
+    Dạng chuẩn của câu SQL (bỏ giá trị cụ thể) để gom các query lặp lại kiểu N+1.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', sql)
+    return ' '.join(sql.split())
+
+
+def check_budget(request, stats):
+    """
+    Khi request chạy nhiều query hơn max_queries của view: raise QueryBudgetExceeded nếu
+    settings.QUERY_BUDGET_STRICT (khi chạy test), ngược lại ghi log cảnh báo theo tỉ lệ
+    settings.QUERY_BUDGET_LOG_SAMPLE_RATE.
+    """
+    if stats is None:
+        return
+    match = request.resolver_match
+    budget = view_budget(match)
+    if budget is None or stats.queries <= budget:
+        return
+    strict = settings.QUERY_BUDGET_STRICT
+    if not strict and random.random() >= settings.QUERY_BUDGET_LOG_SAMPLE_RATE:
+        return
+
+    repeated = Counter(fingerprint(sql) for sql in stats.statements).most_common(REPORTED_FINGERPRINTS)
+    message = '%s %s ran %d queries (budget %d). Most repeated:\n%s' % (
+        request.method,
+        match.url_name or match.route,
+        stats.queries,
+        budget,
+        '\n'.join(f'  {count} x {sql}' for count, sql in repeated),
+    )
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
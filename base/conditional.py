@@ -0,0 +1,56 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import TableVersion
+
+
+def object_validators(request, obj):
+    """
+    ETag / Last-Modified của một object, tính từ updated_at (không cần serialize).
+    """
+    return _validators(request, obj.pk, obj.updated_at)
+
+
+def list_validators(request, model, scope='', current=None):
+    """
+    ETag / Last-Modified của một danh sách, tính từ bộ đếm thay đổi của bảng (TableVersion):
+    một query theo khóa chính thay vì aggregate trên các dòng. Mọi thay đổi của bảng, kể cả
+    xóa, đổi cả ETag và Last-Modified. `scope` phân biệt các danh sách có cùng URL nhưng
+    khác dữ liệu (ví dụ Task của từng nhân viên). `current` là (version, changed_at) nếu
+    view đã đọc TableVersion trước đó (ví dụ làm key cache), để không query lại.
+    """
+    version, changed_at = current or TableVersion.current(model)
+    return _validators(request, f'{scope}:{version}', changed_at)
+
+
+async def alist_validators(request, model, scope='', current=None):
+    """
+    Bản async của list_validators().
+    """
+    version, changed_at = current or await TableVersion.acurrent(model)
+    return _validators(request, f'{scope}:{version}', changed_at)
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Trả về response 304 nếu client đã có bản mới nhất, ngược lại trả về None.
+    """
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    if etag is not None:
+        response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _validators(request, key, updated_at):
+    # Query string (cursor, page_size, ...) thay đổi nội dung trả về nên cũng nằm trong ETag
+    raw = f"{request.get_full_path()}|{key}|{updated_at.isoformat() if updated_at else ''}"
+    etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    return etag, last_modified
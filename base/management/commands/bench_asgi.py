@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from .bench_endpoints import DETAIL_MODELS, PASSWORD, USERNAME, _percentile
+
+# Các route có bản async trong CRM/urls_async.py (được đo bằng GET)
+ROUTES = (
+    'product-list', 'product-detail', 'task-list', 'task-detail',
+    'customer-list', 'customer-detail', 'employee-list', 'employee-detail',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "So sánh view sync (WSGI, CRM.urls, mỗi request một thread) với view async (ASGI, "
+        "CRM.urls_async, một event loop) khi có nhiều request đồng thời, trên database test đã "
+        "sinh dữ liệu (seed_data): số request/giây và độ trễ p50/p95/p99 của từng route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help="Số request chạy đồng thời")
+        parser.add_argument('--requests', type=int, default=400, help="Tổng số request đo cho mỗi route và chế độ")
+        parser.add_argument('--filter', default='', help="Chỉ đo các route có tên chứa chuỗi này")
+        parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+        parser.add_argument('--customers', type=int, default=1000, help="Số Customer được sinh")
+        parser.add_argument('--employees', type=int, default=100, help="Số Employee được sinh")
+        parser.add_argument('--products', type=int, default=10000, help="Số Product được sinh")
+        parser.add_argument('--tasks', type=int, default=10000, help="Số Task được sinh")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError("--concurrency và --requests phải lớn hơn 0")
+        seed = {name: options[name] for name in ('customers', 'employees', 'products', 'tasks')}
+        if connection.vendor == 'sqlite':
+            # Database test của SQLite mặc định nằm trong bộ nhớ, không dùng chung được giữa các thread
+            test_path = os.path.join(tempfile.mkdtemp(), 'bench_asgi.sqlite3')
+            settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = test_path
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = test_path
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command('seed_data', prefix='bench', stdout=self.stdout, **seed)
+            headers = self._headers()
+            results = []
+            for name in ROUTES:
+                if options['filter'] not in name:
+                    continue
+                path = self._path(name)
+                for mode, run in (('wsgi', self._run_wsgi), ('asgi', self._run_asgi)):
+                    timings, elapsed = run(path, headers, options['concurrency'], options['requests'])
+                    results.append(_summary(name, mode, timings, elapsed))
+        finally:
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self._report(results)
+        if options['output']:
+            report = {'concurrency': options['concurrency'], 'seed': seed, 'endpoints': results}
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Saved {options['output']}")
+
+    def _headers(self):
+        User.objects.create_superuser(username=USERNAME, email=f'{USERNAME}@example.com', password=PASSWORD)
+        response = Client().post(
+            reverse('token_obtain_pair'), {'username': USERNAME, 'password': PASSWORD}, content_type='application/json'
+        )
+        if response.status_code != 200:
+            raise CommandError(f"Không lấy được token ({response.status_code})")
+        return {'Authorization': f"Bearer {response.json()['access']}"}
+
+    def _path(self, name):
+        kwargs = {}
+        if name in DETAIL_MODELS:
+            kwargs['pk'] = DETAIL_MODELS[name].objects.order_by('pk').values_list('pk', flat=True).first()
+        return reverse(name, kwargs=kwargs)
+
+    def _run_wsgi(self, path, headers, concurrency, total):
+        """
+        Mỗi request chạy trong một thread của pool (Client, WSGIHandler, kết nối database
+        của thread đó), giống worker gthread của gunicorn.
+        """
+        def fetch(_):
+            started = time.perf_counter()
+            response = Client().get(path, headers=headers)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(fetch, range(total)))
+        return timings, time.perf_counter() - started
+
+    def _run_asgi(self, path, headers, concurrency, total):
+        """
+        Mọi request chạy trên cùng một event loop qua AsyncClient (ASGIHandler) tới CRM.urls_async.
+        """
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    return time.perf_counter() - started, response.status_code
+
+            return await asyncio.gather(*(fetch() for _ in range(total)))
+
+        with override_settings(ROOT_URLCONF='CRM.urls_async'):
+            started = time.perf_counter()
+            timings = asyncio.run(run())
+            return timings, time.perf_counter() - started
+
+    def _report(self, results):
+        self.stdout.write(
+            f"{'route':<18} {'mode':<5} {'status':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        previous = {}
+        for item in results:
+            line = (
+                f"{item['name']:<18} {item['mode']:<5} {item['status']:>6} {item['requests_per_sec']:>9.1f} "
+                f"{item['p50_ms']:>9.2f} {item['p95_ms']:>9.2f} {item['p99_ms']:>9.2f}"
+            )
+            sync = previous.get(item['name'])
+            if sync is not None and sync['requests_per_sec']:
+                line += f"  {100 * (item['requests_per_sec'] - sync['requests_per_sec']) / sync['requests_per_sec']:+.1f}% req/s"
+            previous.setdefault(item['name'], item)
+            self.stdout.write(line)
+
+
+def _summary(name, mode, timings, elapsed):
+    latencies = sorted(latency for latency, _ in timings)
+    statuses = [status_code for _, status_code in timings]
+    return {
+        'name': name,
+        'mode': mode,
+        # Status xuất hiện nhiều nhất, để thấy ngay route trả lỗi
+        'status': statistics.mode(statuses),
+        'requests': len(latencies),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(1000 * statistics.median(latencies), 3),
+        'p95_ms': round(1000 * _percentile(latencies, 0.95), 3),
+        'p99_ms': round(1000 * _percentile(latencies, 0.99), 3),
+    }
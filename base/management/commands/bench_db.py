@@ -0,0 +1,130 @@
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from base.models import Employee, Task
+
+STATUSES = [choice for choice, _ in Task.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thông lượng cập nhật Task đồng thời (đọc rồi ghi trong một transaction) với "
+        "cấu hình database hiện tại (DATABASE_ENGINE). Chạy trên database test tạm."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Số thread cập nhật đồng thời")
+        parser.add_argument('--updates', type=int, default=200, help="Số lần cập nhật của mỗi thread")
+        parser.add_argument('--tasks', type=int, default=1000, help="Số Task được tạo sẵn")
+        parser.add_argument(
+            '--plain', action='store_true',
+            help="SQLite: bỏ các OPTIONS (WAL, synchronous, transaction_mode, ...) để so sánh"
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if options['plain'] and connection.vendor == 'sqlite':
+            database['OPTIONS'] = {}
+            connection.settings_dict['OPTIONS'] = {}
+        if connection.vendor == 'sqlite':
+            # Database test mặc định của SQLite nằm trong bộ nhớ, không đo được khóa/ghi đĩa
+            test_path = os.path.join(tempfile.mkdtemp(), 'bench_db.sqlite3')
+            database.setdefault('TEST', {})['NAME'] = test_path
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = test_path
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            task_ids = self._seed(options['tasks'])
+            profile = self._profile()
+            elapsed, latencies = self._run(task_ids, options['threads'], options['updates'])
+        finally:
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        total = options['threads'] * options['updates']
+        done = len(latencies)
+        latencies.sort()
+        self.stdout.write(f"{connection.vendor}: {profile}")
+        self.stdout.write(
+            f"{options['threads']} threads x {options['updates']} updates: "
+            f"{done / elapsed:.1f} updates/s, {elapsed:.2f}s, {total - done} failed (database locked)"
+        )
+        if latencies:
+            self.stdout.write(
+                "latency ms: p50 {:.1f}  p95 {:.1f}  p99 {:.1f}  max {:.1f}".format(
+                    *(1000 * value for value in (
+                        statistics.median(latencies),
+                        latencies[int(0.95 * (done - 1))],
+                        latencies[int(0.99 * (done - 1))],
+                        latencies[-1],
+                    ))
+                )
+            )
+
+    def _seed(self, count):
+        user = User.objects.create_user(username='bench_db_user')
+        employee = Employee.objects.create(user=user)
+        due_date = datetime.date.today()
+        Task.objects.bulk_create(
+            [
+                Task(title=f'Task {index}', description='', assigned_to=employee, due_date=due_date)
+                for index in range(count)
+            ],
+            batch_size=500
+        )
+        return list(Task.objects.values_list('id', flat=True))
+
+    def _profile(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+                cursor.execute('PRAGMA synchronous')
+                synchronous = cursor.fetchone()[0]
+            transaction_mode = connection.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED')
+            return f"journal_mode={journal_mode} synchronous={synchronous} transaction_mode={transaction_mode}"
+        pool = connection.settings_dict['OPTIONS'].get('pool')
+        return f"pool={pool or 'off'} CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}"
+
+    def _run(self, task_ids, threads, updates):
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            rng = random.Random()
+            local = []
+            try:
+                for _ in range(updates):
+                    started = time.perf_counter()
+                    try:
+                        # Giống một request PUT: đọc Task rồi ghi lại trong cùng transaction
+                        with transaction.atomic():
+                            task = Task.objects.get(pk=rng.choice(task_ids))
+                            task.status = rng.choice(STATUSES)
+                            task.save(update_fields=['status', 'updated_at'])
+                    except OperationalError:
+                        continue
+                    local.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, latencies
@@ -0,0 +1,271 @@
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.urls.resolvers import RoutePattern
+
+from base.models import Customer, Employee, Product, Task
+
+USERNAME = 'bench_endpoints_admin'
+PASSWORD = 'bench-endpoints-password'
+
+# Trang admin được đo: trang chủ và trang danh sách của các model trong app base
+ADMIN_ROUTES = ('admin:index',) + tuple(
+    f'admin:base_{model._meta.model_name}_changelist' for model in (Customer, Employee, Product, Task)
+)
+
+# Giá trị pk của các route chi tiết: bản ghi đầu tiên của model tương ứng
+DETAIL_MODELS = {
+    'product-detail': Product,
+    'task-detail': Task,
+    'customer-detail': Customer,
+    'employee-detail': Employee,
+}
+
+# Query string của các route cần tham số bắt buộc
+QUERY_STRINGS = {
+    'product-search': 'q=alpha',
+}
+
+# Body của các route chỉ nhận POST (context: dữ liệu đăng nhập, i: số thứ tự request).
+# Các route còn lại được đo bằng GET.
+POST_BODIES = {
+    'login': lambda context, i: {'username': USERNAME, 'password': PASSWORD},
+    'token_obtain_pair': lambda context, i: {'username': USERNAME, 'password': PASSWORD},
+    'token_refresh': lambda context, i: {'refresh': context['refresh']},
+    'register': lambda context, i: {
+        'user': {'username': f'bench_register_{i}', 'email': f'bench_register_{i}@example.com', 'password': PASSWORD},
+        'phone': '0900000000',
+    },
+    'product-bulk': lambda context, i: {
+        'create': [{'name': f'Bench {i}-{index}', 'price': 1} for index in range(10)]
+    },
+    # Các GET mà client thường gộp khi mở trang chủ
+    'batch': lambda context, i: {
+        'requests': [
+            {'method': 'GET', 'path': '/api/products/?page_size=20'},
+            {'method': 'GET', 'path': '/api/tasks/?page_size=20'},
+            {'method': 'GET', 'path': '/api/tasks/board/'},
+        ],
+        'parallel': False,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo mọi route trong CRM/urls.py qua Django test client trên database test đã sinh dữ liệu "
+        "(seed_data): độ trễ p50/p95/p99, số query mỗi request và số dòng/giây. Kết quả có thể "
+        "lưu ra JSON (--output) để so sánh giữa các commit (--compare)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Số request đo cho mỗi route")
+        parser.add_argument('--warmup', type=int, default=3, help="Số request chạy trước (không tính) cho mỗi route")
+        parser.add_argument('--filter', default='', help="Chỉ đo các route có tên hoặc đường dẫn chứa chuỗi này")
+        parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+        parser.add_argument('--compare', help="File JSON của một lần chạy trước để so sánh độ trễ")
+        parser.add_argument('--customers', type=int, default=1000, help="Số Customer được sinh")
+        parser.add_argument('--employees', type=int, default=100, help="Số Employee được sinh")
+        parser.add_argument('--products', type=int, default=10000, help="Số Product được sinh")
+        parser.add_argument('--tasks', type=int, default=10000, help="Số Task được sinh")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Không đọc được {options['compare']}: {exc}")
+
+        seed = {name: options[name] for name in ('customers', 'employees', 'products', 'tasks')}
+        database = settings.DATABASES['default']
+        if connection.vendor == 'sqlite':
+            # Database test mặc định của SQLite nằm trong bộ nhớ, khác với khi chạy thật
+            test_path = os.path.join(tempfile.mkdtemp(), 'bench_endpoints.sqlite3')
+            database.setdefault('TEST', {})['NAME'] = test_path
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = test_path
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command('seed_data', prefix='bench', stdout=self.stdout, **seed)
+            client, context = self._client()
+            routes = [
+                route for route in self._routes()
+                if options['filter'] in route['name'] or options['filter'] in route['path']
+            ]
+            results = [self._bench(client, context, route, options['warmup'], options['requests']) for route in routes]
+        finally:
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self._report(results, baseline)
+        if options['output']:
+            report = {'meta': self._meta(seed, options['requests']), 'endpoints': results}
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Saved {options['output']}")
+
+    def _client(self):
+        """
+        Client đăng nhập bằng admin: session cho trang admin, access token (Bearer) cho API.
+        """
+        User.objects.create_superuser(username=USERNAME, email=f'{USERNAME}@example.com', password=PASSWORD)
+        # Lỗi 500 của một route được ghi vào kết quả (cột status) thay vì dừng cả lần đo
+        client = Client(raise_request_exception=False)
+        response = client.post(
+            reverse('token_obtain_pair'), {'username': USERNAME, 'password': PASSWORD}, content_type='application/json'
+        )
+        if response.status_code != 200:
+            raise CommandError(f"Không lấy được token ({response.status_code})")
+        tokens = response.json()
+        client.defaults['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access']}"
+        client.force_login(User.objects.get(username=USERNAME))
+        return client, {'refresh': tokens['refresh'], 'counter': itertools.count()}
+
+    def _routes(self):
+        routes = []
+        for name, pattern, route in _url_patterns(get_resolver('CRM.urls').url_patterns):
+            if name is None:
+                # Route không tên (Swagger UI, ReDoc): đo theo đường dẫn nếu không có tham số
+                if not isinstance(pattern.pattern, RoutePattern) or pattern.pattern.converters:
+                    continue
+                routes.append({'name': '/' + route, 'method': 'get', 'path': '/' + route})
+                continue
+            if name.startswith('admin:') and name not in ADMIN_ROUTES:
+                continue
+            kwargs = {}
+            if 'pk' in pattern.pattern.converters:
+                kwargs['pk'] = DETAIL_MODELS[name].objects.order_by('pk').values_list('pk', flat=True).first()
+            if 'role' in pattern.pattern.converters:
+                kwargs['role'] = 'customer'
+            method = 'post' if name in POST_BODIES else 'get'
+            path = reverse(name, kwargs=kwargs)
+            if name in QUERY_STRINGS:
+                path += '?' + QUERY_STRINGS[name]
+            routes.append({'name': name, 'method': method, 'path': path})
+        return routes
+
+    def _bench(self, client, context, route, warmup, total):
+        latencies = []
+        queries = []
+        rows = 0
+        status = None
+        for index in range(warmup + total):
+            kwargs = {}
+            if route['method'] == 'post':
+                body = POST_BODIES[route['name']](context, next(context['counter']))
+                kwargs = {'data': body, 'content_type': 'application/json'}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, route['method'])(route['path'], **kwargs)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = time.perf_counter() - started
+            if index < warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(len(captured.captured_queries))
+            rows += _row_count(response, content)
+            status = response.status_code
+
+        latencies.sort()
+        return {
+            **route,
+            'status': status,
+            'requests': total,
+            'p50_ms': round(1000 * statistics.median(latencies), 3),
+            'p95_ms': round(1000 * _percentile(latencies, 0.95), 3),
+            'p99_ms': round(1000 * _percentile(latencies, 0.99), 3),
+            'queries': round(statistics.mean(queries), 2),
+            'max_queries': max(queries),
+            'rows_per_sec': round(rows / sum(latencies), 1),
+        }
+
+    def _report(self, results, baseline):
+        previous = {}
+        if baseline is not None:
+            previous = {(item['method'], item['name']): item for item in baseline.get('endpoints', [])}
+        self.stdout.write(
+            f"{'route':<34} {'method':<6} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'queries':>8} {'rows/s':>10}" + ("  p50 vs baseline" if previous else "")
+        )
+        for item in results:
+            line = (
+                f"{item['name']:<34} {item['method'].upper():<6} {item['status']:>6} {item['p50_ms']:>9.2f} "
+                f"{item['p95_ms']:>9.2f} {item['p99_ms']:>9.2f} {item['queries']:>8} {item['rows_per_sec']:>10.0f}"
+            )
+            before = previous.get((item['method'], item['name']))
+            if before and before['p50_ms']:
+                line += f"  {100 * (item['p50_ms'] - before['p50_ms']) / before['p50_ms']:+.1f}%"
+                if item['max_queries'] != before['max_queries']:
+                    line += f" (queries {before['max_queries']} -> {item['max_queries']})"
+            self.stdout.write(line)
+
+    def _meta(self, seed, requests):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': requests,
+            'seed': seed,
+        }
+
+
+def _url_patterns(patterns, namespace=None, prefix=''):
+    """
+    Duyệt cây URL (kể cả include), trả về (tên đầy đủ hoặc None, URLPattern, route đầy đủ).
+    """
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            inner = namespace
+            if pattern.namespace:
+                inner = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from _url_patterns(pattern.url_patterns, inner, route)
+        elif isinstance(pattern, URLPattern):
+            name = pattern.name and (f'{namespace}:{pattern.name}' if namespace else pattern.name)
+            yield name, pattern, route
+
+
+def _percentile(values, fraction):
+    return values[int(fraction * (len(values) - 1))]
+
+
+def _row_count(response, content):
+    """
+    Số bản ghi trong response JSON dạng {"data": [...]} (1 nếu data là một object).
+    """
+    if not response.get('Content-Type', '').startswith('application/json'):
+        return 0
+    try:
+        data = json.loads(content).get('data')
+    except (ValueError, AttributeError):
+        return 0
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
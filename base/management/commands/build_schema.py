@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from base.schema import build_schema, code_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Sinh schema OpenAPI cho phiên bản mã nguồn hiện tại và ghi ra SCHEMA_DIR "
+        "(chạy khi build/deploy để /api/schema/ không phải sinh schema lúc chạy)."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        paths = build_schema()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"version {code_version()}: {', '.join(str(path) for path in paths)} in {elapsed:.2f}s")
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from base.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Xóa các Tombstone cũ hơn TOMBSTONE_RETENTION_DAYS ngày (chạy định kỳ, ví dụ bằng cron). "
+        "Client đồng bộ với updated_since cũ hơn mốc này phải đồng bộ lại toàn bộ."
+    )
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=horizon).delete()
+        self.stdout.write(f"{deleted} tombstones deleted (older than {horizon.isoformat()})")
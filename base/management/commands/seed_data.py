@@ -0,0 +1,156 @@
+import datetime
+import itertools
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from base.models import Customer, Employee, Product, TableVersion, Task
+from product.search import deferred_indexing
+
+STATUSES = [choice for choice, _ in Task.STATUS_CHOICES]
+POSITIONS = ['Developer', 'Designer', 'Tester', 'Manager', 'Support']
+WORDS = [
+    'alpha', 'beta', 'gamma', 'delta', 'cloud', 'river', 'stone', 'light', 'swift', 'green',
+    'smart', 'prime', 'ultra', 'micro', 'solar', 'urban', 'nova', 'pixel', 'metro', 'classic',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Sinh dữ liệu giả (user, customer, employee, product, task) theo lô (INSERT nhiều dòng) để "
+        "đo hiệu năng ở quy mô thực tế. Mọi user dùng chung một mật khẩu (--password)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=1000, help="Số Customer (mỗi Customer một User)")
+        parser.add_argument('--employees', type=int, default=100, help="Số Employee (mỗi Employee một User)")
+        parser.add_argument('--products', type=int, default=10000, help="Số Product")
+        parser.add_argument('--tasks', type=int, default=10000, help="Số Task, chia đều cho các Employee")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Số dòng mỗi câu INSERT")
+        parser.add_argument('--prefix', default='seed', help="Tiền tố username của các user được tạo")
+        parser.add_argument('--password', default='password', help="Mật khẩu chung của các user được tạo")
+        parser.add_argument('--seed', type=int, default=0, help="Seed của bộ sinh số ngẫu nhiên")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f"Đã có user với tiền tố '{prefix}_', hãy dùng --prefix khác")
+        if options['tasks'] and not options['employees']:
+            raise CommandError("Cần ít nhất một Employee để giao Task (--employees)")
+
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        # Băm mật khẩu một lần: PBKDF2 cho từng user sẽ chiếm gần hết thời gian chạy
+        self.password = make_password(options['password'])
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            customer_ids = self._profiles(Customer, f'{prefix}_customer', options['customers'])
+            employee_ids = self._profiles(Employee, f'{prefix}_employee', options['employees'])
+            with deferred_indexing():
+                products = self._insert(Product, self._products(options['products']))
+            tasks = self._insert(Task, self._tasks(options['tasks'], employee_ids))
+            # INSERT trực tiếp không gửi signal: đổi version để ETag danh sách không còn khớp
+            TableVersion.bump_on_commit(Product)
+            TableVersion.bump_on_commit(Task)
+        elapsed = time.perf_counter() - started
+
+        users = len(customer_ids) + len(employee_ids)
+        # Mỗi Customer/Employee gồm một dòng User và một dòng profile
+        rows = 2 * users + products + tasks
+        self.stdout.write(
+            f"users: {users}  customers: {len(customer_ids)}  employees: {len(employee_ids)}  "
+            f"products: {products}  tasks: {tasks}"
+        )
+        self.stdout.write(f"{rows} rows in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)")
+
+    def _insert(self, model, rows):
+        """
+        Ghi các dòng (dict attname -> giá trị đã chuẩn bị cho database) theo lô, mỗi lô một câu
+        INSERT (executemany). Field không có trong dòng nhận giá trị mặc định của model.
+        Không dùng bulk_create: chuẩn bị từng giá trị của từng object trong SQL compiler chiếm
+        phần lớn thời gian khi ghi hàng triệu dòng. Trả về số dòng đã ghi.
+        """
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        defaults = [(field.attname, self._default(field)) for field in fields]
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields))
+        )
+        total = 0
+        with connection.cursor() as cursor:
+            while True:
+                batch = [
+                    tuple(row.get(name, default) for name, default in defaults)
+                    for row in itertools.islice(rows, self.batch_size)
+                ]
+                if not batch:
+                    return total
+                cursor.executemany(sql, batch)
+                total += len(batch)
+
+    def _default(self, field):
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            value = self.now
+        else:
+            value = field.get_default()
+        return field.get_db_prep_save(value, connection)
+
+    def _profiles(self, model, username_prefix, count):
+        """
+        Tạo count User và profile (Customer/Employee) tương ứng. Trả về danh sách id của profile.
+        """
+        self._insert(User, (
+            {'username': f'{username_prefix}_{index}', 'email': f'{username_prefix}_{index}@example.com',
+             'password': self.password}
+            for index in range(count)
+        ))
+        # Đọc lại id theo username vì không phải backend nào cũng trả về id sau INSERT nhiều dòng
+        users = User.objects.filter(username__startswith=f'{username_prefix}_')
+        self._insert(model, (
+            {'user_id': user_id, **self._profile_fields(model)}
+            for user_id in users.values_list('id', flat=True).iterator()
+        ))
+        return list(model.objects.filter(user__in=users).values_list('id', flat=True))
+
+    def _profile_fields(self, model):
+        fields = {
+            'phone': f'09{self.rng.randrange(10 ** 8):08d}',
+            'address': f'{self.rng.randrange(1, 500)} {self.rng.choice(WORDS).title()} Street',
+        }
+        if model is Employee:
+            fields['position'] = self.rng.choice(POSITIONS)
+        return fields
+
+    def _products(self, count):
+        rng = self.rng
+        for index in range(count):
+            yield {
+                'name': f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {index}',
+                'price': round(rng.uniform(1, 1000), 2),
+                'description': ' '.join(rng.choices(WORDS, k=8)),
+            }
+
+    def _tasks(self, count, employee_ids):
+        rng = self.rng
+        today = timezone.localdate(self.now)
+        due_dates = [
+            connection.ops.adapt_datefield_value(today + datetime.timedelta(days=offset))
+            for offset in range(-30, 90)
+        ]
+        for index in range(count):
+            yield {
+                'title': f'Task {index}',
+                'description': ' '.join(rng.choices(WORDS, k=8)),
+                'status': rng.choice(STATUSES),
+                'assigned_to_id': employee_ids[index % len(employee_ids)],
+                'due_date': rng.choice(due_dates),
+            }
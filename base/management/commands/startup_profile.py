@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Chạy trong process mới với -X importtime: nạp ứng dụng WSGI như khi worker khởi động
+CHILD_CODE = """
+import time
+started = time.perf_counter()
+import CRM.wsgi
+print(time.perf_counter() - started)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian khởi động worker (nạp CRM/wsgi.py trong process mới) và thời gian import "
+        "của từng module (python -X importtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help="Số module/package chậm nhất được liệt kê")
+        parser.add_argument('--no-warm-up', action='store_true', help="Không chạy CRM/warmup.py (WARM_UP=False)")
+        parser.add_argument(
+            '--target-ms', type=float,
+            help="Báo lỗi (exit code khác 0) nếu thời gian khởi động vượt quá giá trị này"
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'CRM.settings'))
+        env['WARM_UP'] = 'False' if options['no_warm_up'] else 'True'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Khởi động thất bại:\n{result.stderr[-2000:]}")
+        startup_ms = 1000 * float(result.stdout.strip().splitlines()[-1])
+        modules = _parse_importtime(result.stderr)
+
+        limit = options['limit']
+        self.stdout.write(f"startup: {startup_ms:.1f} ms ({len(modules)} modules imported)")
+        self.stdout.write("\nslowest modules (cumulative, ms):")
+        for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:limit]:
+            self.stdout.write(f"{cumulative / 1000:10.1f} {own / 1000:10.1f}  {name}")
+
+        packages = defaultdict(int)
+        for name, (own, _) in modules.items():
+            packages[name.split('.')[0]] += own
+        self.stdout.write("\nslowest packages (self time, ms):")
+        for name, own in sorted(packages.items(), key=lambda item: -item[1])[:limit]:
+            self.stdout.write(f"{own / 1000:10.1f}  {name}")
+
+        target = options['target_ms']
+        if target is not None and startup_ms > target:
+            raise CommandError(f"Startup {startup_ms:.1f} ms exceeds target {target:.1f} ms")
+
+
+def _parse_importtime(output):
+    """
+    Dòng "import time: self [us] | cumulative | imported package" -> {module: (self, cumulative)} (micro giây).
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
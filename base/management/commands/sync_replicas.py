@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Sao chép database SQLite chính sang các file replica (DATABASE_REPLICAS), "
+        "dùng để giả lập replication khi phát triển."
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("sync_replicas only supports SQLite; use the database's own replication.")
+        replicas = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+        if not replicas:
+            raise CommandError("No replicas configured (DATABASE_REPLICAS).")
+
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in replicas:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    # Backup API của SQLite: bản sao nhất quán kể cả khi đang có ghi (WAL)
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"{alias}: {settings.DATABASES[alias]['NAME']}")
+        finally:
+            source.close()
@@ -0,0 +1,250 @@
+import copy
+import glob
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Giới hạn trên (giây) của các bucket histogram độ trễ
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        # Câu SQL đã chạy, để báo cáo khi request vượt max_queries (base.budgets)
+        self.statements = []
+
+    def merge(self, other):
+        """
+        Cộng số liệu của other (ví dụ của một thread chạy request con, base.batch) vào đây.
+        """
+        self.queries += other.queries
+        self.query_seconds += other.query_seconds
+        self.statements.extend(other.statements)
+
+
+def sql_timer(execute, sql, params, many, context):
+    """
+    execute_wrapper đếm số query và thời gian SQL của request hiện tại.
+    """
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+        stats.statements.append(sql)
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    # connection_created được gọi lại mỗi lần kết nối lại trên cùng một DatabaseWrapper
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_stats():
+    return _current.get()
+
+
+def _new_series():
+    return {
+        'requests': {},
+        'buckets': [0] * len(LATENCY_BUCKETS),
+        'duration_count': 0,
+        'duration_sum': 0.0,
+        'queries': 0,
+        'query_seconds': 0.0,
+        'response_bytes': 0,
+    }
+
+
+class MetricsRegistry:
+    """
+    Số liệu của từng route (url name) và method, và số lần hit/miss của từng cache,
+    cộng dồn trong process.
+    Khi có settings.METRICS_DIR, mỗi worker ghi số liệu của mình ra metrics-<pid>.json
+    (tối đa mỗi METRICS_FLUSH_INTERVAL giây) và render() cộng số liệu của mọi worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._caches = {}
+        self._flushed_at = time.monotonic()
+
+    def record(self, route, method, status_code, duration, stats, response_bytes):
+        with self._lock:
+            series = self._series.get((route, method))
+            if series is None:
+                series = self._series[(route, method)] = _new_series()
+            status_key = str(status_code)
+            series['requests'][status_key] = series['requests'].get(status_key, 0) + 1
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    series['buckets'][index] += 1
+                    break
+            series['duration_count'] += 1
+            series['duration_sum'] += duration
+            series['queries'] += stats.queries
+            series['query_seconds'] += stats.query_seconds
+            series['response_bytes'] += response_bytes
+        self.maybe_flush()
+
+    def record_cache(self, name, hit):
+        with self._lock:
+            counts = self._caches.get(name)
+            if counts is None:
+                counts = self._caches[name] = {'hit': 0, 'miss': 0}
+            counts['hit' if hit else 'miss'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'routes': [
+                    {'route': route, 'method': method, **copy.deepcopy(series)}
+                    for (route, method), series in self._series.items()
+                ],
+                'caches': copy.deepcopy(self._caches),
+            }
+
+    def maybe_flush(self):
+        if not settings.METRICS_DIR:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._flushed_at < settings.METRICS_FLUSH_INTERVAL:
+                return
+            self._flushed_at = now
+        self.flush()
+
+    def flush(self):
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'metrics-{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(self.snapshot(), file)
+        # Ghi nguyên tử để worker khác không đọc phải file ghi dở
+        os.replace(temp_path, path)
+
+    def collect(self):
+        """
+        Số liệu của mọi worker (file trong METRICS_DIR), hoặc chỉ của process này.
+        """
+        if not settings.METRICS_DIR:
+            return self._merge([self.snapshot()])
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics-*.json')):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            # Bỏ qua file của phiên bản cũ (danh sách route, chưa có số liệu cache)
+            if isinstance(snapshot, dict):
+                snapshots.append(snapshot)
+        return self._merge(snapshots)
+
+    @staticmethod
+    def _merge(snapshots):
+        """
+        Cộng các snapshot: ({(route, method): series}, {cache: {'hit': n, 'miss': n}}).
+        """
+        merged, caches = {}, {}
+        for snapshot in snapshots:
+            for name, counts in snapshot.get('caches', {}).items():
+                total = caches.setdefault(name, {'hit': 0, 'miss': 0})
+                for result, count in counts.items():
+                    total[result] = total.get(result, 0) + count
+            for item in snapshot.get('routes', []):
+                key = (item['route'], item['method'])
+                series = merged.get(key)
+                if series is None:
+                    series = merged[key] = _new_series()
+                for status_key, count in item['requests'].items():
+                    series['requests'][status_key] = series['requests'].get(status_key, 0) + count
+                series['buckets'] = [a + b for a, b in zip(series['buckets'], item['buckets'])]
+                for name in ('duration_count', 'duration_sum', 'queries', 'query_seconds', 'response_bytes'):
+                    series[name] += item[name]
+        return merged, caches
+
+    def render(self):
+        """
+        Số liệu theo định dạng text của Prometheus (version 0.0.4).
+        """
+        routes, caches = self.collect()
+        merged = sorted(routes.items())
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        header('crm_http_requests_total', 'counter', 'Total HTTP requests by route, method and status.')
+        for (route, method), series in merged:
+            for status_key, count in sorted(series['requests'].items()):
+                lines.append(f'crm_http_requests_total{{{_labels(route, method)},status="{status_key}"}} {count}')
+
+        header('crm_http_request_duration_seconds', 'histogram', 'HTTP request latency in seconds.')
+        for (route, method), series in merged:
+            labels = _labels(route, method)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, series['buckets']):
+                cumulative += count
+                lines.append(f'crm_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'crm_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series["duration_count"]}')
+            lines.append(f'crm_http_request_duration_seconds_sum{{{labels}}} {series["duration_sum"]}')
+            lines.append(f'crm_http_request_duration_seconds_count{{{labels}}} {series["duration_count"]}')
+
+        header('crm_http_db_queries_total', 'counter', 'SQL queries executed while handling requests.')
+        for (route, method), series in merged:
+            lines.append(f'crm_http_db_queries_total{{{_labels(route, method)}}} {series["queries"]}')
+
+        header('crm_http_db_query_seconds_total', 'counter', 'Time spent in SQL queries while handling requests.')
+        for (route, method), series in merged:
+            lines.append(f'crm_http_db_query_seconds_total{{{_labels(route, method)}}} {series["query_seconds"]}')
+
+        header('crm_http_response_size_bytes_total', 'counter', 'Total size of response bodies in bytes.')
+        for (route, method), series in merged:
+            lines.append(f'crm_http_response_size_bytes_total{{{_labels(route, method)}}} {series["response_bytes"]}')
+
+        header('crm_cache_requests_total', 'counter', 'Cache lookups by cache and result (hit or miss).')
+        for name, counts in sorted(caches.items()):
+            for result, count in sorted(counts.items()):
+                lines.append(f'crm_cache_requests_total{{cache="{_escape(name)}",result="{result}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(route, method):
+    return f'route="{_escape(route)}",method="{_escape(method)}"'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,147 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+from .budgets import check_budget
+from .routers import end_request, pin, start_request
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Cho ReplicaRouter biết request hiện tại có được đọc từ replica không, và pin client
+    vào database chính sau khi request ghi dữ liệu. Không dùng khi không cấu hình replica.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = start_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        state, token = start_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            pin(request, response)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Ghi số liệu của từng request theo route (url name, ví dụ task-list): số request,
+    độ trễ, số query và thời gian SQL, kích thước response. Xem /api/metrics.
+    Nên đặt đầu tiên trong MIDDLEWARE để đo cả thời gian của các middleware khác.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self._record(request, response, started, stats)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self._record(request, response, started, stats)
+
+    def _record(self, request, response, started, stats):
+        match = request.resolver_match
+        # Request không khớp URL nào gom chung một route để không tạo vô số series
+        route = (match.url_name or match.route) if match is not None else 'unmatched'
+
+        def record(size):
+            metrics.registry.record(
+                route, request.method, response.status_code, time.perf_counter() - started, stats, size
+            )
+
+        if not response.streaming:
+            record(len(response.content))
+        elif response.is_async:
+            response.streaming_content = _acount(response.streaming_content, record)
+        else:
+            # Ghi khi đã gửi xong; query chạy trong lúc stream không được tính vào request
+            response.streaming_content = _count(response.streaming_content, record)
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Kiểm tra số query của request với max_queries của view (xem base.budgets.check_budget).
+    Phải đặt sau MetricsMiddleware trong MIDDLEWARE vì dùng số query mà middleware đó đếm.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        check_budget(request, metrics.current_stats())
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        check_budget(request, metrics.current_stats())
+        return response
+
+
+def _count(content, record):
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        record(size)
+
+
+async def _acount(content, record):
+    size = 0
+    try:
+        async for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        record(size)
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-17 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='scope',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'scope', 'deleted_at'], name='tombstone_model_scope_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+from functools import partial
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 class ActiveManager(models.Manager):
     def get_queryset(self):
@@ -13,10 +17,21 @@ class Profile(models.Model):
     objects = models.Manager()  
     active_objects = ActiveManager() 
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # User lúc đọc từ database, để biết profile được gắn cho user khác khi lưu
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        return instance
+
     def soft_delete(self):
         self.is_active = False
         self.save()
 
+    async def asoft_delete(self):
+        self.is_active = False
+        await self.asave()
+
     class Meta:
         abstract = True
         verbose_name = 'Profile'
@@ -40,6 +55,33 @@ class Employee(Profile):
     def __str__(self):
         return f"Employee: {self.user.username}"
 
+    @classmethod
+    def id_for_user(cls, user):
+        """
+        Id của Employee gắn với user (None nếu user không phải nhân viên).
+        Kết quả được nhớ trên object user nên mỗi request chỉ query một lần,
+        và không cần query khi user được dựng từ claim của JWT.
+        """
+        claims = getattr(user, 'token', None)
+        if claims is not None:
+            # TokenUser (JWT_STATELESS_AUTH): id Employee nằm sẵn trong claim
+            return claims.get('employee_id')
+        if not hasattr(user, '_employee_id'):
+            user._employee_id = cls.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+        return user._employee_id
+
+    @classmethod
+    async def aid_for_user(cls, user):
+        """
+        Bản async của id_for_user().
+        """
+        claims = getattr(user, 'token', None)
+        if claims is not None:
+            return claims.get('employee_id')
+        if not hasattr(user, '_employee_id'):
+            user._employee_id = await cls.objects.filter(user_id=user.pk).values_list('id', flat=True).afirst()
+        return user._employee_id
+
 class Product(models.Model):
     name = models.CharField(max_length=100)
     price = models.FloatField()
@@ -50,6 +92,12 @@ class Product(models.Model):
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='product_updated_id_idx'),
+        ]
 
     def __str__(self):
         return f"Product: {self.name}"
@@ -72,6 +120,155 @@ class Task(models.Model):
     class Meta:
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='task_created_id_idx'),
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='task_assignee_status_due_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nhân viên được phân công lúc đọc từ database, để biết Task bị phân công lại khi lưu
+        instance._loaded_assigned_to_id = instance.__dict__.get('assigned_to_id')
+        return instance
+
+    @staticmethod
+    def assignee_scope(employee_id):
+        """
+        Scope của danh sách Task của một nhân viên (ETag của danh sách, Tombstone).
+        """
+        return f'employee:{employee_id}'
+
+class Tombstone(models.Model):
+    """
+    Bản ghi của một object đã bị xóa, để client đồng bộ theo ?updated_since= biết cần xóa
+    những id nào. Được xóa sau TOMBSTONE_RETENTION_DAYS ngày (lệnh purge_tombstones).
+
+    `scope` giới hạn những ai nhận được id khi đồng bộ (ví dụ Task của một nhân viên, kể cả
+    khi Task bị phân công cho người khác); rỗng là mọi người.
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    scope = models.CharField(max_length=100, blank=True, default='')
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx'),
+            models.Index(fields=['model', 'scope', 'deleted_at'], name='tombstone_model_scope_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+    @classmethod
+    def record(cls, instance, scope=''):
+        cls.objects.create(model=instance._meta.label_lower, object_id=instance.pk, scope=scope)
+
+    @classmethod
+    def record_many(cls, model, ids, scope=''):
+        """
+        Ghi Tombstone cho nhiều id của model bằng một INSERT (xóa hàng loạt, base.signals.bulk_write).
+        """
+        label = model._meta.label_lower
+        now = timezone.now()
+        cls.objects.bulk_create([cls(model=label, object_id=pk, scope=scope, deleted_at=now) for pk in ids])
+
+    @classmethod
+    def deleted_since(cls, model, since, scope=None, visible=None):
+        """
+        Id (không trùng, tăng dần) của các object của model bị xóa sau thời điểm since.
+        `scope`: chỉ các Tombstone của scope đó (None là tất cả). `visible`: queryset các
+        object client đang thấy; id còn nằm trong đó (ví dụ Task được phân công lại cho
+        chính nhân viên đó) không được trả về.
+        """
+        tombstones = cls.objects.filter(model=model._meta.label_lower, deleted_at__gt=since)
+        if scope is not None:
+            tombstones = tombstones.filter(scope=scope)
+        if visible is not None:
+            tombstones = tombstones.exclude(object_id__in=visible.values('pk'))
+        return tombstones.order_by('object_id').values_list('object_id', flat=True).distinct()
+
+
+class TableVersion(models.Model):
+    """
+    Bộ đếm thay đổi của một bảng: mỗi lần một dòng được ghi hoặc xóa, version tăng và
+    changed_at là thời điểm thay đổi. ETag / Last-Modified của các API danh sách được tính
+    từ đây (một query theo khóa chính) thay vì aggregate trên các dòng của bảng.
+    """
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Table version'
+        verbose_name_plural = 'Table versions'
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.table} v{self.version}"
+
+    @classmethod
+    def bump(cls, model):
+        """
+        Ghi nhận một thay đổi của bảng.
+        """
+        table = model._meta.label_lower
+        changes = {'version': F('version') + 1, 'changed_at': timezone.now()}
+        if not cls.objects.filter(table=table).update(**changes):
+            _, created = cls.objects.get_or_create(table=table, defaults={'version': 1})
+            if not created:
+                cls.objects.filter(table=table).update(**changes)
+
+    @classmethod
+    def bump_on_commit(cls, model):
+        """
+        bump() sau khi transaction hiện tại commit (ngay lập tức nếu không ở trong transaction).
+        UPDATE dòng dùng chung của bảng chạy trong transaction riêng, rất ngắn: các writer đồng
+        thời không phải chờ khóa của dòng này cho đến khi transaction của nhau kết thúc. Giữa lúc
+        commit và lúc bump, danh sách vẫn mang version cũ (ETag / cache có thể cũ trong khoảng đó).
+        """
+        transaction.on_commit(partial(cls.bump, model))
+
+    @classmethod
+    def current(cls, model):
+        """
+        (version, changed_at) của bảng; (0, None) khi bảng chưa từng thay đổi.
+        """
+        row = cls.objects.filter(table=model._meta.label_lower).values_list('version', 'changed_at').first()
+        return row or (0, None)
+
+    @classmethod
+    async def acurrent(cls, model):
+        row = await cls.objects.filter(table=model._meta.label_lower).values_list('version', 'changed_at').afirst()
+        return row or (0, None)
+
+
+class TokenVersion(models.Model):
+    """
+    Version token của user (JWT_STATELESS_AUTH): access token mang version tại lúc cấp
+    (claim token_version) và bị thu hồi khi version tăng. Lưu trong database để mọi worker
+    thấy cùng một version; cache 'token_versions' chỉ giữ bản sao ngắn hạn. User chưa có
+    dòng nào có version 0.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='token_version')
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Token version'
+        verbose_name_plural = 'Token versions'
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+    @classmethod
+    def bump(cls, user_id):
+        if not cls.objects.filter(user_id=user_id).update(version=F('version') + 1):
+            _, created = cls.objects.get_or_create(user_id=user_id, defaults={'version': 1})
+            if not created:
+                cls.objects.filter(user_id=user_id).update(version=F('version') + 1)
@@ -0,0 +1,136 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+KEYSET_PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        name="cursor",
+        description="Opaque cursor returned as `next` by the previous page.",
+        required=False,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY
+    ),
+    OpenApiParameter(
+        name="page_size",
+        description="Number of items per page (capped by the server).",
+        required=False,
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY
+    ),
+]
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPagination:
+    """
+    Phân trang theo keyset (cursor): trang sau được lọc bằng giá trị của dòng cuối
+    trang trước thay vì OFFSET, nên không cần COUNT(*) và trang thứ N rẻ như trang đầu.
+
+    `ordering` là danh sách field (có thể có tiền tố "-"), field cuối phải là duy nhất (id).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        page_size = settings.API_PAGE_SIZE
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                page_size = int(raw)
+            except ValueError:
+                pass
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Trả về list các dòng của trang hiện tại và ghi cursor trang sau vào `next_cursor`.
+        Raise InvalidCursor nếu cursor không hợp lệ.
+        """
+        queryset, page_size = self._page_queryset(queryset, request)
+        return self._finish_page(list(queryset), page_size)
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Bản async của paginate_queryset().
+        """
+        queryset, page_size = self._page_queryset(queryset, request)
+        return self._finish_page([row async for row in queryset], page_size)
+
+    def _page_queryset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(cursor, queryset.model)
+            queryset = queryset.filter(self._after(values))
+
+        # Lấy dư một dòng để biết còn trang sau hay không
+        return queryset.order_by(*self.ordering)[:page_size + 1], page_size
+
+    def _finish_page(self, rows, page_size):
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        else:
+            self.next_cursor = None
+        return rows
+
+    def encode_cursor(self, row):
+        position = {}
+        for field in self.fields:
+            value = row[field] if isinstance(row, dict) else getattr(row, field)
+            position[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+        raw = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, model):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, ValueError):
+            raise InvalidCursor(cursor)
+        if not isinstance(position, dict) or set(position) != set(self.fields):
+            raise InvalidCursor(cursor)
+
+        values = []
+        for field in self.fields:
+            try:
+                value = model._meta.get_field(field).to_python(position[field])
+            except ValidationError:
+                raise InvalidCursor(cursor)
+            if value is None:
+                raise InvalidCursor(cursor)
+            values.append(value)
+        return values
+
+    def _after(self, values):
+        """
+        (a, b) > (x, y)  <=>  a >= x AND (a > x OR b > y)
+        Điều kiện đầu tiên giúp database quét theo range trên index.
+        """
+        lookups = [
+            (field, 'lt' if ordering.startswith('-') else 'gt')
+            for field, ordering in zip(self.fields, self.ordering)
+        ]
+        first_field, first_op = lookups[0]
+        condition = Q()
+        for index, (field, op) in enumerate(lookups):
+            step = Q(**{f'{field}__{op}': values[index]})
+            for prev_index in range(index):
+                step &= Q(**{self.fields[prev_index]: values[prev_index]})
+            condition |= step
+        return Q(**{f'{first_field}__{first_op}e': values[0]}) & condition
@@ -1,11 +1,13 @@
 from rest_framework.permissions import BasePermission
+from .models import Employee
 
 class IsAdminOrOwner(BasePermission):
     """
     Chỉ admin hoặc chủ sở hữu mới có quyền thực hiện hành động.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user.is_staff or request.user == obj.user
+        # So sánh id để không phải load obj.user (và chạy được với TokenUser)
+        return request.user.is_staff or request.user.pk == obj.user_id
 
 class IsAdmin(BasePermission):
     """
@@ -19,7 +21,10 @@ class IsAdminOrAssignedEmployee(BasePermission):
     Chỉ admin hoặc nhân viên được phân công mới có quyền thực hiện hành động.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user.is_staff or request.user == obj.assigned_to.user
+        return request.user.is_staff or obj.assigned_to_id == Employee.id_for_user(request.user)
+
+    async def ahas_object_permission(self, request, view, obj):
+        return request.user.is_staff or obj.assigned_to_id == await Employee.aid_for_user(request.user)
     
 class IsAdminOrReadOnly(BasePermission):
     """
@@ -0,0 +1,215 @@
+"""
+View danh sách / chi tiết dùng chung cho các profile (Customer, Employee), bản sync (APIView)
+và async (AsyncAPIView). Lớp con chỉ khai báo `model`, `serializer_class` và `includes`
+(?include=); message của envelope dùng tên của model.
+"""
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .async_views import AsyncAPIView, asave_serializer, json_response
+from .authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from .permissions import IsAdmin, IsAdminOrOwner
+from .resources import (
+    ListPage, object_queryset, object_payload, saved_payload, invalid_payload, not_found_payload,
+)
+from .serializers import parse_fields_and_includes, IncludedCollector
+
+
+class ProfileResource:
+    model = None
+    serializer_class = None
+    includes = None
+
+    @property
+    def name(self):
+        return self.model.__name__
+
+    def parse_request(self, request):
+        """
+        Trả về (fields, included, error) từ ?fields= và ?include=.
+        """
+        fields, includes, error = parse_fields_and_includes(request, self.serializer_class, self.includes)
+        if error is not None:
+            return None, None, error
+        return fields, IncludedCollector(includes, self.includes) if includes else None, None
+
+    def get_page(self, request):
+        """
+        Trả về (page, error): trang các profile đang hoạt động, theo id.
+        """
+        fields, included, error = self.parse_request(request)
+        if error is not None:
+            return None, error
+        return ListPage(self.model.active_objects.all(), self.serializer_class, ('id',), fields, included), None
+
+    def get_queryset(self, fields=None, included=None):
+        # user_id luôn được đọc để kiểm tra quyền (IsAdminOrOwner) không cần thêm query
+        return object_queryset(self.model.active_objects.all(), self.serializer_class, fields, included, ('user',))
+
+
+class ProfileListView(ProfileResource, APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdmin]
+    max_queries = 3
+
+    def get(self, request):
+        """
+        Lấy danh sách các profile đang hoạt động (chỉ admin mới có quyền).
+        """
+        page, error = self.get_page(request)
+        if error is None:
+            rows, error = page.fetch(request)
+        if error is not None:
+            return Response(error, status=error['status'])
+        return Response(page.payload(f"{self.name}s retrieved successfully", rows), status=status.HTTP_200_OK)
+
+    def post(self, request):
+        """
+        Tạo mới profile (chỉ admin mới có quyền).
+        """
+        serializer = self.serializer_class(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(
+                saved_payload(f"{self.name} created successfully", serializer, status.HTTP_201_CREATED),
+                status=status.HTTP_201_CREATED
+            )
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileDetailView(ProfileResource, APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrOwner]
+    max_queries = 5
+
+    def get_object(self, pk, fields=None, included=None):
+        try:
+            obj = self.get_queryset(fields, included).get(pk=pk)
+        except self.model.DoesNotExist:
+            return None
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def get(self, request, pk):
+        """
+        Lấy thông tin chi tiết của một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        fields, included, error = self.parse_request(request)
+        if error is not None:
+            return Response(error, status=error['status'])
+        obj = self.get_object(pk, fields, included)
+        if obj is None:
+            return Response(not_found_payload(self.name), status=status.HTTP_404_NOT_FOUND)
+        payload = object_payload(f"{self.name} retrieved successfully", obj, self.serializer_class, fields, included)
+        return Response(payload, status=status.HTTP_200_OK)
+
+    def put(self, request, pk):
+        """
+        Cập nhật thông tin của một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        obj = self.get_object(pk)
+        if obj is None:
+            return Response(not_found_payload(self.name), status=status.HTTP_404_NOT_FOUND)
+        serializer = self.serializer_class(obj, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(saved_payload(f"{self.name} updated successfully", serializer), status=status.HTTP_200_OK)
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        """
+        Xóa mềm một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        obj = self.get_object(pk)
+        if obj is None:
+            return Response(not_found_payload(self.name), status=status.HTTP_404_NOT_FOUND)
+        obj.soft_delete()
+        return Response(
+            {"message": f"{self.name} deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status=status.HTTP_204_NO_CONTENT
+        )
+
+
+class AsyncProfileListView(ProfileResource, AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdmin]
+    max_queries = 3
+
+    async def get(self, request):
+        """
+        Lấy danh sách các profile đang hoạt động (chỉ admin mới có quyền).
+        """
+        page, error = self.get_page(request)
+        if error is None:
+            rows, error = await page.afetch(request)
+        if error is not None:
+            return json_response(error, error['status'])
+        return json_response(page.payload(f"{self.name}s retrieved successfully", rows))
+
+    async def post(self, request):
+        """
+        Tạo mới profile (chỉ admin mới có quyền).
+        """
+        serializer = self.serializer_class(data=request.data)
+        if serializer.is_valid():
+            await asave_serializer(serializer)
+            return json_response(
+                saved_payload(f"{self.name} created successfully", serializer, status.HTTP_201_CREATED),
+                status.HTTP_201_CREATED
+            )
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncProfileDetailView(ProfileResource, AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrOwner]
+    max_queries = 5
+
+    async def get_object(self, pk, fields=None, included=None):
+        try:
+            obj = await self.get_queryset(fields, included).aget(pk=pk)
+        except self.model.DoesNotExist:
+            return None
+        await self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def get(self, request, pk):
+        """
+        Lấy thông tin chi tiết của một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        fields, included, error = self.parse_request(request)
+        if error is not None:
+            return json_response(error, error['status'])
+        obj = await self.get_object(pk, fields, included)
+        if obj is None:
+            return json_response(not_found_payload(self.name), status.HTTP_404_NOT_FOUND)
+        return json_response(
+            object_payload(f"{self.name} retrieved successfully", obj, self.serializer_class, fields, included)
+        )
+
+    async def put(self, request, pk):
+        """
+        Cập nhật thông tin của một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        obj = await self.get_object(pk)
+        if obj is None:
+            return json_response(not_found_payload(self.name), status.HTTP_404_NOT_FOUND)
+        serializer = self.serializer_class(obj, data=request.data, partial=True)
+        if serializer.is_valid():
+            await asave_serializer(serializer)
+            return json_response(saved_payload(f"{self.name} updated successfully", serializer))
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, pk):
+        """
+        Xóa mềm một profile (chỉ admin hoặc chủ sở hữu mới có quyền).
+        """
+        obj = await self.get_object(pk)
+        if obj is None:
+            return json_response(not_found_payload(self.name), status.HTTP_404_NOT_FOUND)
+        await obj.asoft_delete()
+        return json_response(
+            {"message": f"{self.name} deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status.HTTP_204_NO_CONTENT
+        )
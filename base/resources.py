@@ -0,0 +1,203 @@
+"""
+Phần chung của các view sync (APIView) và async (AsyncAPIView, CRM/urls_async.py): các hàm
+và lớp ở đây không đọc database (trừ fetch() / afetch()) và trả về envelope có "status",
+view sync trả về Response(payload, status=payload['status']), view async
+json_response(payload, payload['status']).
+
+Handler có nhiều bước đọc database viết một lần dưới dạng flow (generator): mỗi thao tác I/O
+là một `yield Step(sync_func, async_func, *args)` và flow trả về Result (hoặc response 304 /
+streaming). View sync chạy flow bằng run(), view async bằng arun(), rồi dựng response bằng
+render() nên hai bản không thể khác nhau.
+"""
+from inspect import isawaitable
+
+from django.http import HttpResponseBase
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import object_validators, conditional_response, set_validators
+from .pagination import KeysetPagination, InvalidCursor
+from .serializers import projection_for
+
+
+def error_payload(message, status_code, errors=None):
+    payload = {"message": message}
+    if errors is not None:
+        payload["errors"] = errors
+    payload["status"] = status_code
+    return payload
+
+
+def invalid_payload(errors, message="Invalid data"):
+    return error_payload(message, status.HTTP_400_BAD_REQUEST, errors)
+
+
+def not_found_payload(name):
+    return error_payload(f"{name} not found", status.HTTP_404_NOT_FOUND)
+
+
+class Step:
+    """
+    Một thao tác I/O của flow: view sync gọi func, view async gọi afunc (await nếu kết quả
+    là awaitable, ví dụ astream_list_response() trả về response).
+    """
+    __slots__ = ('func', 'afunc', 'args', 'kwargs')
+
+    def __init__(self, func, afunc, *args, **kwargs):
+        self.func = func
+        self.afunc = afunc
+        self.args = args
+        self.kwargs = kwargs
+
+
+class Result:
+    """
+    Kết quả của flow: envelope (status lấy từ payload['status']), ETag / Last-Modified và
+    các header khác của response.
+    """
+    __slots__ = ('payload', 'etag', 'last_modified', 'headers')
+
+    def __init__(self, payload, etag=None, last_modified=None, headers=None):
+        self.payload = payload
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers or {}
+
+
+def run(flow):
+    """
+    Chạy flow trong view sync.
+    """
+    try:
+        step = next(flow)
+        while True:
+            step = flow.send(step.func(*step.args, **step.kwargs))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun(flow):
+    """
+    Chạy flow trong view async.
+    """
+    try:
+        step = next(flow)
+        while True:
+            value = step.afunc(*step.args, **step.kwargs)
+            step = flow.send(await value if isawaitable(value) else value)
+    except StopIteration as stop:
+        return stop.value
+
+
+def rest_response(payload, status_code=status.HTTP_200_OK):
+    return Response(payload, status=status_code)
+
+
+def render(result, make_response):
+    """
+    Response của kết quả flow: make_response là rest_response (view sync) hoặc
+    base.async_views.json_response (view async).
+    """
+    if isinstance(result, HttpResponseBase):
+        return result
+    response = make_response(result.payload, result.payload['status'])
+    for name, value in result.headers.items():
+        response.headers[name] = value
+    return set_validators(response, result.etag, result.last_modified)
+
+
+class ListPage:
+    """
+    Một trang của API danh sách: queryset values() gồm các cột của serializer (?fields=),
+    của KeysetPagination và của ?include=. Đọc trang bằng fetch() (sync) hoặc afetch()
+    (async) rồi dựng envelope bằng payload().
+    """
+
+    def __init__(self, queryset, serializer_class, ordering, fields=None, included=None):
+        self.paginator = KeysetPagination(ordering=ordering)
+        self.projection = projection_for(serializer_class, fields)
+        self.included = included
+        extra_columns = included.columns if included is not None else ()
+        self.queryset = self.projection.values(queryset, *self.paginator.fields, *extra_columns)
+
+    @property
+    def next_cursor(self):
+        return self.paginator.next_cursor
+
+    def fetch(self, request):
+        """
+        Trả về (rows, error): error là envelope 400 khi cursor không hợp lệ.
+        """
+        try:
+            return self.paginator.paginate_queryset(self.queryset, request), None
+        except InvalidCursor:
+            return None, error_payload("Invalid cursor", status.HTTP_400_BAD_REQUEST)
+
+    async def afetch(self, request):
+        """
+        Bản async của fetch().
+        """
+        try:
+            return await self.paginator.apaginate_queryset(self.queryset, request), None
+        except InvalidCursor:
+            return None, error_payload("Invalid cursor", status.HTTP_400_BAD_REQUEST)
+
+    def payload(self, message, rows, delta=None):
+        """
+        Envelope của trang: "data", "included" (nếu có ?include=), "next" và các khóa
+        của `delta` (đồng bộ với updated_since).
+        """
+        payload = {
+            "message": message,
+            "data": self.projection.to_representation_many(rows)
+        }
+        if self.included is not None:
+            self.included.add_rows(rows)
+            payload["included"] = self.included.data
+        payload["next"] = self.paginator.next_cursor
+        if delta is not None:
+            payload.update(delta)
+        payload["status"] = status.HTTP_200_OK
+        return payload
+
+
+def object_queryset(queryset, serializer_class, fields=None, included=None, columns=()):
+    """
+    Queryset của view chi tiết: select_related các quan hệ của ?include= và, khi có ?fields=,
+    chỉ đọc các cột được yêu cầu cùng `columns` (cột view luôn cần: updated_at cho ETag,
+    khóa ngoại cho kiểm tra quyền trên object).
+    """
+    extra_columns = tuple(columns)
+    if included is not None:
+        queryset = queryset.select_related(*included.select_related)
+        extra_columns += tuple(included.columns)
+    if fields is not None:
+        queryset = projection_for(serializer_class, fields).only(queryset, *extra_columns)
+    return queryset
+
+
+def object_conditional(request, obj, included=None):
+    """
+    Trả về (etag, last_modified, response): response là 304 nếu client đã có bản mới nhất.
+    Object trong "included" không có updated_at nên không có ETag khi dùng ?include=.
+    """
+    if included is not None:
+        return None, None, None
+    etag, last_modified = object_validators(request, obj)
+    return etag, last_modified, conditional_response(request, etag, last_modified)
+
+
+def object_payload(message, obj, serializer_class, fields=None, included=None):
+    payload = {
+        "message": message,
+        "data": serializer_class(obj, fields=fields).data
+    }
+    if included is not None:
+        included.add_object(obj)
+        payload["included"] = included.data
+    payload["status"] = status.HTTP_200_OK
+    return payload
+
+
+def saved_payload(message, serializer, status_code=status.HTTP_200_OK):
+    return {"message": message, "data": serializer.data, "status": status_code}
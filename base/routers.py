@@ -0,0 +1,136 @@
+import itertools
+import math
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+PIN_COOKIE = 'db_pin_primary'
+# Client không dùng cookie gửi lại giá trị của header này ở các request sau
+PIN_HEADER = 'X-DB-Pin'
+PIN_SALT = 'base.routers.pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """
+    Trạng thái định tuyến của request hiện tại (lưu trong contextvar nên dùng được
+    cho cả view sync và async).
+    """
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def is_pinned(request):
+    """
+    Request có pin (cookie hoặc header X-DB-Pin) còn hạn. Pin được ký bằng SECRET_KEY kèm thời
+    điểm tạo nên worker nào cũng kiểm tra được mà không cần trạng thái dùng chung.
+    """
+    value = request.COOKIES.get(PIN_COOKIE) or request.headers.get(PIN_HEADER)
+    if not value:
+        return False
+    try:
+        signing.TimestampSigner(salt=PIN_SALT).unsign(value, max_age=settings.REPLICA_PIN_SECONDS)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def pin(request, response):
+    """
+    Giữ client ở database chính trong REPLICA_PIN_SECONDS giây để đọc được ngay dữ liệu vừa ghi.
+    """
+    value = signing.TimestampSigner(salt=PIN_SALT).sign('primary')
+    response.set_cookie(PIN_COOKIE, value, max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+    response.headers[PIN_HEADER] = value
+
+
+def start_request(request):
+    """
+    Bắt đầu định tuyến cho request: chỉ GET/HEAD/OPTIONS của client không bị pin được đọc từ replica.
+    Trả về (state, token); token dùng cho end_request.
+    """
+    state = RoutingState(use_replica=request.method in SAFE_METHODS and not is_pinned(request))
+    return state, _routing.set(state)
+
+
+def end_request(token):
+    _routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Ghi luôn vào database chính; đọc từ replica (round-robin hoặc độ trễ thấp nhất) khi
+    request hiện tại cho phép (xem ReplicaRoutingMiddleware). Ngoài request (shell, command),
+    trong transaction, hoặc sau khi request đã ghi thì đọc từ database chính.
+    """
+
+    def __init__(self, replicas=None):
+        # `replicas`: alias của các replica, mặc định là mọi database khác default
+        if replicas is None:
+            replicas = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+        self.replicas = list(replicas)
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._checked_at = None
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (
+            not self.replicas
+            or state is None
+            or not state.use_replica
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if settings.REPLICA_STRATEGY == 'least_latency':
+            return self._least_latency()
+        with self._lock:
+            return next(self._cycle)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # Các lần đọc sau đó trong request phải thấy dữ liệu vừa ghi
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica chứa cùng dữ liệu với database chính
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replica nhận schema qua replication
+        return db == DEFAULT_DB_ALIAS
+
+    def _least_latency(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = self._checked_at is None or now - self._checked_at >= settings.REPLICA_LATENCY_CHECK_INTERVAL
+            if stale:
+                self._checked_at = now
+        if stale:
+            self._latencies = {alias: self._ping(alias) for alias in self.replicas}
+        alias = min(self.replicas, key=lambda alias: self._latencies.get(alias, 0))
+        # Không replica nào trả lời được thì đọc từ database chính
+        return DEFAULT_DB_ALIAS if self._latencies.get(alias) == math.inf else alias
+
+    @staticmethod
+    def _ping(alias):
+        started = time.perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return math.inf
+        return time.perf_counter() - started
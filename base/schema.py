@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.utils.http import quote_etag
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+# Định dạng schema -> (renderer, content type), giống content negotiation của SpectacularAPIView
+FORMATS = {
+    'yaml': (OpenApiYamlRenderer, 'application/vnd.oai.openapi'),
+    'json': (OpenApiJsonRenderer, 'application/vnd.oai.openapi+json'),
+}
+
+_lock = threading.Lock()
+_schemas = {}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Phiên bản mã nguồn quyết định nội dung schema: settings.CODE_VERSION nếu được đặt
+    (ví dụ git commit lúc deploy), ngược lại là hash của các file .py trong project
+    cùng phiên bản Django, DRF và drf-spectacular.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(config.path).resolve() for config in apps.get_app_configs()}
+    roots.add(base_dir / settings.ROOT_URLCONF.split('.')[0])
+    digest = hashlib.sha256(
+        f'{django.__version__}|{rest_framework.__version__}|{drf_spectacular.__version__}'.encode()
+    )
+    files = sorted(
+        path for root in roots if root.is_relative_to(base_dir) for path in root.rglob('*.py')
+    )
+    for path in files:
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt, version=None):
+    return Path(settings.SCHEMA_DIR) / f'schema-{version or code_version()}.{fmt}'
+
+
+def build_schema():
+    """
+    Sinh schema OpenAPI (mọi định dạng) cho phiên bản mã nguồn hiện tại và ghi ra
+    settings.SCHEMA_DIR, xóa file của các phiên bản cũ. Trả về danh sách file đã ghi.
+    """
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    version = code_version()
+    directory = Path(settings.SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt, (renderer_class, _) in FORMATS.items():
+        path = schema_path(fmt, version)
+        # Ghi file tạm rồi đổi tên để worker khác không đọc phải file dở dang
+        temporary = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        temporary.write_bytes(renderer_class().render(schema, renderer_context={}))
+        os.replace(temporary, path)
+        written.append(path)
+    for path in directory.glob('schema-*'):
+        if path not in written:
+            path.unlink(missing_ok=True)
+    return written
+
+
+def get_schema(fmt):
+    """
+    (nội dung, ETag) của schema ở định dạng fmt cho phiên bản mã nguồn hiện tại.
+    Đọc từ file của build_schema (chạy khi build/khởi động); nếu chưa có thì sinh một lần
+    rồi giữ trong bộ nhớ của process.
+    """
+    cached = _schemas.get(fmt)
+    if cached is not None:
+        return cached
+    with _lock:
+        if fmt not in _schemas:
+            path = schema_path(fmt)
+            if not path.exists():
+                build_schema()
+            body = path.read_bytes()
+            etag = quote_etag(f'{code_version()}-{hashlib.md5(body, usedforsecurity=False).hexdigest()}')
+            _schemas[fmt] = (body, etag)
+    return _schemas[fmt]
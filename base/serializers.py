@@ -1 +1,316 @@
-from . models import Customer, Employee, Product, Task
\ No newline at end of file
+import datetime
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import ISO_8601, relations, serializers, status
+from rest_framework.settings import api_settings
+
+from . models import Customer, Employee, Product, Task
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    description="Comma-separated list of fields to return (e.g. `id,name,price`). Defaults to all fields.",
+    required=False,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY
+)
+
+
+class InvalidFields(Exception):
+    def __init__(self, fields):
+        super().__init__(fields)
+        self.fields = fields
+
+
+class DynamicFieldsMixin:
+    """
+    ModelSerializer nhận thêm tham số `fields` để chỉ trả về một phần các field (?fields=).
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def requested_fields(request, serializer_class):
+    """
+    Danh sách field trong ?fields= (theo thứ tự của serializer), None nếu không có.
+    Raise InvalidFields nếu có field không tồn tại trong serializer.
+    """
+    raw = request.query_params.get('fields', '')
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    if not names:
+        return None
+    available = projection_for(serializer_class).names
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidFields(unknown)
+    return tuple(name for name in available if name in names)
+
+
+# Hàm chuyển giá trị từ .values() sang giá trị JSON, cho ra kết quả giống
+# field.to_representation(). None nghĩa là giữ nguyên giá trị.
+_FAST_CONVERTERS = (
+    (serializers.BooleanField, bool),
+    (serializers.FloatField, float),
+    (serializers.IntegerField, None),
+    (serializers.CharField, None),
+    (serializers.ChoiceField, None),
+)
+
+# Các field không đọc được từ một cột của .values()
+_UNSUPPORTED_FIELDS = (
+    serializers.BaseSerializer,
+    serializers.SerializerMethodField,
+    serializers.HiddenField,
+    relations.ManyRelatedField,
+)
+
+
+def _is_iso_8601(field, default_format):
+    output_format = getattr(field, 'format', default_format)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _datetime_converter(field):
+    """
+    Giống DateTimeField.to_representation (định dạng ISO 8601) nhưng chỉ lấy timezone
+    một lần cho cả lô dữ liệu thay vì mỗi giá trị. Giá trị naive hoặc lỗi thì để DRF xử lý.
+    """
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime.datetime) or not timezone.is_aware(value):
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+class ValuesProjection:
+    """
+    Đường đọc nhanh cho các API danh sách: lấy dữ liệu bằng queryset.values() đúng các
+    field của ModelSerializer rồi chuyển từng cột bằng hàm đã chọn sẵn, không tạo model
+    object và không duyệt các field của DRF cho mỗi dòng.
+
+    Kết quả giống hệt serializer_class(obj).data. Chỉ hỗ trợ serializer có các field
+    đọc từ cột (kể cả khóa ngoại dạng id); field khác sẽ raise ImproperlyConfigured.
+    `fields` giới hạn các field được đọc và trả về (?fields=).
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.names = []
+        self.columns = []
+        self.converters = []
+        # Field DateTime cần timezone hiện tại, hàm chuyển được tạo lại cho mỗi lô dữ liệu
+        self.datetime_fields = []
+        for field in serializer_class().fields.values():
+            if field.write_only or (fields is not None and field.field_name not in fields):
+                continue
+            self.names.append(field.field_name)
+            self.columns.append(self._column(serializer_class, field))
+            self.converters.append(self._converter(serializer_class, field))
+            if isinstance(field, serializers.DateTimeField) and _is_iso_8601(field, api_settings.DATETIME_FORMAT):
+                self.datetime_fields.append((len(self.converters) - 1, field))
+
+    @staticmethod
+    def _column(serializer_class, field):
+        if field.source == '*' or isinstance(field, _UNSUPPORTED_FIELDS):
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{field.field_name} cannot be read with values()"
+            )
+        return field.source.replace('.', '__')
+
+    @staticmethod
+    def _converter(serializer_class, field):
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            # values() trả về id của khóa ngoại, giống PKOnlyObject của DRF
+            if field.pk_field is not None:
+                return field.pk_field.to_representation
+            return None
+        if isinstance(field, relations.RelatedField):
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{field.field_name} cannot be read with values()"
+            )
+        for field_class, converter in _FAST_CONVERTERS:
+            if isinstance(field, field_class):
+                return converter
+        if (
+            isinstance(field, serializers.DateField)
+            and not isinstance(field, serializers.DateTimeField)
+            and _is_iso_8601(field, api_settings.DATE_FORMAT)
+        ):
+            return datetime.date.isoformat
+        # DateTimeField, DecimalField, ...: dùng đúng định dạng của DRF
+        return field.to_representation
+
+    def values(self, queryset, *extra_columns):
+        """
+        queryset.values() gồm các cột của serializer và `extra_columns`
+        (ví dụ field sắp xếp của KeysetPagination).
+        """
+        columns = self.columns + [column for column in extra_columns if column not in self.columns]
+        return queryset.values(*columns)
+
+    def only(self, queryset, *extra_columns):
+        """
+        queryset.only() các cột của serializer và `extra_columns`, để không đọc
+        các cột không được yêu cầu (ví dụ TEXT lớn) khi lấy model object.
+        """
+        return queryset.only(*self.columns, *extra_columns)
+
+    def bind_converters(self):
+        """
+        Danh sách hàm chuyển cho một lô dữ liệu (dùng timezone đang active).
+        """
+        converters = list(self.converters)
+        for index, field in self.datetime_fields:
+            converters[index] = _datetime_converter(field)
+        return converters
+
+    def to_representation(self, row, converters=None):
+        if converters is None:
+            converters = self.bind_converters()
+        data = {}
+        for name, column, converter in zip(self.names, self.columns, converters):
+            value = row[column]
+            if value is not None and converter is not None:
+                value = converter(value)
+            data[name] = value
+        return data
+
+    def to_representation_many(self, rows):
+        converters = self.bind_converters()
+        return [self.to_representation(row, converters) for row in rows]
+
+
+@lru_cache(maxsize=1024)
+def projection_for(serializer_class, fields=None):
+    return ValuesProjection(serializer_class, fields)
+
+
+INCLUDE_PARAMETER = OpenApiParameter(
+    name="include",
+    description=(
+        "Comma-separated related objects to embed once each in the `included` section "
+        "(e.g. `assigned_to,assigned_to.user`). Including a nested path also includes its parents."
+    ),
+    required=False,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY
+)
+
+
+class InvalidInclude(Exception):
+    def __init__(self, paths):
+        super().__init__(paths)
+        self.paths = paths
+
+
+def requested_includes(request, available):
+    """
+    Các đường dẫn quan hệ trong ?include= (kèm đường dẫn cha, theo thứ tự của `available`),
+    None nếu không có. `available`: {đường dẫn: (tên nhóm trong "included", serializer)}.
+    Raise InvalidInclude nếu có đường dẫn không được hỗ trợ.
+    """
+    raw = request.query_params.get('include', '')
+    paths = [path.strip() for path in raw.split(',') if path.strip()]
+    if not paths:
+        return None
+    unknown = [path for path in paths if path not in available]
+    if unknown:
+        raise InvalidInclude(unknown)
+    return tuple(
+        path for path in available
+        if any(requested == path or requested.startswith(path + '.') for requested in paths)
+    )
+
+
+def parse_fields_and_includes(request, serializer_class, available=None):
+    """
+    Đọc ?fields= và ?include= (khi có `available`) của request.
+    Trả về (fields, includes, error): error là envelope 400 khi có field hoặc đường dẫn không
+    hợp lệ (view trả về nguyên envelope đó), ngược lại là None.
+    """
+    try:
+        fields = requested_fields(request, serializer_class)
+    except InvalidFields as exc:
+        return None, None, {
+            "message": "Invalid fields",
+            "errors": {"fields": [f"Unknown field: {name}" for name in exc.fields]},
+            "status": status.HTTP_400_BAD_REQUEST
+        }
+    if available is None:
+        return fields, None, None
+    try:
+        includes = requested_includes(request, available)
+    except InvalidInclude as exc:
+        return None, None, {
+            "message": "Invalid include",
+            "errors": {"include": [f"Unknown include: {path}" for path in exc.paths]},
+            "status": status.HTTP_400_BAD_REQUEST
+        }
+    return fields, includes, None
+
+
+class IncludedCollector:
+    """
+    Gom các object liên quan (?include=) vào phần "included" của envelope, mỗi object một lần
+    dù được nhiều dòng tham chiếu.
+
+    Danh sách đọc bằng values(): thêm `columns` vào values() để các cột của object liên quan
+    được lấy trong cùng query (JOIN) rồi gọi add_rows(). Model object: dùng
+    select_related(*select_related) rồi gọi add_object().
+    """
+
+    def __init__(self, includes, available):
+        self.groups = []
+        self.select_related = []
+        self.columns = []
+        self.included = {}
+        for path in includes:
+            key, serializer_class = available[path]
+            lookup = path.replace('.', '__')
+            projection = projection_for(serializer_class)
+            columns = [f'{lookup}__{column}' for column in projection.columns]
+            self.groups.append((lookup, key, projection, columns, serializer_class))
+            self.select_related.append(lookup)
+            self.columns += [column for column in [lookup] + columns if column not in self.columns]
+            self.included.setdefault(key, {})
+
+    def add_rows(self, rows):
+        for lookup, key, projection, columns, _ in self.groups:
+            objects = self.included[key]
+            converters = projection.bind_converters()
+            for row in rows:
+                pk = row[lookup]
+                if pk is None or pk in objects:
+                    continue
+                related = dict(zip(projection.columns, (row[column] for column in columns)))
+                objects[pk] = projection.to_representation(related, converters)
+
+    def add_object(self, obj):
+        for lookup, key, _, _, serializer_class in self.groups:
+            related = obj
+            for name in lookup.split('__'):
+                related = getattr(related, name) if related is not None else None
+            objects = self.included[key]
+            if related is not None and related.pk not in objects:
+                objects[related.pk] = serializer_class(related).data
+
+    @property
+    def data(self):
+        return {key: list(objects.values()) for key, objects in self.included.items()}
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import bump_token_version
+from .metrics import install_sql_timer
+from .models import Customer, Employee, Product, TableVersion, Task, Tombstone
+
+_bulk = ContextVar('bulk_write', default=False)
+
+
+@contextmanager
+def bulk_write():
+    """
+    Tắt các receiver ghi Tombstone và tăng TableVersion theo từng dòng trong khối này (một
+    INSERT và một UPDATE cho mỗi dòng bị xóa). Thao tác hàng loạt tự ghi Tombstone theo lô
+    (Tombstone.record_many) và tự tăng version một lần (TableVersion.bump_on_commit).
+    """
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, update_fields=None, **kwargs):
+    # Cập nhật last_login không làm thay đổi claim nào trong token
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_token_version(instance.pk)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Employee)
+def revoke_tokens_on_profile_change(sender, instance, created, **kwargs):
+    # Token chỉ mang id của profile (customer_id, employee_id, role): sửa phone, address,
+    # position, ... không làm thay đổi claim nào
+    previous = getattr(instance, '_loaded_user_id', None)
+    if created:
+        bump_token_version(instance.user_id)
+    elif previous is not None and previous != instance.user_id:
+        bump_token_version(previous)
+        bump_token_version(instance.user_id)
+    instance._loaded_user_id = instance.user_id
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Employee)
+def revoke_tokens_on_profile_delete(sender, instance, **kwargs):
+    bump_token_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Product)
+def record_tombstone(sender, instance, **kwargs):
+    # Kể cả khi bị xóa theo (CASCADE, QuerySet.delete()) để client đồng bộ biết id đã mất
+    if not _bulk.get():
+        Tombstone.record(instance)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, **kwargs):
+    # Chỉ nhân viên được phân công (và admin) nhận id của Task đã bị xóa
+    if not _bulk.get():
+        Tombstone.record(instance, Task.assignee_scope(instance.assigned_to_id))
+
+
+@receiver(post_save, sender=Task)
+def record_task_reassignment(sender, instance, created, **kwargs):
+    # Task bị phân công cho người khác biến mất khỏi danh sách của nhân viên cũ: ghi Tombstone
+    # cho scope của nhân viên đó. QuerySet.update() không gửi signal nên không được ghi nhận.
+    previous = getattr(instance, '_loaded_assigned_to_id', None)
+    if not created and previous is not None and previous != instance.assigned_to_id:
+        Tombstone.record(instance, Task.assignee_scope(previous))
+    instance._loaded_assigned_to_id = instance.assigned_to_id
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Task)
+def bump_table_version(sender, **kwargs):
+    # ETag / Last-Modified của danh sách (base.conditional.list_validators), sau commit
+    if not _bulk.get():
+        TableVersion.bump_on_commit(sender)
+
+
+# Đo số query và thời gian SQL của từng request (base.middleware.MetricsMiddleware)
+connection_created.connect(install_sql_timer)
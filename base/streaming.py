@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import projection_for
+
+
+STREAM_PARAMETER = OpenApiParameter(
+    name="stream",
+    description="Set to 1 to stream the whole (unpaginated) list as it is read from the database.",
+    required=False,
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY
+)
+
+
+def wants_stream(request):
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_list_response(queryset, serializer_class, message, fields=None, included=None):
+    """
+    Trả về StreamingHttpResponse với envelope {"message","data","next","status"} giống
+    Response thường, nhưng data được đọc bằng values().iterator() và serialize từng dòng
+    (ValuesProjection), nên bộ nhớ không tăng theo kích thước bảng.
+    `included` (IncludedCollector) thêm phần "included" sau data, mỗi object liên quan một lần.
+    """
+    return StreamingHttpResponse(
+        _iter_envelope(queryset, _Envelope(serializer_class, message, fields, included)),
+        content_type='application/json',
+        status=status.HTTP_200_OK
+    )
+
+
+def astream_list_response(queryset, serializer_class, message, fields=None, included=None):
+    """
+    Bản async của stream_list_response() cho view async: các dòng được đọc bằng
+    values().aiterator(). Dưới ASGI, StreamingHttpResponse với iterator sync bị đọc hết
+    vào bộ nhớ trước khi gửi.
+    """
+    return StreamingHttpResponse(
+        _aiter_envelope(queryset, _Envelope(serializer_class, message, fields, included)),
+        content_type='application/json',
+        status=status.HTTP_200_OK
+    )
+
+
+def _iter_envelope(queryset, envelope):
+    chunk_size = settings.API_STREAM_CHUNK_SIZE
+    yield envelope.start()
+    rows = []
+    for row in envelope.values(queryset).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield envelope.encode(rows)
+            rows = []
+    if rows:
+        yield envelope.encode(rows)
+    yield envelope.end()
+
+
+async def _aiter_envelope(queryset, envelope):
+    chunk_size = settings.API_STREAM_CHUNK_SIZE
+    yield envelope.start()
+    rows = []
+    async for row in envelope.values(queryset).aiterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield envelope.encode(rows)
+            rows = []
+    if rows:
+        yield envelope.encode(rows)
+    yield envelope.end()
+
+
+class _Envelope:
+    """
+    Mã hóa envelope theo từng phần: start(), encode(rows) cho mỗi lô dòng, end().
+    """
+
+    def __init__(self, serializer_class, message, fields, included):
+        # Cùng định dạng với JSONRenderer mặc định của DRF (compact, unicode)
+        self.encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        self.projection = projection_for(serializer_class, fields)
+        self.converters = self.projection.bind_converters()
+        self.message = message
+        self.included = included
+        self.separator = ''
+
+    def values(self, queryset):
+        extra_columns = self.included.columns if self.included is not None else ()
+        return self.projection.values(queryset, *extra_columns)
+
+    def start(self):
+        return ('{"message":%s,"data":[' % self.encoder.encode(self.message)).encode()
+
+    def encode(self, rows):
+        buffer = []
+        for row in rows:
+            buffer.append(self.separator + self.encoder.encode(self.projection.to_representation(row, self.converters)))
+            self.separator = ','
+        if self.included is not None:
+            self.included.add_rows(rows)
+        return ''.join(buffer).encode()
+
+    def end(self):
+        tail = ']'
+        if self.included is not None:
+            tail += ',"included":%s' % self.encoder.encode(self.included.data)
+        return (tail + ',"next":null,"status":%d}' % status.HTTP_200_OK).encode()
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Tombstone
+
+# Đồng bộ theo ?updated_since=: danh sách chỉ gồm các dòng thay đổi sau thời điểm đó, sắp xếp
+# theo (updated_at, id). Trang cuối (next = null) có thêm "deleted" (id đã bị xóa, từ Tombstone)
+# và "sync_token": giá trị updated_since cho lần đồng bộ sau. Dòng thay đổi trong lúc client
+# đang đọc các trang có updated_at lớn hơn cursor nên vẫn nằm trong các trang sau.
+
+
+class UpdatedSinceFilter(serializers.Serializer):
+    """
+    Query param updated_since của các danh sách hỗ trợ đồng bộ từng phần.
+    """
+    updated_since = serializers.DateTimeField(
+        required=False,
+        help_text="Only return items changed after this time (the sync_token of the previous sync), "
+                  "plus the ids deleted since then on the last page."
+    )
+
+    def validate_updated_since(self, value):
+        if value < timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS):
+            # Tombstone cũ hơn đã bị xóa (purge_tombstones): không biết đủ các id đã bị xóa
+            raise serializers.ValidationError("Too old, a full sync is required.")
+        return value
+
+
+def _sync_token(started):
+    # Giờ UTC với hậu tố "Z" (không có dấu "+") để dùng được trực tiếp trong query string
+    return started.isoformat().replace('+00:00', 'Z')
+
+
+def delta_payload(model, since, started, next_cursor, scope=None, visible=None):
+    """
+    Phần "deleted" và "sync_token" của envelope; started là thời điểm bắt đầu request
+    (trước mọi query). Chỉ trang cuối có giá trị. `scope` và `visible`: xem
+    Tombstone.deleted_since(), để client chỉ nhận id của các object nó từng thấy.
+    """
+    if next_cursor is not None:
+        return {"deleted": [], "sync_token": None}
+    return {
+        "deleted": list(Tombstone.deleted_since(model, since, scope, visible)),
+        "sync_token": _sync_token(started)
+    }
+
+
+async def adelta_payload(model, since, started, next_cursor, scope=None, visible=None):
+    """
+    Bản async của delta_payload().
+    """
+    if next_cursor is not None:
+        return {"deleted": [], "sync_token": None}
+    return {
+        "deleted": [pk async for pk in Tombstone.deleted_since(model, since, scope, visible)],
+        "sync_token": _sync_token(started)
+    }
@@ -0,0 +1,39 @@
+"""
+Helper cho test của các app: tạo user theo vai trò và header xác thực JWT/Basic.
+"""
+import base64
+
+from django.contrib.auth.models import User
+
+from account.serializers import ClaimsTokenObtainPairSerializer
+from .models import Customer, Employee
+
+PASSWORD = 'test-password-123'
+
+
+def create_user(username, role=None):
+    """
+    User với vai trò 'admin' (is_staff), 'employee' hoặc 'customer' (kèm profile), hoặc không có vai trò.
+    """
+    user = User.objects.create_user(username, f'{username}@example.com', PASSWORD, is_staff=role == 'admin')
+    if role == 'employee':
+        Employee.objects.create(user=user)
+    elif role == 'customer':
+        Customer.objects.create(user=user)
+    return user
+
+
+def access_token(user):
+    return str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+
+
+def bearer(user):
+    """
+    Header Authorization (access token JWT) cho Client: client.get(url, **bearer(user)).
+    """
+    return {'HTTP_AUTHORIZATION': f'Bearer {access_token(user)}'}
+
+
+def basic(user):
+    credentials = base64.b64encode(f'{user.username}:{PASSWORD}'.encode()).decode()
+    return {'HTTP_AUTHORIZATION': f'Basic {credentials}'}
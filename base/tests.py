@@ -1,3 +1,428 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from customer.serializers import CustomerSerializer
+from employee.serializers import EmployeeSerializer
+from product.serializers import ProductSerializer
+from taskboard.serializers import TaskSerializer
+from .metrics import LATENCY_BUCKETS, MetricsRegistry, RequestStats, registry
+from .models import Customer, Employee, Product, Task
+from .serializers import projection_for
+from .routers import PIN_COOKIE, PIN_HEADER, ReplicaRouter
+from .testing import bearer, create_user
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Database chính và một replica là hai file SQLite riêng: replica là bản sao chụp trước khi
+    test ghi dữ liệu, nên đọc từ replica không thấy các Product được tạo sau đó.
+    """
+
+    def setUp(self):
+        caches['catalog'].clear()
+        self.admin = create_user('admin', 'admin')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'replica.sqlite3')
+        primary = connections['default']
+        with primary.cursor() as cursor:
+            cursor.execute('VACUUM INTO %s', [path])
+        replica = type(primary)({**primary.settings_dict, 'NAME': path}, alias='replica_1')
+        connections['replica_1'] = replica
+        self.addCleanup(delattr, connections._connections, 'replica_1')
+        self.addCleanup(replica.close)
+        replica_settings = override_settings(
+            DATABASE_REPLICAS=[path], DATABASE_ROUTERS=[ReplicaRouter(replicas=['replica_1'])]
+        )
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+        Product.objects.create(name='Product A', price=1)
+
+    def products(self, client, **headers):
+        response = client.get('/api/products/', **headers)
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.json()['data']]
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.products(self.client), [])
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post(
+            '/api/products/', {'name': 'Product B', 'price': 2}, content_type='application/json',
+            **bearer(self.admin)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        pin = response.headers[PIN_HEADER]
+        self.assertEqual(response.cookies[PIN_COOKIE].value, pin)
+        # Cùng client (cookie) đọc được dữ liệu vừa ghi
+        self.assertEqual(self.products(self.client), ['Product A', 'Product B'])
+        # Client khác, không có cookie: header X-DB-Pin được kiểm tra bằng chữ ký,
+        # không phụ thuộc vào worker đã nhận request ghi
+        other = self.client_class()
+        self.assertEqual(self.products(other, HTTP_X_DB_PIN=pin), ['Product A', 'Product B'])
+        self.assertEqual(self.products(other), [])
+
+    def test_forged_pin_is_ignored(self):
+        for value in ('1', 'primary', 'primary:1:forged'):
+            self.assertEqual(self.products(self.client_class(), HTTP_X_DB_PIN=value), [])
+            self.client.cookies[PIN_COOKIE] = value
+            self.assertEqual(self.products(self.client), [])
+
+
+class ValuesProjectionTests(TestCase):
+    """
+    Các API danh sách đọc bằng values() (ValuesProjection): JSON phải giống hệt ModelSerializer.
+    Không model nào có khóa ngoại nullable; các cột nullable là phone, address, position và
+    description.
+    """
+    serializers = (
+        (ProductSerializer, Product), (TaskSerializer, Task),
+        (CustomerSerializer, Customer), (EmployeeSerializer, Employee),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = create_user('customer', 'customer').customer_profile
+        customer.phone, customer.address = None, None
+        customer.save()
+        employee = create_user('employee', 'employee').employee_profile
+        Employee.objects.filter(pk=employee.pk).update(phone='0900000000', position=None)
+        Product.objects.create(name='Product A', price=1.5, description=None)
+        product = Product.objects.create(name='Product B', price=2, description='Product')
+        # Có và không có phần micro giây, sát nửa đêm UTC (ngày khác ở TIME_ZONE)
+        Product.objects.filter(pk=product.pk).update(
+            created_at=datetime.datetime(2030, 1, 1, 23, 59, 59, tzinfo=datetime.timezone.utc),
+            updated_at=datetime.datetime(2030, 1, 1, 17, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        )
+        Task.objects.create(
+            title='Task A', description='Task', due_date=datetime.date(2030, 1, 1), assigned_to=employee
+        )
+
+    def assertSameJSON(self, fields=None):
+        render = JSONRenderer().render
+        for serializer_class, model in self.serializers:
+            with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                queryset = model.objects.order_by('pk')
+                projection = projection_for(serializer_class, fields and tuple(
+                    name for name in fields if name in serializer_class().fields
+                ))
+                rows = projection.values(queryset)
+                expected = serializer_class(queryset, many=True, fields=projection.names).data
+                self.assertEqual(render(projection.to_representation_many(rows)), render(expected))
+
+    def test_aware_datetimes(self):
+        for zone in ('UTC', 'Asia/Ho_Chi_Minh', 'America/New_York'):
+            with timezone.override(zone):
+                self.assertSameJSON()
+
+    def test_naive_datetimes(self):
+        # USE_TZ = False: values() trả về datetime naive
+        with override_settings(USE_TZ=False):
+            self.assertSameJSON()
+
+    def test_fields(self):
+        self.assertSameJSON(['id', 'price', 'user', 'created_at', 'phone', 'assigned_to'])
+
+
+class StreamingListTests(TestCase):
+    """
+    ?stream=1 trả về cùng envelope với trang duy nhất của danh sách phân trang (next = null),
+    kể cả khi dữ liệu được mã hóa qua nhiều lô (API_STREAM_CHUNK_SIZE).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        employees = [create_user(f'employee{index}', 'employee').employee_profile for index in range(3)]
+        Product.objects.bulk_create([
+            Product(name=f'Product {index}', price=index / 3, description=None if index % 2 else 'Product')
+            for index in range(7)
+        ])
+        Task.objects.bulk_create([
+            Task(
+                title=f'Task {index}', description='Task', due_date=datetime.date(2030, 1, index + 1),
+                assigned_to=employees[index % 3]
+            )
+            for index in range(7)
+        ])
+
+    @override_settings(API_STREAM_CHUNK_SIZE=2)
+    def test_same_data_as_paginated(self):
+        queries = [
+            '/api/products/', '/api/products/?ordering=-price&fields=id,price', '/api/products/?price_min=100',
+            '/api/tasks/', '/api/tasks/?include=assigned_to.user&fields=id,assigned_to', '/api/tasks/?status=done',
+        ]
+        for url in queries:
+            with self.subTest(url=url):
+                separator = '&' if '?' in url else '?'
+                paginated = self.client.get(f'{url}{separator}page_size=100', **bearer(self.admin))
+                streamed = self.client.get(f'{url}{separator}stream=1', **bearer(self.admin))
+                self.assertTrue(streamed.streaming)
+                self.assertEqual(streamed['Content-Type'], 'application/json')
+                self.assertEqual(json.loads(streamed.getvalue()), paginated.json())
+
+
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        Product.objects.create(name='Product A', price=1)
+
+    @staticmethod
+    def stats(queries, query_seconds):
+        stats = RequestStats()
+        stats.queries, stats.query_seconds = queries, query_seconds
+        return stats
+
+    def series(self, route, method='GET'):
+        for item in registry.snapshot()['routes']:
+            if (item['route'], item['method']) == (route, method):
+                return item
+        return {'requests': {}, 'duration_count': 0, 'queries': 0, 'response_bytes': 0}
+
+    def test_requests_are_recorded(self):
+        before, unmatched = self.series('product-list'), self.series('unmatched')
+        responses = [self.client.get('/api/products/') for _ in range(2)]
+        self.client.get('/api/products/?ordering=x')
+        self.client.get('/api/no-such-endpoint/')
+        after = self.series('product-list')
+        self.assertEqual(after['requests'].get('200', 0) - before['requests'].get('200', 0), 2)
+        self.assertEqual(after['requests'].get('400', 0) - before['requests'].get('400', 0), 1)
+        self.assertEqual(after['duration_count'] - before['duration_count'], 3)
+        self.assertGreaterEqual(after['queries'] - before['queries'], 2)
+        self.assertGreater(after['response_bytes'] - before['response_bytes'], sum(len(r.content) for r in responses))
+        # URL không khớp route nào được gom vào một series
+        self.assertEqual(self.series('unmatched')['duration_count'] - unmatched['duration_count'], 1)
+
+    def test_render(self):
+        metrics = MetricsRegistry()
+        metrics.record('product-list', 'GET', 200, 0.02, self.stats(3, 0.5), 100)
+        metrics.record('product-list', 'GET', 200, 7.0, self.stats(2, 0.25), 50)
+        metrics.record('product-list', 'GET', 400, 60.0, self.stats(0, 0.0), 10)
+        metrics.record('a"b', 'POST', 201, 0.001, self.stats(1, 0.0), 0)
+        metrics.record_cache('catalog', True)
+        metrics.record_cache('catalog', False)
+        metrics.record_cache('catalog', True)
+        lines = metrics.render().splitlines()
+        labels = 'route="product-list",method="GET"'
+        for line in (
+            f'crm_http_requests_total{{{labels},status="200"}} 2',
+            f'crm_http_requests_total{{{labels},status="400"}} 1',
+            f'crm_http_request_duration_seconds_bucket{{{labels},le="0.01"}} 0',
+            f'crm_http_request_duration_seconds_bucket{{{labels},le="0.025"}} 1',
+            f'crm_http_request_duration_seconds_bucket{{{labels},le="10.0"}} 2',
+            f'crm_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3',
+            f'crm_http_request_duration_seconds_sum{{{labels}}} 67.02',
+            f'crm_http_request_duration_seconds_count{{{labels}}} 3',
+            f'crm_http_db_queries_total{{{labels}}} 5',
+            f'crm_http_db_query_seconds_total{{{labels}}} 0.75',
+            f'crm_http_response_size_bytes_total{{{labels}}} 160',
+            'crm_http_requests_total{route="a\\"b",method="POST",status="201"} 1',
+            'crm_cache_requests_total{cache="catalog",result="hit"} 2',
+            'crm_cache_requests_total{cache="catalog",result="miss"} 1',
+        ):
+            self.assertIn(line, lines)
+        self.assertEqual(
+            len([line for line in lines if line.startswith(f'crm_http_request_duration_seconds_bucket{{{labels}')]),
+            len(LATENCY_BUCKETS) + 1
+        )
+        # Mỗi metric có HELP và TYPE, mọi dòng còn lại là "tên{labels} giá_trị"
+        for line in lines:
+            with self.subTest(line=line):
+                self.assertRegex(line, r'^(# (HELP|TYPE) crm_\w+ .+|crm_\w+\{.*\} [0-9.e+-]+)$')
+        self.assertEqual(len([line for line in lines if line.startswith('# TYPE')]), 6)
+
+    def test_workers_are_merged(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        other = MetricsRegistry()
+        other.record('product-list', 'GET', 200, 0.02, self.stats(3, 0.5), 100)
+        other.record_cache('catalog', False)
+        with open(os.path.join(directory, 'metrics-1.json'), 'w') as file:
+            json.dump(other.snapshot(), file)
+        # Tệp hỏng hoặc của phiên bản cũ bị bỏ qua
+        with open(os.path.join(directory, 'metrics-2.json'), 'w') as file:
+            file.write('[')
+        with override_settings(METRICS_DIR=directory):
+            metrics = MetricsRegistry()
+            metrics.record('product-list', 'GET', 200, 0.02, self.stats(1, 0.25), 10)
+            lines = metrics.render().splitlines()
+        self.assertIn('crm_http_requests_total{route="product-list",method="GET",status="200"} 2', lines)
+        self.assertIn('crm_http_db_queries_total{route="product-list",method="GET"} 4', lines)
+        self.assertIn('crm_cache_requests_total{cache="catalog",result="miss"} 1', lines)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/products/')
+        response = self.client.get('/api/metrics', **bearer(self.admin))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertRegex(response.content.decode(), r'crm_http_requests_total\{route="product-list",method="GET",status="200"\} [1-9]')
+
+
+class BatchParallelTests(TransactionTestCase):
+    # Request con chạy song song đọc dữ liệu đã commit bằng kết nối riêng của từng thread
+
+    def setUp(self):
+        self.admin = create_user('admin', 'admin')
+        Product.objects.create(name='Product A', price=1)
+
+    def batch_queries(self, parallel):
+        def queries():
+            series = [item for item in registry.snapshot()['routes'] if item['route'] == 'batch']
+            return series[0]['queries'] if series else 0
+
+        body = {
+            'requests': [{'method': 'GET', 'path': f'/api/products/?page_size={size}'} for size in range(1, 9)],
+            'parallel': parallel,
+        }
+        caches['catalog'].clear()
+        before = queries()
+        response = self.client.post('/api/batch/', body, content_type='application/json', **bearer(self.admin))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['status'] for item in response.json()['data']], [200] * 8)
+        return queries() - before
+
+    def test_parallel_queries_are_counted(self):
+        # Mỗi thread đếm vào số liệu riêng rồi được cộng vào request cha: không mất query nào
+        self.assertEqual(self.batch_queries(parallel=True), self.batch_queries(parallel=False))
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Gọi mọi API và trang danh sách của admin với từng vai trò. Test runner bật
+    QUERY_BUDGET_STRICT nên request vượt max_queries của view làm test fail
+    (QueryBudgetExceeded). Mỗi bảng có nhiều dòng để lộ các query lặp theo dòng (N+1).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.employees = [create_user(f'employee{index}', 'employee').employee_profile for index in range(3)]
+        cls.customers = [create_user(f'customer{index}', 'customer').customer_profile for index in range(3)]
+        cls.products = [
+            Product.objects.create(name=f'Product {index}', price=index, description='Product') for index in range(5)
+        ]
+        cls.tasks = [
+            Task.objects.create(
+                title=f'Task {index}', description='Task', due_date=datetime.date(2030, 1, index + 1),
+                assigned_to=employee
+            )
+            for employee in cls.employees for index in range(3)
+        ]
+        cls.users = {
+            'admin': cls.admin,
+            'employee': cls.employees[0].user,
+            'customer': cls.customers[0].user,
+        }
+
+    def request(self, role, method, url, body=None):
+        headers = bearer(self.users[role])
+        if body is None:
+            return getattr(self.client, method)(url, **headers)
+        return getattr(self.client, method)(url, body, content_type='application/json', **headers)
+
+    def assertStatuses(self, method, url, expected, body=None):
+        for role, status_code in expected.items():
+            with self.subTest(role=role, method=method, url=url):
+                response = self.request(role, method, url, body)
+                # getvalue() đọc hết cả response streaming
+                self.assertEqual(response.status_code, status_code, response.getvalue()[:500])
+
+    def test_read_endpoints(self):
+        product = self.products[0]
+        task = self.tasks[0]
+        employee = self.employees[0]
+        customer = self.customers[0]
+        since = (timezone.now() - datetime.timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        everyone = {'admin': 200, 'employee': 200, 'customer': 200}
+        admin_only = {'admin': 200, 'employee': 403, 'customer': 403}
+        reads = [
+            ('/api/products/', everyone),
+            ('/api/products/?page_size=2&fields=id,name', everyone),
+            ('/api/products/?stream=1', everyone),
+            (f'/api/products/?updated_since={since}', everyone),
+            (f'/api/products/{product.pk}/', everyone),
+            (f'/api/products/{product.pk}/?fields=id,price', everyone),
+            ('/api/products/search/?q=product', everyone),
+            ('/api/tasks/', everyone),
+            ('/api/tasks/?include=assigned_to.user&page_size=4', everyone),
+            (f'/api/tasks/?updated_since={since}', everyone),
+            ('/api/tasks/?stream=1&include=assigned_to', everyone),
+            ('/api/tasks/board/', everyone),
+            (f'/api/tasks/{task.pk}/?include=assigned_to.user', {'admin': 200, 'employee': 200, 'customer': 403}),
+            (f'/api/tasks/{self.tasks[-1].pk}/?fields=id,title', {'admin': 200, 'employee': 403, 'customer': 403}),
+            ('/api/customers/?include=user', admin_only),
+            (f'/api/customers/{customer.pk}/?include=user', {'admin': 200, 'employee': 403, 'customer': 200}),
+            (f'/api/customers/{self.customers[1].pk}/?fields=id', {'admin': 200, 'employee': 403, 'customer': 403}),
+            ('/api/employees/?include=user', admin_only),
+            (f'/api/employees/{employee.pk}/?include=user', {'admin': 200, 'employee': 200, 'customer': 403}),
+            (f'/api/employees/{self.employees[1].pk}/?fields=id', {'admin': 200, 'employee': 403, 'customer': 403}),
+            ('/api/metrics', admin_only),
+        ]
+        for url, expected in reads:
+            self.assertStatuses('get', url, expected)
+
+    def test_batch(self):
+        body = {
+            'requests': [
+                {'method': 'GET', 'path': '/api/products/'},
+                {'method': 'GET', 'path': '/api/tasks/board/'},
+            ],
+            'parallel': False,
+        }
+        self.assertStatuses('post', '/api/batch/', {'admin': 200, 'employee': 200, 'customer': 200}, body)
+
+    def test_admin_writes(self):
+        product, task = self.products[0], self.tasks[0]
+        employee = self.employees[1]
+        customer = self.customers[1]
+        task_body = {
+            'title': 'Task X', 'description': 'Task', 'due_date': '2030-02-01', 'assigned_to': employee.pk
+        }
+        writes = [
+            ('post', '/api/products/', {'name': 'Product X', 'price': 1}, 201),
+            ('put', f'/api/products/{product.pk}/', {'price': 10}, 200),
+            ('post', '/api/products/bulk/', {'update': [{'id': product.pk, 'price': 11}]}, 200),
+            ('delete', f'/api/products/{self.products[1].pk}/', None, 204),
+            ('post', '/api/tasks/', task_body, 201),
+            ('put', f'/api/tasks/{task.pk}/', {'status': 'done'}, 200),
+            ('delete', f'/api/tasks/{self.tasks[1].pk}/', None, 204),
+            ('put', f'/api/customers/{customer.pk}/', {'phone': '0900000000'}, 200),
+            ('delete', f'/api/customers/{customer.pk}/', None, 204),
+            ('put', f'/api/employees/{employee.pk}/', {'position': 'Tester'}, 200),
+            ('delete', f'/api/employees/{employee.pk}/', None, 204),
+        ]
+        for method, url, body, status_code in writes:
+            self.assertStatuses(method, url, {'admin': status_code}, body)
+
+    def test_owner_writes(self):
+        self.assertStatuses('put', f'/api/tasks/{self.tasks[0].pk}/', {'employee': 200}, {'status': 'in_progress'})
+        self.assertStatuses('put', f'/api/customers/{self.customers[0].pk}/', {'customer': 200}, {'address': 'Hanoi'})
+        self.assertStatuses('put', f'/api/employees/{self.employees[0].pk}/', {'employee': 200}, {'address': 'Hanoi'})
+
+    def test_admin_changelists(self):
+        self.client.force_login(User.objects.create_superuser('root', 'root@example.com', 'root'))
+        for model in ('customer', 'employee', 'product', 'task'):
+            for query in ('', '?q=1', '?o=1'):
+                url = f'/admin/base/{model}/{query}'
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(f'/admin/base/task/?assigned_to__id__exact={self.employees[0].pk}').status_code, 200)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessQueryBudgetTests(QueryBudgetTests):
+    # User được dựng từ claim của token: cùng ngân sách
+    pass
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import BatchView, MetricsView
+
+urlpatterns = [
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('batch/', BatchView.as_view(), name='batch'),
+]
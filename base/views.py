@@ -1,3 +1,146 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiExample
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from . import batch
+from .authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from .conditional import conditional_response, set_validators
+from .metrics import registry
+from .permissions import IsAdmin
+from .schema import FORMATS, code_version, get_schema
+
+
+class MetricsView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdmin]
+    max_queries = 1
+
+    @extend_schema(
+        description="Per-route request count, latency histogram, SQL query count/time and response size in Prometheus text format. Only admins have permission.",
+        responses={(200, 'text/plain'): OpenApiTypes.STR}
+    )
+    def get(self, request):
+        """
+        Số liệu theo route cho Prometheus (chỉ admin mới có quyền).
+        """
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class BatchView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAuthenticated]
+    # Không khai báo max_queries: số query là tổng của các request con
+
+    @extend_schema(
+        description=(
+            "Execute several API requests in one round trip. The batch is authenticated once and every "
+            "sub-request is dispatched to the regular view with the same user, so permissions apply as usual. "
+            "With `atomic`, all sub-requests run in one transaction that is rolled back at the first "
+            "response with status >= 400 (the remaining sub-requests are not executed). With `parallel`, "
+            "a batch of GET requests is executed concurrently. Responses are returned in request order."
+        ),
+        request=OpenApiTypes.OBJECT,
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                name="Example Request",
+                value={
+                    "requests": [
+                        {"method": "GET", "path": "/api/products/?page_size=10"},
+                        {"method": "GET", "path": "/api/tasks/1/", "headers": {"If-None-Match": "\"d41d8cd98f00b204\""}},
+                        {"method": "PUT", "path": "/api/tasks/2/", "body": {"status": "done"}}
+                    ],
+                    "atomic": False,
+                    "parallel": False
+                },
+                request_only=True
+            ),
+            OpenApiExample(
+                name="Example Response",
+                value={
+                    "message": "Batch processed successfully",
+                    "data": [
+                        {
+                            "status": 200,
+                            "headers": {"ETag": "\"9a0364b9e99bb480\"", "X-Cache": "HIT"},
+                            "body": {"message": "Products retrieved successfully", "data": [], "next": None, "status": 200}
+                        },
+                        {"status": 304, "headers": {"ETag": "\"d41d8cd98f00b204\""}, "body": None},
+                        {
+                            "status": 200,
+                            "headers": {},
+                            "body": {"message": "Task updated successfully", "data": {"id": 2, "status": "done"}, "status": 200}
+                        }
+                    ],
+                    "status": 200
+                },
+                response_only=True
+            )
+        ]
+    )
+    def post(self, request):
+        """
+        Thực hiện nhiều request API trong một lần gọi (tối đa BATCH_MAX_REQUESTS).
+        """
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+        try:
+            batch.validate(items, request.path_info)
+        except batch.InvalidBatch as exc:
+            return Response(
+                {
+                    "message": "Invalid data",
+                    "errors": exc.errors,
+                    "status": status.HTTP_400_BAD_REQUEST
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results, rolled_back = batch.execute(
+            request, items, atomic=bool(request.data.get('atomic')), parallel=bool(request.data.get('parallel'))
+        )
+        if rolled_back:
+            return Response(
+                {
+                    "message": "Batch rolled back",
+                    "data": results,
+                    "status": status.HTTP_400_BAD_REQUEST
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {
+                "message": "Batch processed successfully",
+                "data": results,
+                "status": status.HTTP_200_OK
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class SchemaView(View):
+    """
+    Schema OpenAPI dựng sẵn (base/schema.py) thay cho SpectacularAPIView vốn sinh lại schema
+    ở mỗi request. Định dạng: ?format=yaml|json hoặc header Accept, mặc định YAML.
+    """
+
+    def get(self, request):
+        fmt = request.GET.get('format') or ('json' if 'json' in request.headers.get('Accept', '') else 'yaml')
+        if fmt not in FORMATS:
+            raise Http404
+        body, etag = get_schema(fmt)
+        if request.GET.get('v') == code_version():
+            # URL có phiên bản (Swagger UI, ReDoc): nội dung không bao giờ đổi
+            cache_control = 'public, max-age=31536000, immutable'
+        else:
+            cache_control = f'public, max-age={settings.SCHEMA_CACHE_SECONDS}'
+        response = conditional_response(request, etag, None)
+        if response is None:
+            response = HttpResponse(body, content_type=FORMATS[fmt][1])
+            response.headers['Content-Disposition'] = f'inline; filename="schema.{fmt}"'
+        response.headers['Cache-Control'] = cache_control
+        return set_validators(response, etag, None)
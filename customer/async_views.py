@@ -0,0 +1,18 @@
+from base.models import Customer
+from .serializers import CustomerSerializer, CUSTOMER_INCLUDES
+from base.profiles import AsyncProfileListView, AsyncProfileDetailView
+
+# Bản async (ASGI, CRM/urls_async.py) của CustomerListView / CustomerDetailView: cùng tham số,
+# response và số query.
+
+
+class AsyncCustomerListView(AsyncProfileListView):
+    model = Customer
+    serializer_class = CustomerSerializer
+    includes = CUSTOMER_INCLUDES
+
+
+class AsyncCustomerDetailView(AsyncProfileDetailView):
+    model = Customer
+    serializer_class = CustomerSerializer
+    includes = CUSTOMER_INCLUDES
@@ -1,8 +1,16 @@
 from rest_framework import serializers
+from base.serializers import DynamicFieldsMixin
+from account.serializers import UserSerializer
 from base.models import Customer
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = ['id', 'user', 'phone', 'address', 'is_active']
-        read_only_fields = ['id', 'user'] 
\ No newline at end of file
+        read_only_fields = ['id', 'user']
+
+
+# ?include= : đường dẫn quan hệ -> (tên nhóm trong "included", serializer)
+CUSTOMER_INCLUDES = {
+    'user': ('users', UserSerializer),
+}
@@ -1,3 +1,85 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from base.models import Customer
+
+from base.testing import bearer, create_user
+
+
+class CustomerFieldsAndIncludeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.customer = create_user('customer', 'customer').customer_profile
+
+    def get(self, url, **params):
+        return self.client.get(url, params, **bearer(self.admin))
+
+    def test_invalid_fields(self):
+        for url in ('/api/customers/', f'/api/customers/{self.customer.pk}/'):
+            response = self.get(url, fields='id,password')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {
+                "message": "Invalid fields",
+                "errors": {"fields": ["Unknown field: password"]},
+                "status": 400
+            })
+
+    def test_invalid_include(self):
+        for url in ('/api/customers/', f'/api/customers/{self.customer.pk}/'):
+            response = self.get(url, include='user,orders')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {
+                "message": "Invalid include",
+                "errors": {"include": ["Unknown include: orders"]},
+                "status": 400
+            })
+
+    def test_fields_and_include(self):
+        response = self.get('/api/customers/', fields='user,phone', include='user')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['data'], [{'user': self.customer.user_id, 'phone': None}])
+        self.assertEqual([user['id'] for user in body['included']['users']], [self.customer.user_id])
+
+
+class CustomerObjectPermissionTests(TestCase):
+    """
+    Chỉ admin hoặc chính Customer đó mới đọc / sửa / xóa được chi tiết của Customer.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.owner = create_user('owner', 'customer')
+        cls.other = create_user('other', 'customer')
+        cls.employee = create_user('employee', 'employee')
+        cls.url = f'/api/customers/{cls.owner.customer_profile.pk}/'
+
+    def test_read(self):
+        for params in ({}, {'fields': 'id,phone'}, {'include': 'user'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.owner)).status_code, 200)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.admin)).status_code, 200)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.other)).status_code, 403)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.employee)).status_code, 403)
+
+    def test_update_and_delete(self):
+        for user in (self.other, self.employee):
+            with self.subTest(user=user.username):
+                response = self.client.put(
+                    self.url, {'phone': '0900000000'}, content_type='application/json', **bearer(user)
+                )
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(self.client.delete(self.url, **bearer(user)).status_code, 403)
+        customer = Customer.objects.get(user=self.owner)
+        self.assertIsNone(customer.phone)
+        self.assertTrue(customer.is_active)
+        self.assertEqual(self.client.delete(self.url, **bearer(self.owner)).status_code, 204)
+        self.assertEqual(self.client.get(self.url, **bearer(self.admin)).status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async')
+class AsyncCustomerObjectPermissionTests(CustomerObjectPermissionTests):
+    # Cùng các trường hợp với view async (AsyncCustomerDetailView)
+    pass
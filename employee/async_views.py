@@ -0,0 +1,18 @@
+from base.models import Employee
+from .serializers import EmployeeSerializer, EMPLOYEE_INCLUDES
+from base.profiles import AsyncProfileListView, AsyncProfileDetailView
+
+# Bản async (ASGI, CRM/urls_async.py) của EmployeeListView / EmployeeDetailView: cùng tham số,
+# response và số query.
+
+
+class AsyncEmployeeListView(AsyncProfileListView):
+    model = Employee
+    serializer_class = EmployeeSerializer
+    includes = EMPLOYEE_INCLUDES
+
+
+class AsyncEmployeeDetailView(AsyncProfileDetailView):
+    model = Employee
+    serializer_class = EmployeeSerializer
+    includes = EMPLOYEE_INCLUDES
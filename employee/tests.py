@@ -1,3 +1,47 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from base.models import Employee
+from base.testing import bearer, create_user
+
+
+class EmployeeObjectPermissionTests(TestCase):
+    """
+    Chỉ admin hoặc chính Employee đó mới đọc / sửa / xóa được chi tiết của Employee.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.owner = create_user('owner', 'employee')
+        cls.other = create_user('other', 'employee')
+        cls.customer = create_user('customer', 'customer')
+        cls.url = f'/api/employees/{cls.owner.employee_profile.pk}/'
+
+    def test_read(self):
+        for params in ({}, {'fields': 'id,position'}, {'include': 'user'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.owner)).status_code, 200)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.admin)).status_code, 200)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.other)).status_code, 403)
+                self.assertEqual(self.client.get(self.url, params, **bearer(self.customer)).status_code, 403)
+
+    def test_update_and_delete(self):
+        for user in (self.other, self.customer):
+            with self.subTest(user=user.username):
+                response = self.client.put(
+                    self.url, {'position': 'Manager'}, content_type='application/json', **bearer(user)
+                )
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(self.client.delete(self.url, **bearer(user)).status_code, 403)
+        employee = Employee.objects.get(user=self.owner)
+        self.assertIsNone(employee.position)
+        self.assertTrue(employee.is_active)
+        response = self.client.put(self.url, {'position': 'Tester'}, content_type='application/json', **bearer(self.owner))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['position'], 'Tester')
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async')
+class AsyncEmployeeObjectPermissionTests(EmployeeObjectPermissionTests):
+    # Cùng các trường hợp với view async (AsyncEmployeeDetailView)
+    pass
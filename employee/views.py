@@ -1,20 +1,15 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
 from base.models import Employee
-from .serializers import EmployeeSerializer
-from rest_framework.authentication import BasicAuthentication
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from base.permissions import IsAdmin, IsAdminOrOwner
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from .serializers import EmployeeSerializer, EMPLOYEE_INCLUDES
+from base.profiles import ProfileListView, ProfileDetailView
+from base.serializers import FIELDS_PARAMETER, INCLUDE_PARAMETER
+from base.pagination import KEYSET_PAGINATION_PARAMETERS
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample
 
-class EmployeeListView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
-    permission_classes = [IsAdmin]
-
-    @extend_schema(
+@extend_schema_view(
+    get=extend_schema(
         description="Retrieve a list of active employees. Only admins have permission to view the list.",
         responses={200: EmployeeSerializer(many=True)},
+        parameters=KEYSET_PAGINATION_PARAMETERS + [FIELDS_PARAMETER, INCLUDE_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -30,27 +25,13 @@ class EmployeeListView(APIView):
                             "is_active": True
                         }
                     ],
+                    "next": "eyJpZCI6MX0",
                     "status": 200
                 }
             )
         ]
-    )
-    def get(self, request):
-        """
-        Lấy danh sách các Employee đang hoạt động (chỉ admin mới có quyền).
-        """
-        employees = Employee.objects.filter(is_active=True)
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(
-            {
-                "message": "Employees retrieved successfully",
-                "data": serializer.data,
-                "status": status.HTTP_200_OK
-            },
-            status=status.HTTP_200_OK
-        )
-
-    @extend_schema(
+    ),
+    post=extend_schema(
         description="Create a new employee. Only admins have permission to create employees.",
         request=EmployeeSerializer,
         responses={201: EmployeeSerializer},
@@ -66,44 +47,18 @@ class EmployeeListView(APIView):
                 }
             )
         ]
-    )
-    def post(self, request):
-        """
-        Tạo mới Employee (chỉ admin mới có quyền).
-        """
-        serializer = EmployeeSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(
-                {
-                    "message": "Employee created successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_201_CREATED
-                },
-                status=status.HTTP_201_CREATED
-            )
-        return Response(
-            {
-                "message": "Invalid data",
-                "errors": serializer.errors,
-                "status": status.HTTP_400_BAD_REQUEST
-            },
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-class EmployeeDetailView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
-    permission_classes = [IsAdminOrOwner]
+    ),
+)
+class EmployeeListView(ProfileListView):
+    model = Employee
+    serializer_class = EmployeeSerializer
+    includes = EMPLOYEE_INCLUDES
 
-    def get_object(self, pk):
-        try:
-            return Employee.objects.get(pk=pk, is_active=True)
-        except Employee.DoesNotExist:
-            return None
-
-    @extend_schema(
+@extend_schema_view(
+    get=extend_schema(
         description="Retrieve details of a specific employee. Only admins or the owner have permission to view the details.",
         responses={200: EmployeeSerializer},
+        parameters=[FIELDS_PARAMETER, INCLUDE_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -121,31 +76,8 @@ class EmployeeDetailView(APIView):
                 }
             )
         ]
-    )
-    def get(self, request, pk):
-        """
-        Lấy thông tin chi tiết của một Employee (chỉ admin hoặc chủ sở hữu mới có quyền).
-        """
-        employee = self.get_object(pk)
-        if employee:
-            serializer = EmployeeSerializer(employee)
-            return Response(
-                {
-                    "message": "Employee retrieved successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_200_OK
-                },
-                status=status.HTTP_200_OK
-            )
-        return Response(
-            {
-                "message": "Employee not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
-
-    @extend_schema(
+    ),
+    put=extend_schema(
         description="Update a specific employee. Only admins or the owner have permission to update the employee.",
         request=EmployeeSerializer,
         responses={200: EmployeeSerializer},
@@ -159,41 +91,8 @@ class EmployeeDetailView(APIView):
                 }
             )
         ]
-    )
-    def put(self, request, pk):
-        """
-        Cập nhật thông tin của một Employee (chỉ admin hoặc chủ sở hữu mới có quyền).
-        """
-        employee = self.get_object(pk)
-        if employee:
-            serializer = EmployeeSerializer(employee, data=request.data, partial=True)
-            if serializer.is_valid():
-                serializer.save()
-                return Response(
-                    {
-                        "message": "Employee updated successfully",
-                        "data": serializer.data,
-                        "status": status.HTTP_200_OK
-                    },
-                    status=status.HTTP_200_OK
-                )
-            return Response(
-                {
-                    "message": "Invalid data",
-                    "errors": serializer.errors,
-                    "status": status.HTTP_400_BAD_REQUEST
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return Response(
-            {
-                "message": "Employee not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
-
-    @extend_schema(
+    ),
+    delete=extend_schema(
         description="Soft delete a specific employee. Only admins or the owner have permission to delete the employee.",
         responses={204: None},
         examples=[
@@ -205,25 +104,9 @@ class EmployeeDetailView(APIView):
                 }
             )
         ]
-    )
-    def delete(self, request, pk):
-        """
-        Xóa mềm một Employee (chỉ admin hoặc chủ sở hữu mới có quyền).
-        """
-        employee = self.get_object(pk)
-        if employee:
-            employee.soft_delete()
-            return Response(
-                {
-                    "message": "Employee deleted successfully",
-                    "status": status.HTTP_204_NO_CONTENT
-                },
-                status=status.HTTP_204_NO_CONTENT
-            )
-        return Response(
-            {
-                "message": "Employee not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+    ),
+)
+class EmployeeDetailView(ProfileDetailView):
+    model = Employee
+    serializer_class = EmployeeSerializer
+    includes = EMPLOYEE_INCLUDES
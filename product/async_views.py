@@ -0,0 +1,117 @@
+from rest_framework import status
+from base.models import Product
+from .serializers import ProductSerializer
+from .resources import ProductListResource
+from .cache import acatalog_version, cache_key, get_cached, set_cached
+from base.async_views import AsyncAPIView, asave_serializer, json_response
+from base.authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from base.conditional import conditional_response, set_validators
+from base.resources import (
+    object_queryset, object_conditional, object_payload, saved_payload, invalid_payload, not_found_payload,
+    arun, render,
+)
+from base.serializers import parse_fields_and_includes
+from base.permissions import IsAdminOrReadOnly
+
+# Bản async (ASGI, CRM/urls_async.py) của ProductListView / ProductDetailView: cùng tham số,
+# response và số query. Cache 'catalog' (LocMemCache) được đọc/ghi trực tiếp vì không có I/O,
+# chỉ version của catalog được đọc từ database.
+
+
+class AsyncProductListView(ProductListResource, AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrReadOnly]
+    max_queries = 4
+
+    async def get(self, request):
+        """
+        Lấy danh sách các Product (ai cũng có quyền xem).
+        """
+        return render(await arun(self.list_flow(request)), json_response)
+
+    async def post(self, request):
+        """
+        Tạo mới Product (chỉ admin mới có quyền).
+        """
+        serializer = ProductSerializer(data=request.data)
+        if serializer.is_valid():
+            await asave_serializer(serializer)
+            return json_response(
+                saved_payload("Product created successfully", serializer, status.HTTP_201_CREATED),
+                status.HTTP_201_CREATED
+            )
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncProductDetailView(AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrReadOnly]
+    max_queries = 5
+
+    async def get_object(self, pk, fields=None):
+        # updated_at cho ETag
+        queryset = object_queryset(Product.objects.all(), ProductSerializer, fields, columns=('updated_at',))
+        try:
+            product = await queryset.aget(pk=pk)
+        except Product.DoesNotExist:
+            return None
+        await self.check_object_permissions(self.request, product)
+        return product
+
+    async def get(self, request, pk):
+        """
+        Lấy thông tin chi tiết của một Product (ai cũng có quyền xem).
+        """
+        fields, _, error = parse_fields_and_includes(request, ProductSerializer)
+        if error is not None:
+            return json_response(error, error['status'])
+        key = cache_key(request, await acatalog_version())
+        entry = get_cached(key)
+        if entry is None:
+            product = await self.get_object(pk, fields)
+            if product is None:
+                return json_response(not_found_payload("Product"), status.HTTP_404_NOT_FOUND)
+            etag, last_modified, response = object_conditional(request, product)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+            entry = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "payload": object_payload("Product retrieved successfully", product, ProductSerializer, fields)
+            }
+            set_cached(key, entry)
+            cache_status = 'MISS'
+        else:
+            response = conditional_response(request, entry['etag'], entry['last_modified'])
+            if response is not None:
+                return set_validators(response, entry['etag'], entry['last_modified'])
+            cache_status = 'HIT'
+        response = json_response(entry['payload'])
+        response.headers['X-Cache'] = cache_status
+        return set_validators(response, entry['etag'], entry['last_modified'])
+
+    async def put(self, request, pk):
+        """
+        Cập nhật thông tin của một Product (chỉ admin mới có quyền).
+        """
+        product = await self.get_object(pk)
+        if product is None:
+            return json_response(not_found_payload("Product"), status.HTTP_404_NOT_FOUND)
+        serializer = ProductSerializer(product, data=request.data, partial=True)
+        if serializer.is_valid():
+            await asave_serializer(serializer)
+            return json_response(saved_payload("Product updated successfully", serializer))
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, pk):
+        """
+        Xóa một Product (chỉ admin mới có quyền).
+        """
+        product = await self.get_object(pk)
+        if product is None:
+            return json_response(not_found_payload("Product"), status.HTTP_404_NOT_FOUND)
+        await product.adelete()
+        return json_response(
+            {"message": "Product deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status.HTTP_204_NO_CONTENT
+        )
@@ -0,0 +1,53 @@
+import hashlib
+
+from django.core.cache import caches
+from django.db import transaction
+
+from base.metrics import registry
+from base.models import Product, TableVersion
+
+
+def _cache():
+    return caches['catalog']
+
+
+def catalog_version():
+    """
+    (version, changed_at) hiện tại của catalog, đọc từ TableVersion của bảng Product.
+    Version nằm trong database, được tăng ngay sau khi thay đổi commit, nên mọi worker thấy
+    cùng một version; entry cache vẫn là cục bộ của từng process.
+    Mọi entry được lưu kèm version này, nên khi version tăng thì toàn bộ entry cũ tự động
+    hết hiệu lực mà không cần duyệt qua các key.
+    """
+    return TableVersion.current(Product)
+
+
+async def acatalog_version():
+    return await TableVersion.acurrent(Product)
+
+
+def cache_key(request, catalog):
+    """
+    Key của response, gồm path + query string và version catalog (catalog_version()).
+    Phải đọc version trước khi query dữ liệu để dữ liệu cũ không bị lưu vào version mới.
+    """
+    path = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return f'product:{path}', catalog[0]
+
+
+def get_cached(key):
+    if transaction.get_connection().in_atomic_block:
+        # Trong transaction (ví dụ /api/batch/ với atomic), cache chưa thấy các thay đổi
+        # chưa commit và không được lưu dữ liệu có thể bị rollback: đọc thẳng database
+        return None
+    name, version = key
+    entry = _cache().get(name, version=version)
+    registry.record_cache('catalog', entry is not None)
+    return entry
+
+
+def set_cached(key, entry):
+    if transaction.get_connection().in_atomic_block:
+        return
+    name, version = key
+    _cache().set(name, entry, version=version)
@@ -0,0 +1,81 @@
+from django.db import migrations
+
+
+# SQLite: bảng FTS5 external-content trỏ vào base_product, được đồng bộ bằng trigger
+# nên mọi cách ghi (save, delete, bulk_create, bulk_update, queryset.update) đều được index.
+# Lưu ý: nếu sau này một migration phải tạo lại bảng base_product trên SQLite
+# (ALTER kiểu _remake_table), các trigger bên dưới cần được tạo lại.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE product_fts USING fts5(
+        name, description,
+        content='base_product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER product_fts_insert AFTER INSERT ON base_product BEGIN
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_delete AFTER DELETE ON base_product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER product_fts_update AFTER UPDATE OF name, description ON base_product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    # Tên sản phẩm quan trọng hơn mô tả khi xếp hạng BM25
+    "INSERT INTO product_fts(product_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO product_fts(product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS product_fts_update",
+    "DROP TRIGGER IF EXISTS product_fts_delete",
+    "DROP TRIGGER IF EXISTS product_fts_insert",
+    "DROP TABLE IF EXISTS product_fts",
+]
+
+# PostgreSQL: GIN index trên biểu thức tsvector, phải giống hệt biểu thức trong product/search.py
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX product_search_idx ON base_product USING GIN (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))
+    )
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS product_search_idx",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('base', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
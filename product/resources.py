@@ -0,0 +1,73 @@
+"""
+Flow của API danh sách Product (base.resources), dùng chung cho ProductListView (sync) và
+AsyncProductListView (async, CRM/urls_async.py).
+"""
+from django.utils import timezone
+
+from base.conditional import list_validators, alist_validators, conditional_response, set_validators
+from base.models import Product
+from base.resources import ListPage, Step, Result, invalid_payload
+from base.serializers import parse_fields_and_includes
+from base.streaming import stream_list_response, astream_list_response, wants_stream
+from base.sync import delta_payload, adelta_payload
+from .cache import catalog_version, acatalog_version, cache_key, get_cached, set_cached
+from .serializers import ProductSerializer, ProductFilterSerializer
+
+
+class ProductListResource:
+
+    def list_flow(self, request):
+        """
+        GET danh sách Product: lọc, ETag / Last-Modified, cache 'catalog', streaming và
+        đồng bộ theo updated_since.
+        """
+        filters = ProductFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Result(invalid_payload(filters.errors, "Invalid filters"))
+        fields, _, error = parse_fields_and_includes(request, ProductSerializer)
+        if error is not None:
+            return Result(error)
+        started = timezone.now()
+        since = filters.validated_data.get('updated_since')
+        products = filters.filter_queryset(Product.objects.all())
+        ordering = filters.get_ordering()
+        # Đồng bộ (updated_since) luôn phân trang: "deleted" và "sync_token" nằm ở trang cuối
+        stream = wants_stream(request) and since is None
+        catalog = yield Step(catalog_version, acatalog_version)
+        key = cache_key(request, catalog)
+        entry = None if stream else get_cached(key)
+        if entry is None and since is not None:
+            # ETag không tính đến các id đã bị xóa (Tombstone) nên không dùng khi đồng bộ
+            etag, last_modified = None, None
+        elif entry is None:
+            etag, last_modified = yield Step(list_validators, alist_validators, request, Product, current=catalog)
+        else:
+            etag, last_modified = entry['etag'], entry['last_modified']
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+        if stream:
+            response = yield Step(
+                stream_list_response, astream_list_response,
+                products.order_by(*ordering), ProductSerializer, "Products retrieved successfully", fields
+            )
+            return set_validators(response, etag, last_modified)
+
+        if entry is None:
+            page = ListPage(products, ProductSerializer, ordering, fields)
+            rows, error = yield Step(page.fetch, page.afetch, request)
+            if error is not None:
+                return Result(error)
+            delta = None
+            if since is not None:
+                delta = yield Step(delta_payload, adelta_payload, Product, since, started, page.next_cursor)
+            entry = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "payload": page.payload("Products retrieved successfully", rows, delta)
+            }
+            set_cached(key, entry)
+            cache_status = 'MISS'
+        else:
+            cache_status = 'HIT'
+        return Result(entry['payload'], etag, last_modified, {'X-Cache': cache_status})
@@ -0,0 +1,106 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+
+from base.models import Product
+
+MAX_TERMS = 10
+# Độ dài tiền tố có index, phải giống prefix='2 3' của product_fts (migration 0001_product_search).
+# Tiền tố ngắn hơn không có index: FTS5 phải duyệt toàn bộ từ điển nên bị từ chối.
+PREFIX_LENGTHS = (2, 3)
+MIN_PREFIX_LENGTH = PREFIX_LENGTHS[0]
+# Tiền tố tới độ dài này khớp rất nhiều dòng: chấm điểm (bm25) mọi dòng khớp trước LIMIT
+# chiếm gần hết thời gian, nên kết quả được trả theo id thay vì theo độ liên quan.
+SHORT_PREFIX_LENGTH = PREFIX_LENGTHS[-1]
+
+# Phải giống hệt biểu thức của index product_search_idx (migration 0001_product_search)
+POSTGRES_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+
+@contextmanager
+def deferred_indexing():
+    """
+    Ghi hàng loạt Product trên SQLite: tạm bỏ trigger index FTS theo từng dòng rồi rebuild
+    product_fts một lần ở cuối (nhanh hơn nhiều). Phải chạy trong transaction.
+    Backend khác không cần làm gì.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'product_fts_insert'")
+        row = cursor.fetchone()
+        if row is None:
+            yield
+            return
+        cursor.execute('DROP TRIGGER product_fts_insert')
+        try:
+            yield
+        finally:
+            cursor.execute(row[0])
+        cursor.execute("INSERT INTO product_fts(product_fts) VALUES ('rebuild')")
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def search_products(query, limit):
+    """
+    Tìm Product theo name/description, sắp xếp theo độ liên quan.
+    Từ cuối cùng được tìm theo tiền tố để dùng cho gợi ý khi đang gõ (type-ahead), và phải
+    dài ít nhất MIN_PREFIX_LENGTH ký tự; với tiền tố ngắn (tới SHORT_PREFIX_LENGTH ký tự)
+    kết quả được sắp xếp theo id.
+    """
+    terms = search_terms(query)
+    if not terms or len(terms[-1]) < MIN_PREFIX_LENGTH:
+        return []
+    ranked = len(terms[-1]) > SHORT_PREFIX_LENGTH
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(terms, limit, ranked)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(terms, limit, ranked)
+    return _search_fallback(terms, limit)
+
+
+def _search_sqlite(terms, limit, ranked):
+    # "term1" "term2"* : AND các từ, từ cuối khớp theo tiền tố
+    match = ' '.join(f'"{term}"' for term in terms) + '*'
+    table = Product._meta.db_table
+    # Theo rowid, FTS5 trả các dòng khớp theo thứ tự sẵn có và dừng ở LIMIT
+    ordering = 'product_fts.rank' if ranked else 'product_fts.rowid'
+    return list(Product.objects.raw(
+        f"""
+        SELECT {table}.*
+        FROM product_fts
+        JOIN {table} ON {table}.id = product_fts.rowid
+        WHERE product_fts MATCH %s
+        ORDER BY {ordering}
+        LIMIT %s
+        """,
+        [match, limit]
+    ))
+
+
+def _search_postgres(terms, limit, ranked):
+    tsquery = ' & '.join(terms) + ':*'
+    table = Product._meta.db_table
+    ordering = f'ts_rank_cd({POSTGRES_DOCUMENT}, query) DESC, {table}.id' if ranked else f'{table}.id'
+    return list(Product.objects.raw(
+        f"""
+        SELECT {table}.*
+        FROM {table}, to_tsquery('simple', %s) query
+        WHERE {POSTGRES_DOCUMENT} @@ query
+        ORDER BY {ordering}
+        LIMIT %s
+        """,
+        [tsquery, limit]
+    ))
+
+
+def _search_fallback(terms, limit):
+    products = Product.objects.all()
+    for term in terms:
+        products = products.filter(name__icontains=term)
+    return list(products.order_by('name', 'id')[:limit])
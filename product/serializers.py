@@ -1,8 +1,50 @@
 from rest_framework import serializers
+from base.serializers import DynamicFieldsMixin
+from base.sync import UpdatedSinceFilter
 from base.models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'description', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class ProductFilterSerializer(UpdatedSinceFilter):
+    """
+    Validate query params lọc/sắp xếp của danh sách Product.
+    Chỉ cho phép sắp xếp theo các cột có index (xem Product.Meta.indexes).
+    """
+    ORDERING_CHOICES = ['created_at', '-created_at', 'price', '-price', 'name', '-name']
+
+    price_min = serializers.FloatField(required=False)
+    price_max = serializers.FloatField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=ORDERING_CHOICES, required=False, default='created_at')
+
+    def validate(self, attrs):
+        if 'updated_since' in attrs and 'ordering' in self.initial_data:
+            raise serializers.ValidationError({"ordering": ["Cannot be combined with updated_since."]})
+        return attrs
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'updated_since' in data:
+            queryset = queryset.filter(updated_at__gt=data['updated_since'])
+        if 'price_min' in data:
+            queryset = queryset.filter(price__gte=data['price_min'])
+        if 'price_max' in data:
+            queryset = queryset.filter(price__lte=data['price_max'])
+        if 'created_after' in data:
+            queryset = queryset.filter(created_at__gt=data['created_after'])
+        return queryset
+
+    def get_ordering(self):
+        """
+        Thứ tự cho keyset pagination, luôn kết thúc bằng id (cùng chiều) để duy nhất.
+        Khi đồng bộ (updated_since): theo thời điểm thay đổi.
+        """
+        if 'updated_since' in self.validated_data:
+            return ('updated_at', 'id')
+        ordering = self.validated_data['ordering']
+        return (ordering, '-id' if ordering.startswith('-') else 'id')
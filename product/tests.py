@@ -1,3 +1,353 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from base.models import Product, TableVersion, Tombstone
+from base.testing import bearer, create_user
+
+
+class ProductBulkViewTests(TestCase):
+    url = '/api/products/bulk/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.products = [Product.objects.create(name=f'Product {index}', price=index) for index in range(3)]
+
+    def post(self, body, user=None):
+        return self.client.post(self.url, body, content_type='application/json', **bearer(user or self.admin))
+
+    def test_body_must_be_an_object(self):
+        for body in ([1, 2], '"create"', 1):
+            response = self.post(body)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], "Invalid data")
+            self.assertEqual(response.json()['status'], 400)
+
+    def test_operations_must_be_lists(self):
+        response = self.post({'create': {'name': 'Product X', 'price': 1}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], "create, update and delete must be lists")
+
+    def test_item_limit(self):
+        with self.settings(API_BULK_MAX_ITEMS=2):
+            response = self.post({'delete': [product.pk for product in self.products]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Product.objects.count(), 3)
+
+    def test_only_admins(self):
+        response = self.post({'delete': [self.products[0].pk]}, user=create_user('employee', 'employee'))
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Product.objects.filter(pk=self.products[0].pk).exists())
+
+    def test_errors_are_reported_per_item(self):
+        first, second, _ = self.products
+        response = self.post({
+            'create': [{'name': 'Product X', 'price': 1}, {'name': 'Product Y'}],
+            'update': [{'id': first.pk, 'price': 10}, {'id': 0, 'price': 10}, {'price': 10}],
+            'delete': [second.pk, second.pk, 'x'],
+        })
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors['create'][0], {})
+        self.assertIn('price', errors['create'][1])
+        self.assertEqual(errors['update'][0], {})
+        self.assertEqual(errors['update'][1], {'id': ["Product not found."]})
+        self.assertEqual(errors['update'][2], {'id': ["A valid integer is required."]})
+        self.assertEqual(errors['delete'], [{}, {'id': ["Duplicate id."]}, {'id': ["A valid integer is required."]}])
+        # Không ghi gì khi có phần tử không hợp lệ
+        self.assertFalse(Product.objects.filter(name='Product X').exists())
+        first.refresh_from_db()
+        self.assertEqual(first.price, 0)
+        self.assertTrue(Product.objects.filter(pk=second.pk).exists())
+
+    def test_create_update_delete(self):
+        first, second, third = self.products
+        response = self.post({
+            'create': [{'name': 'Product X', 'price': 1}],
+            'update': [{'id': first.pk, 'price': 10}, {'id': second.pk, 'price': second.price}],
+            'delete': [third.pk],
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()['data']
+        self.assertEqual([item['name'] for item in data['created']], ['Product X'])
+        # Product không thay đổi thì không được ghi
+        self.assertEqual(data['updated'], [first.pk])
+        self.assertEqual(data['deleted'], [third.pk])
+        first.refresh_from_db()
+        self.assertEqual(first.price, 10)
+        self.assertFalse(Product.objects.filter(pk=third.pk).exists())
+
+    def test_failure_rolls_back_every_operation(self):
+        first, _, third = self.products
+        body = {
+            'create': [{'name': 'Product X', 'price': 1}],
+            'update': [{'id': first.pk, 'price': 10}],
+            'delete': [third.pk],
+        }
+        # Lỗi ở bước cuối (xóa): phần tạo và cập nhật trước đó cũng phải bị rollback
+        with mock.patch.object(Tombstone, 'record_many', side_effect=DatabaseError("disk I/O error")):
+            with self.assertRaises(DatabaseError):
+                self.post(body)
+        self.assertFalse(Product.objects.filter(name='Product X').exists())
+        first.refresh_from_db()
+        self.assertEqual(first.price, 0)
+        self.assertTrue(Product.objects.filter(pk=third.pk).exists())
+
+    def test_delete_queries_do_not_grow_with_rows(self):
+        extra = Product.objects.bulk_create([Product(name=f'Product X{index}', price=index) for index in range(50)])
+        TableVersion.bump(Product)
+
+        def delete(ids):
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.post({'delete': ids})
+            self.assertEqual(response.status_code, 200, response.content)
+            return len(queries)
+
+        with self.settings(API_BULK_BATCH_SIZE=100):
+            few = delete([product.pk for product in self.products])
+            many = delete([product.pk for product in extra])
+        # Xác thực, kiểm tra id, một lô (SELECT, DELETE, INSERT Tombstone) và một lần tăng version
+        self.assertEqual(many, few)
+        self.assertLessEqual(many, 11)
+        self.assertEqual(Tombstone.objects.filter(model='base.product').count(), 53)
+        self.assertEqual(TableVersion.current(Product)[0], 3)
+
+
+class ProductListValidatorTests(TestCase):
+    url = '/api/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.products = [Product.objects.create(name=f'Product {index}', price=index) for index in range(2)]
+
+    def setUp(self):
+        # Lần thay đổi trước đó cách đây một phút để Last-Modified khác giây với lần xóa
+        # (version được tăng sau commit: không có dòng TableVersion cho dữ liệu của setUpTestData)
+        TableVersion.objects.update_or_create(
+            table='base.product', defaults={'changed_at': timezone.now() - timedelta(minutes=1)}
+        )
+
+    def test_delete_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['data']), 1)
+
+    def test_delete_changes_last_modified(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 1)
+
+    def test_version_is_bumped_after_commit(self):
+        version = TableVersion.current(Product)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].save()
+            # Dòng TableVersion không bị ghi (khóa) trong transaction của thao tác ghi
+            self.assertEqual(TableVersion.current(Product), version)
+        self.assertEqual(TableVersion.current(Product)[0], version[0] + 1)
+
+    def test_bulk_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/products/bulk/', {'delete': [self.products[0].pk]}, content_type='application/json',
+                **bearer(self.admin)
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ProductListPaginationTests(TestCase):
+    url = '/api/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        # Nhiều Product trùng price và trùng created_at để trang bị cắt giữa các giá trị bằng nhau
+        created_at = timezone.now() - timedelta(days=1)
+        Product.objects.bulk_create([
+            Product(name=f'Product {index % 4}', price=index % 3, created_at=created_at if index % 2 else timezone.now())
+            for index in range(23)
+        ])
+
+    def walk(self, **params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = {**params, 'page_size': 5}
+            if cursor is not None:
+                query['cursor'] = cursor
+            response = self.client.get(self.url, query)
+            self.assertEqual(response.status_code, 200, response.content)
+            ids += [item['id'] for item in response.json()['data']]
+            cursor = response.json()['next']
+            pages += 1
+            if cursor is None:
+                return ids, pages
+
+    def test_cursor_round_trip(self):
+        for ordering in ('created_at', '-created_at', 'price', '-price', 'name', '-name'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self.walk(ordering=ordering)
+                # Không trùng, không sót, đúng thứ tự (id cùng chiều với cột sắp xếp)
+                tiebreak = '-id' if ordering.startswith('-') else 'id'
+                expected = list(Product.objects.order_by(ordering, tiebreak).values_list('id', flat=True))
+                self.assertEqual(ids, expected)
+                self.assertEqual(pages, 5)
+
+    def test_invalid_cursor(self):
+        def encode(position):
+            return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+        cursors = [
+            'not a cursor',
+            encode([1, 2]),
+            encode({'created_at': '2030-01-01T00:00:00+00:00'}),
+            encode({'created_at': 'yesterday', 'id': 1}),
+            encode({'created_at': None, 'id': 1}),
+            encode({'created_at': '2030-01-01T00:00:00+00:00', 'id': 1, 'price': 1}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"message": "Invalid cursor", "status": 400})
+
+
+async def read_async_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+class ProductListSyncAsyncTests(TestCase):
+    url = '/api/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create([Product(name=f'Product {index}', price=index) for index in range(5)])
+        TableVersion.bump(Product)
+
+    def test_same_response(self):
+        queries = [
+            {}, {'limit': 2}, {'ordering': '-price', 'fields': 'id,price'}, {'stream': 1},
+            {'updated_since': timezone.now() - timedelta(days=1)}, {'cursor': 'x'}, {'price_min': 'x'},
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                response = self.client.get(self.url, query)
+                with self.settings(ROOT_URLCONF='CRM.urls_async'):
+                    async_response = self.client.get(self.url, query)
+                self.assertEqual(async_response.status_code, response.status_code)
+                self.assertEqual(async_response.get('ETag'), response.get('ETag'))
+                if response.streaming:
+                    self.assertEqual(async_to_sync(read_async_stream)(async_response), response.getvalue())
+                elif 'updated_since' in query:
+                    # sync_token là thời điểm của từng request
+                    self.assertEqual(async_response.json()['data'], response.json()['data'])
+                else:
+                    self.assertEqual(async_response.json(), response.json())
+
+
+class CatalogCacheTests(TransactionTestCase):
+    # Cache bị bỏ qua trong transaction nên không dùng TestCase
+    url = '/api/products/'
+
+    def setUp(self):
+        # Database được làm trống sau mỗi test nên version catalog có thể lặp lại
+        caches['catalog'].clear()
+        self.admin = create_user('admin', 'admin')
+        self.product = Product.objects.create(name='Product A', price=1)
+
+    def test_hit_and_invalidation(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+        self.product.price = 2
+        self.product.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data'][0]['price'], 2)
+
+    def test_change_from_another_worker(self):
+        detail = f'/api/products/{self.product.pk}/'
+        self.client.get(self.url)
+        self.client.get(detail)
+        # Worker khác ghi database: cache cục bộ của process này không được động đến
+        Product.objects.filter(pk=self.product.pk).update(price=3)
+        TableVersion.objects.filter(table='base.product').update(version=F('version') + 1)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data'][0]['price'], 3)
+        self.assertEqual(self.client.get(detail)['X-Cache'], 'MISS')
+
+    def test_stats_in_metrics(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        metrics = self.client.get('/api/metrics', **bearer(self.admin)).content.decode()
+        self.assertRegex(metrics, r'crm_cache_requests_total\{cache="catalog",result="hit"\} [1-9]')
+        self.assertRegex(metrics, r'crm_cache_requests_total\{cache="catalog",result="miss"\} [1-9]')
+
+
+class ProductSearchViewTests(TestCase):
+    url = '/api/products/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.charger = Product.objects.create(name='Charger', price=1, description='For smartphone and smart watch')
+        cls.smartphone = Product.objects.create(name='Smartphone', price=1, description='Phone')
+        cls.watch = Product.objects.create(name='Smart watch', price=1, description='Watch')
+        cls.laptop = Product.objects.create(name='Laptop', price=1, description='Not a phone')
+        # Để từ khóa hiếm trong tập dữ liệu (bm25 bỏ qua từ xuất hiện ở hơn nửa số dòng)
+        for index in range(5):
+            Product.objects.create(name=f'Desk {index}', price=1, description='Wooden desk')
+
+    def search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [item['id'] for item in response.json()['data']]
+
+    def test_query_is_required(self):
+        for query in ('', '  ', '!!'):
+            self.assertEqual(self.client.get(self.url, {'q': query}).status_code, 400)
+
+    def test_prefix_must_be_indexed(self):
+        response = self.client.get(self.url, {'q': 's'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['status'], 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'smart w'}).status_code, 400)
+
+    def test_short_prefix_is_ordered_by_id(self):
+        expected = [self.charger.pk, self.smartphone.pk, self.watch.pk]
+        self.assertEqual(self.search('sm'), expected)
+        self.assertEqual(self.search('SMA'), expected)
+        self.assertEqual(self.search('smart wat'), [self.charger.pk, self.watch.pk])
+
+    def test_long_prefix_is_ranked(self):
+        # Khớp ở tên (trọng số 10) đứng trước khớp ở mô tả, dù id nhỏ hơn
+        results = self.search('smart')
+        self.assertCountEqual(results[:2], [self.smartphone.pk, self.watch.pk])
+        self.assertEqual(results[2:], [self.charger.pk])
+
+    def test_all_terms_must_match(self):
+        self.assertCountEqual(self.search('phone'), [self.smartphone.pk, self.laptop.pk])
+        self.assertEqual(self.search('laptop smart'), [])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {'q': 'desk', 'limit': 2})
+        self.assertEqual(len(response.json()['data']), 2)
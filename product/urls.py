@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import ProductListView, ProductDetailView
+from .views import ProductListView, ProductDetailView, ProductBulkView, ProductSearchView
 
 urlpatterns = [
     path('products/', ProductListView.as_view(), name='product-list'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('products/bulk/', ProductBulkView.as_view(), name='product-bulk'),
     path('products/<int:pk>/', ProductDetailView.as_view(), name='product-detail'),
 ]
\ No newline at end of file
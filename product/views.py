@@ -1,21 +1,37 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from base.models import Product
-from .serializers import ProductSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.authentication import BasicAuthentication
-from base.permissions import IsAdminOrReadOnly
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from base.models import Product, TableVersion, Tombstone
+from .serializers import ProductSerializer, ProductFilterSerializer
+from .resources import ProductListResource
+from .cache import catalog_version, cache_key, get_cached, set_cached
+from .search import search_products, search_terms, MIN_PREFIX_LENGTH, SHORT_PREFIX_LENGTH
+from base.authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from base.conditional import conditional_response, set_validators
+from base.resources import (
+    object_queryset, object_conditional, object_payload, saved_payload, invalid_payload, not_found_payload,
+    run, render, rest_response,
+)
+from base.serializers import parse_fields_and_includes, FIELDS_PARAMETER
+from base.pagination import KEYSET_PAGINATION_PARAMETERS
+from base.streaming import STREAM_PARAMETER
+from base.permissions import IsAdmin, IsAdminOrReadOnly
+from base.signals import bulk_write
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-class ProductListView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
+class ProductListView(ProductListResource, APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
     permission_classes = [IsAdminOrReadOnly]
+    max_queries = 4
 
     @extend_schema(
-        description="Retrieve a list of products. Anyone can view the list, but only admins can create new products.",
-        responses={200: ProductSerializer(many=True)},
+        description="Retrieve a list of products, optionally filtered by price range and creation date and ordered by an indexed column. Anyone can view the list, but only admins can create new products. Supports conditional requests with If-None-Match / If-Modified-Since.",
+        responses={200: ProductSerializer(many=True), 304: None},
+        parameters=[ProductFilterSerializer] + KEYSET_PAGINATION_PARAMETERS + [STREAM_PARAMETER, FIELDS_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -31,6 +47,7 @@ class ProductListView(APIView):
                             "updated_at": "2023-10-01T12:00:00Z"
                         }
                     ],
+                    "next": "eyJjcmVhdGVkX2F0IjoiMjAyMy0xMC0wMVQxMjowMDowMCswMDowMCIsImlkIjoxfQ",
                     "status": 200
                 }
             )
@@ -40,16 +57,7 @@ class ProductListView(APIView):
         """
         Lấy danh sách các Product (ai cũng có quyền xem).
         """
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(
-            {
-                "message": "Products retrieved successfully",
-                "data": serializer.data,
-                "status": status.HTTP_200_OK
-            },
-            status=status.HTTP_200_OK
-        )
+        return render(run(self.list_flow(request)), rest_response)
 
     @extend_schema(
         description="Create a new product. Only admins have permission to create products.",
@@ -74,35 +82,30 @@ class ProductListView(APIView):
         if serializer.is_valid():
             serializer.save()
             return Response(
-                {
-                    "message": "Product created successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_201_CREATED
-                },
+                saved_payload("Product created successfully", serializer, status.HTTP_201_CREATED),
                 status=status.HTTP_201_CREATED
             )
-        return Response(
-            {
-                "message": "Invalid data",
-                "errors": serializer.errors,
-                "status": status.HTTP_400_BAD_REQUEST
-            },
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
 
 class ProductDetailView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
     permission_classes = [IsAdminOrReadOnly]
+    max_queries = 5
 
-    def get_object(self, pk):
+    def get_object(self, pk, fields=None):
+        # updated_at cho ETag
+        queryset = object_queryset(Product.objects.all(), ProductSerializer, fields, columns=('updated_at',))
         try:
-            return Product.objects.get(pk=pk)
+            product = queryset.get(pk=pk)
         except Product.DoesNotExist:
             return None
+        self.check_object_permissions(self.request, product)
+        return product
 
     @extend_schema(
-        description="Retrieve details of a specific product. Anyone can view the details, but only admins can update or delete the product.",
-        responses={200: ProductSerializer},
+        description="Retrieve details of a specific product. Anyone can view the details, but only admins can update or delete the product. Supports conditional requests with If-None-Match / If-Modified-Since.",
+        responses={200: ProductSerializer, 304: None},
+        parameters=[FIELDS_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -125,24 +128,33 @@ class ProductDetailView(APIView):
         """
         Lấy thông tin chi tiết của một Product (ai cũng có quyền xem).
         """
-        product = self.get_object(pk)
-        if product:
-            serializer = ProductSerializer(product)
-            return Response(
-                {
-                    "message": "Product retrieved successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_200_OK
-                },
-                status=status.HTTP_200_OK
-            )
-        return Response(
-            {
-                "message": "Product not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
+        fields, _, error = parse_fields_and_includes(request, ProductSerializer)
+        if error is not None:
+            return Response(error, status=error['status'])
+        key = cache_key(request, catalog_version())
+        entry = get_cached(key)
+        if entry is None:
+            product = self.get_object(pk, fields)
+            if product is None:
+                return Response(not_found_payload("Product"), status=status.HTTP_404_NOT_FOUND)
+            etag, last_modified, response = object_conditional(request, product)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+            entry = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "payload": object_payload("Product retrieved successfully", product, ProductSerializer, fields)
+            }
+            set_cached(key, entry)
+            cache_status = 'MISS'
+        else:
+            response = conditional_response(request, entry['etag'], entry['last_modified'])
+            if response is not None:
+                return set_validators(response, entry['etag'], entry['last_modified'])
+            cache_status = 'HIT'
+        response = Response(entry['payload'], status=status.HTTP_200_OK)
+        response.headers['X-Cache'] = cache_status
+        return set_validators(response, entry['etag'], entry['last_modified'])
 
     @extend_schema(
         description="Update a specific product. Only admins have permission to update products.",
@@ -164,65 +176,315 @@ class ProductDetailView(APIView):
         Cập nhật thông tin của một Product (chỉ admin mới có quyền).
         """
         product = self.get_object(pk)
-        if product:
-            serializer = ProductSerializer(product, data=request.data, partial=True)
-            if serializer.is_valid():
-                serializer.save()
-                return Response(
-                    {
-                        "message": "Product updated successfully",
-                        "data": serializer.data,
-                        "status": status.HTTP_200_OK
+        if product is None:
+            return Response(not_found_payload("Product"), status=status.HTTP_404_NOT_FOUND)
+        serializer = ProductSerializer(product, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(saved_payload("Product updated successfully", serializer), status=status.HTTP_200_OK)
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(
+        description="Delete a specific product. Only admins have permission to delete products.",
+        responses={204: None},
+        examples=[
+            OpenApiExample(
+                name="Example Response",
+                value={
+                    "message": "Product deleted successfully",
+                    "status": 204
+                }
+            )
+        ]
+    )
+    def delete(self, request, pk):
+        """
+        Xóa một Product (chỉ admin mới có quyền).
+        """
+        product = self.get_object(pk)
+        if product is None:
+            return Response(not_found_payload("Product"), status=status.HTTP_404_NOT_FOUND)
+        product.delete()
+        return Response(
+            {"message": "Product deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status=status.HTTP_204_NO_CONTENT
+        )
+
+class ProductBulkView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdmin]
+    # Không khai báo max_queries: số query tăng theo số lô (API_BULK_BATCH_SIZE) của request
+
+    @extend_schema(
+        description=(
+            "Create, partially update and delete many products in one transaction. "
+            "Every item is validated first; if any item is invalid nothing is written and "
+            "the errors are reported per item, in the same order as the request. "
+            "Only admins have permission."
+        ),
+        request=OpenApiTypes.OBJECT,
+        responses={200: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                name="Example Request",
+                value={
+                    "create": [
+                        {"name": "Product C", "price": 300.0, "description": "This is Product C"}
+                    ],
+                    "update": [
+                        {"id": 1, "price": 120.0}
+                    ],
+                    "delete": [2, 3]
+                },
+                request_only=True
+            ),
+            OpenApiExample(
+                name="Example Response",
+                value={
+                    "message": "Products processed successfully",
+                    "data": {
+                        "created": [
+                            {
+                                "id": 4,
+                                "name": "Product C",
+                                "price": 300.0,
+                                "description": "This is Product C",
+                                "created_at": "2023-10-01T12:00:00Z",
+                                "updated_at": "2023-10-01T12:00:00Z"
+                            }
+                        ],
+                        "updated": [1],
+                        "deleted": [2, 3]
                     },
-                    status=status.HTTP_200_OK
-                )
+                    "status": 200
+                },
+                response_only=True
+            ),
+            OpenApiExample(
+                name="Example Error Response",
+                value={
+                    "message": "Invalid data",
+                    "errors": {
+                        "update": [
+                            {"id": ["Product not found."]}
+                        ]
+                    },
+                    "status": 400
+                },
+                response_only=True
+            )
+        ]
+    )
+    def post(self, request):
+        """
+        Tạo, cập nhật và xóa nhiều Product trong một transaction (chỉ admin mới có quyền).
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {
+                    "message": "Invalid data",
+                    "errors": "Expected an object with create, update and delete lists",
+                    "status": status.HTTP_400_BAD_REQUEST
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        create_data = request.data.get('create', [])
+        update_data = request.data.get('update', [])
+        delete_ids = request.data.get('delete', [])
+        if not all(isinstance(items, list) for items in (create_data, update_data, delete_ids)):
+            return Response(
+                {
+                    "message": "Invalid data",
+                    "errors": "create, update and delete must be lists",
+                    "status": status.HTTP_400_BAD_REQUEST
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(create_data) + len(update_data) + len(delete_ids) > settings.API_BULK_MAX_ITEMS:
+            return Response(
+                {
+                    "message": f"Too many items, the limit is {settings.API_BULK_MAX_ITEMS}",
+                    "status": status.HTTP_400_BAD_REQUEST
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        create_serializer = ProductSerializer(data=create_data, many=True)
+        update_serializer = ProductSerializer(data=update_data, many=True, partial=True)
+        errors = {}
+
+        create_valid = create_serializer.is_valid()
+        if not create_valid:
+            errors['create'] = create_serializer.errors
+
+        update_valid = update_serializer.is_valid()
+        update_errors = update_serializer.errors if not update_valid else [{} for _ in update_data]
+        update_ids = [item.get('id') if isinstance(item, dict) else None for item in update_data]
+        products = self.get_objects(update_ids)
+        self.check_ids(update_ids, products, update_errors)
+        if any(update_errors):
+            errors['update'] = update_errors
+
+        delete_errors = [{} for _ in delete_ids]
+        self.check_ids(delete_ids, self.get_objects(delete_ids), delete_errors)
+        if any(delete_errors):
+            errors['delete'] = delete_errors
+
+        if errors:
             return Response(
                 {
                     "message": "Invalid data",
-                    "errors": serializer.errors,
+                    "errors": errors,
                     "status": status.HTTP_400_BAD_REQUEST
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        batch_size = settings.API_BULK_BATCH_SIZE
+        with transaction.atomic(), bulk_write():
+            # bulk_create / bulk_update không gửi signal và các receiver theo từng dòng bị tắt khi
+            # xóa nên phải tự tăng version của catalog (cache và ETag danh sách), một lần sau commit
+            TableVersion.bump_on_commit(Product)
+            created = Product.objects.bulk_create(
+                [Product(**data) for data in create_serializer.validated_data],
+                batch_size=batch_size
+            )
+
+            # Chỉ ghi những Product và những cột thực sự thay đổi
+            changed, changed_fields = [], set()
+            now = timezone.now()
+            for pk, data in zip(update_ids, update_serializer.validated_data):
+                product = products[pk]
+                fields = {field for field, value in data.items() if getattr(product, field) != value}
+                if fields:
+                    for field in fields:
+                        setattr(product, field, data[field])
+                    product.updated_at = now
+                    changed.append(product)
+                    changed_fields |= fields
+            if changed:
+                Product.objects.bulk_update(
+                    changed, fields=sorted(changed_fields) + ['updated_at'], batch_size=batch_size
+                )
+
+            # Mỗi lô: một SELECT, một DELETE và một INSERT Tombstone, không phụ thuộc số dòng
+            for start in range(0, len(delete_ids), batch_size):
+                batch = delete_ids[start:start + batch_size]
+                Product.objects.filter(pk__in=batch).delete()
+                Tombstone.record_many(Product, batch)
+
         return Response(
             {
-                "message": "Product not found",
-                "status": status.HTTP_404_NOT_FOUND
+                "message": "Products processed successfully",
+                "data": {
+                    "created": ProductSerializer(created, many=True).data,
+                    "updated": [product.pk for product in changed],
+                    "deleted": delete_ids
+                },
+                "status": status.HTTP_200_OK
             },
-            status=status.HTTP_404_NOT_FOUND
+            status=status.HTTP_200_OK
         )
 
+    def get_objects(self, ids):
+        valid_ids = [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+        return Product.objects.in_bulk(valid_ids)
+
+    def check_ids(self, ids, products, errors):
+        seen = set()
+        for index, pk in enumerate(ids):
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                message = "A valid integer is required."
+            elif pk in seen:
+                message = "Duplicate id."
+            elif pk not in products:
+                message = "Product not found."
+            else:
+                seen.add(pk)
+                continue
+            errors[index].setdefault('id', []).append(message)
+
+
+class ProductSearchView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrReadOnly]
+    max_queries = 2
+
     @extend_schema(
-        description="Delete a specific product. Only admins have permission to delete products.",
-        responses={204: None},
+        description=(
+            "Full-text search on product name and description, ordered by relevance. "
+            "The last word is matched as a prefix, so the endpoint can be used for type-ahead; "
+            f"it must be at least {MIN_PREFIX_LENGTH} characters long, and results for a prefix of "
+            f"up to {SHORT_PREFIX_LENGTH} characters are ordered by id instead of relevance."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="Search text.",
+                required=True,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Maximum number of results (capped by the server).",
+                required=False,
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY
+            ),
+        ],
+        responses={200: ProductSerializer(many=True)},
         examples=[
             OpenApiExample(
                 name="Example Response",
                 value={
-                    "message": "Product deleted successfully",
-                    "status": 204
+                    "message": "Products retrieved successfully",
+                    "data": [
+                        {
+                            "id": 1,
+                            "name": "Product A",
+                            "price": 100.0,
+                            "description": "This is Product A",
+                            "created_at": "2023-10-01T12:00:00Z",
+                            "updated_at": "2023-10-01T12:00:00Z"
+                        }
+                    ],
+                    "status": 200
                 }
             )
         ]
     )
-    def delete(self, request, pk):
+    def get(self, request):
         """
-        Xóa một Product (chỉ admin mới có quyền).
+        Tìm kiếm Product theo tên và mô tả (ai cũng có quyền xem).
         """
-        product = self.get_object(pk)
-        if product:
-            product.delete()
+        query = request.query_params.get('q', '')
+        terms = search_terms(query)
+        if not terms:
+            return Response(
+                {"message": "Query parameter q is required", "status": status.HTTP_400_BAD_REQUEST},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(terms[-1]) < MIN_PREFIX_LENGTH:
             return Response(
                 {
-                    "message": "Product deleted successfully",
-                    "status": status.HTTP_204_NO_CONTENT
+                    "message": f"The last word of q must be at least {MIN_PREFIX_LENGTH} characters",
+                    "status": status.HTTP_400_BAD_REQUEST
                 },
-                status=status.HTTP_204_NO_CONTENT
+                status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            limit = int(request.query_params.get('limit', settings.API_PAGE_SIZE))
+        except ValueError:
+            limit = settings.API_PAGE_SIZE
+        limit = max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+        serializer = ProductSerializer(search_products(query, limit), many=True)
         return Response(
             {
-                "message": "Product not found",
-                "status": status.HTTP_404_NOT_FOUND
+                "message": "Products retrieved successfully",
+                "data": serializer.data,
+                "status": status.HTTP_200_OK
             },
-            status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+            status=status.HTTP_200_OK
+        )
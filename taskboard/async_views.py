@@ -0,0 +1,111 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from base.models import Task
+from .serializers import TaskSerializer, TASK_INCLUDES
+from .resources import TaskListResource
+from base.async_views import AsyncAPIView, asave_serializer, json_response
+from base.authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from base.conditional import set_validators
+from base.resources import (
+    object_queryset, object_conditional, object_payload, saved_payload,
+    error_payload, invalid_payload, not_found_payload, arun, render,
+)
+from base.serializers import parse_fields_and_includes, IncludedCollector
+from base.permissions import IsAdminOrAssignedEmployee
+
+# Bản async (ASGI, CRM/urls_async.py) của TaskListView / TaskDetailView: cùng tham số,
+# response và số query. TaskSerializer.is_valid() đọc Employee của assigned_to nên chạy
+# trong thread của ORM (sync_to_async).
+
+
+class AsyncTaskListView(TaskListResource, AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrAssignedEmployee]
+    max_queries = 4
+
+    async def get(self, request):
+        """
+        Lấy danh sách các Task.
+        """
+        return render(await arun(self.list_flow(request)), json_response)
+
+    async def post(self, request):
+        """
+        Tạo mới Task (chỉ admin mới có quyền).
+        """
+        if not request.user.is_staff:
+            return json_response(
+                error_payload("You do not have permission to create a task", status.HTTP_403_FORBIDDEN),
+                status.HTTP_403_FORBIDDEN
+            )
+        serializer = TaskSerializer(data=request.data)
+        if await sync_to_async(serializer.is_valid)():
+            await asave_serializer(serializer)
+            return json_response(
+                saved_payload("Task created successfully", serializer, status.HTTP_201_CREATED),
+                status.HTTP_201_CREATED
+            )
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrAssignedEmployee]
+    max_queries = 6
+
+    async def get_object(self, pk, fields=None, included=None):
+        # updated_at cho ETag, assigned_to cho kiểm tra quyền (IsAdminOrAssignedEmployee)
+        queryset = object_queryset(Task.objects.all(), TaskSerializer, fields, included, ('updated_at', 'assigned_to'))
+        try:
+            task = await queryset.aget(pk=pk)
+        except Task.DoesNotExist:
+            return None
+        await self.check_object_permissions(self.request, task)
+        return task
+
+    async def get(self, request, pk):
+        """
+        Lấy thông tin chi tiết của một Task.
+        """
+        fields, includes, error = parse_fields_and_includes(request, TaskSerializer, TASK_INCLUDES)
+        if error is not None:
+            return json_response(error, error['status'])
+        included = IncludedCollector(includes, TASK_INCLUDES) if includes else None
+        task = await self.get_object(pk, fields, included)
+        if task is None:
+            return json_response(not_found_payload("Task"), status.HTTP_404_NOT_FOUND)
+        etag, last_modified, response = object_conditional(request, task, included)
+        if response is None:
+            response = json_response(object_payload("Task retrieved successfully", task, TaskSerializer, fields, included))
+        return set_validators(response, etag, last_modified)
+
+    async def put(self, request, pk):
+        """
+        Cập nhật thông tin của một Task (chỉ admin hoặc nhân viên được phân công mới có quyền).
+        """
+        task = await self.get_object(pk)
+        if task is None:
+            return json_response(not_found_payload("Task"), status.HTTP_404_NOT_FOUND)
+        serializer = TaskSerializer(task, data=request.data, partial=True)
+        if await sync_to_async(serializer.is_valid)():
+            await asave_serializer(serializer)
+            return json_response(saved_payload("Task updated successfully", serializer))
+        return json_response(invalid_payload(serializer.errors), status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, pk):
+        """
+        Xóa một Task (chỉ admin mới có quyền).
+        """
+        if not request.user.is_staff:
+            return json_response(
+                error_payload("You do not have permission to delete a task", status.HTTP_403_FORBIDDEN),
+                status.HTTP_403_FORBIDDEN
+            )
+        task = await self.get_object(pk)
+        if task is None:
+            return json_response(not_found_payload("Task"), status.HTTP_404_NOT_FOUND)
+        await task.adelete()
+        return json_response(
+            {"message": "Task deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status.HTTP_204_NO_CONTENT
+        )
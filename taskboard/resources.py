@@ -0,0 +1,64 @@
+"""
+Flow của API danh sách Task (base.resources), dùng chung cho TaskListView (sync) và
+AsyncTaskListView (async, CRM/urls_async.py).
+"""
+from django.utils import timezone
+
+from base.conditional import list_validators, alist_validators, conditional_response, set_validators
+from base.models import Employee, Task
+from base.resources import ListPage, Step, Result, invalid_payload
+from base.serializers import parse_fields_and_includes, IncludedCollector
+from base.streaming import stream_list_response, astream_list_response, wants_stream
+from base.sync import delta_payload, adelta_payload
+from .serializers import TaskSerializer, TaskFilterSerializer, TASK_INCLUDES
+
+
+class TaskListResource:
+
+    def list_flow(self, request):
+        """
+        GET danh sách Task: admin thấy mọi Task, nhân viên chỉ thấy Task được phân công cho mình.
+        """
+        filters = TaskFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Result(invalid_payload(filters.errors, "Invalid filters"))
+        fields, includes, error = parse_fields_and_includes(request, TaskSerializer, TASK_INCLUDES)
+        if error is not None:
+            return Result(error)
+        included = IncludedCollector(includes, TASK_INCLUDES) if includes else None
+        started = timezone.now()
+        since = filters.validated_data.get('updated_since')
+        ordering = filters.get_ordering()
+        # Các Task người dùng thấy được (chưa lọc), cùng scope của ETag và Tombstone
+        if request.user.is_staff:
+            visible, scope = Task.objects.all(), None
+        else:
+            # Lọc trực tiếp theo assigned_to_id để query chỉ đọc bảng task
+            employee_id = yield Step(Employee.id_for_user, Employee.aid_for_user, request.user)
+            visible, scope = Task.objects.filter(assigned_to_id=employee_id), Task.assignee_scope(employee_id)
+        tasks = filters.filter_queryset(visible)
+        if included is None and since is None:
+            etag, last_modified = yield Step(list_validators, alist_validators, request, Task, scope or 'all')
+            response = conditional_response(request, etag, last_modified)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+        else:
+            # Employee/User trong "included" không có updated_at, id đã bị xóa (Tombstone) không
+            # nằm trong aggregate: không tính được ETag
+            etag, last_modified = None, None
+        # Đồng bộ (updated_since) luôn phân trang: "deleted" và "sync_token" nằm ở trang cuối
+        if wants_stream(request) and since is None:
+            response = yield Step(
+                stream_list_response, astream_list_response,
+                tasks.order_by(*ordering), TaskSerializer, "Tasks retrieved successfully", fields, included
+            )
+            return set_validators(response, etag, last_modified)
+        page = ListPage(tasks, TaskSerializer, ordering, fields, included)
+        rows, error = yield Step(page.fetch, page.afetch, request)
+        if error is not None:
+            return Result(error)
+        delta = None
+        if since is not None:
+            # "deleted" chỉ gồm các Task người dùng từng thấy và không còn thấy
+            delta = yield Step(delta_payload, adelta_payload, Task, since, started, page.next_cursor, scope, visible)
+        return Result(page.payload("Tasks retrieved successfully", rows, delta), etag, last_modified)
@@ -1,7 +1,67 @@
 from rest_framework import serializers
+from base.serializers import DynamicFieldsMixin
+from base.sync import UpdatedSinceFilter
+from account.serializers import UserSerializer
+from employee.serializers import EmployeeSerializer
 from base.models import Task
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'assigned_to', 'due_date', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+# ?include= : đường dẫn quan hệ -> (tên nhóm trong "included", serializer)
+TASK_INCLUDES = {
+    'assigned_to': ('employees', EmployeeSerializer),
+    'assigned_to.user': ('users', UserSerializer),
+}
+
+
+class TaskFilterSerializer(UpdatedSinceFilter):
+    """
+    Validate query params lọc danh sách Task.
+    Các điều kiện dùng được index (assigned_to, status, due_date) của Task.
+    """
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    assigned_to = serializers.IntegerField(required=False)
+    due_before = serializers.DateField(required=False)
+    due_after = serializers.DateField(required=False)
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'updated_since' in data:
+            queryset = queryset.filter(updated_at__gt=data['updated_since'])
+        if 'assigned_to' in data:
+            queryset = queryset.filter(assigned_to_id=data['assigned_to'])
+        if 'status' in data:
+            queryset = queryset.filter(status=data['status'])
+        if 'due_before' in data:
+            queryset = queryset.filter(due_date__lte=data['due_before'])
+        if 'due_after' in data:
+            queryset = queryset.filter(due_date__gte=data['due_after'])
+        return queryset
+
+    def get_ordering(self):
+        """
+        Thứ tự cho keyset pagination: theo thời điểm tạo, hoặc theo thời điểm thay đổi khi đồng bộ (updated_since).
+        """
+        if 'updated_since' in self.validated_data:
+            return ('updated_at', 'id')
+        return ('created_at', 'id')
+
+
+class TaskBoardFilterSerializer(TaskFilterSerializer):
+    """
+    Query params của bảng Kanban: các bộ lọc của danh sách Task, số Task tối đa
+    trong mỗi cột và tùy chọn đếm theo nhân viên.
+    """
+    # Bảng Kanban không đồng bộ từng phần (không có "deleted" / "sync_token")
+    updated_since = None
+    per_column = serializers.IntegerField(required=False, default=10, min_value=0, max_value=100)
+    by_employee = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        if 'updated_since' in self.initial_data:
+            raise serializers.ValidationError({"updated_since": ["Not supported by the task board."]})
+        return attrs
@@ -1,3 +1,224 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from base.models import Task, Tombstone
+from base.testing import bearer, create_user
+
+
+class TaskObjectPermissionTests(TestCase):
+    """
+    Nhân viên chỉ đọc / sửa được Task được phân công cho mình, kể cả khi dùng ?fields=
+    (cột assigned_to không được yêu cầu) hoặc ?include=.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.owner = create_user('owner', 'employee')
+        cls.other = create_user('other', 'employee')
+        cls.customer = create_user('customer', 'customer')
+        cls.task = Task.objects.create(
+            title='Task A', description='Task', due_date=datetime.date(2030, 1, 1),
+            assigned_to=cls.owner.employee_profile
+        )
+        cls.url = f'/api/tasks/{cls.task.pk}/'
+
+    def get(self, user, **params):
+        return self.client.get(self.url, params, **bearer(user))
+
+    def put(self, user, body):
+        return self.client.put(self.url, body, content_type='application/json', **bearer(user))
+
+    def test_read(self):
+        for params in ({}, {'fields': 'id,title'}, {'include': 'assigned_to.user'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(self.owner, **params).status_code, 200)
+                self.assertEqual(self.get(self.admin, **params).status_code, 200)
+                self.assertEqual(self.get(self.other, **params).status_code, 403)
+                self.assertEqual(self.get(self.customer, **params).status_code, 403)
+
+    def test_update(self):
+        for user in (self.other, self.customer):
+            with self.subTest(user=user.username):
+                self.assertEqual(self.put(user, {'status': 'done'}).status_code, 403)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'todo')
+        response = self.put(self.owner, {'status': 'in_progress'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['status'], 'in_progress')
+
+    def test_delete(self):
+        for user in (self.owner, self.other):
+            with self.subTest(user=user.username):
+                self.assertEqual(self.client.delete(self.url, **bearer(user)).status_code, 403)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertEqual(self.client.delete(self.url, **bearer(self.admin)).status_code, 204)
+
+    def test_not_found(self):
+        response = self.client.get('/api/tasks/0/', **bearer(self.other))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"message": "Task not found", "status": 404})
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async')
+class AsyncTaskObjectPermissionTests(TaskObjectPermissionTests):
+    # Cùng các trường hợp với view async (AsyncTaskDetailView)
+    pass
+
+
+class TaskSyncTests(TestCase):
+    """
+    ?updated_since=: "deleted" chỉ gồm các Task người dùng từng thấy và không còn thấy.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.owner = create_user('owner', 'employee')
+        cls.other = create_user('other', 'employee')
+        cls.tasks = [
+            Task.objects.create(
+                title=f'Task {index}', description='Task', due_date=datetime.date(2030, 1, 1),
+                assigned_to=user.employee_profile
+            )
+            for index, user in enumerate((cls.owner, cls.owner, cls.other))
+        ]
+
+    def setUp(self):
+        since = timezone.now() - datetime.timedelta(minutes=1)
+        self.since = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def sync(self, user):
+        response = self.client.get('/api/tasks/', {'updated_since': self.since}, **bearer(user))
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        return [task['id'] for task in body['data']], body['deleted']
+
+    def admin_request(self, method, url, body=None):
+        response = getattr(self.client, method)(url, body, content_type='application/json', **bearer(self.admin))
+        self.assertIn(response.status_code, (200, 204), response.content)
+
+    def reassign(self, task, user):
+        self.admin_request('put', f'/api/tasks/{task.pk}/', {'assigned_to': user.employee_profile.pk})
+
+    def test_delete(self):
+        task = self.tasks[0]
+        self.admin_request('delete', f'/api/tasks/{task.pk}/')
+        self.assertEqual(self.sync(self.owner), ([self.tasks[1].pk], [task.pk]))
+        # Nhân viên khác không nhận id của Task không thuộc về mình
+        self.assertEqual(self.sync(self.other), ([self.tasks[2].pk], []))
+        self.assertEqual(self.sync(self.admin)[1], [task.pk])
+
+    def test_reassign(self):
+        task = self.tasks[0]
+        self.reassign(task, self.other)
+        self.assertEqual(self.sync(self.owner), ([self.tasks[1].pk], [task.pk]))
+        data, deleted = self.sync(self.other)
+        self.assertCountEqual(data, [task.pk, self.tasks[2].pk])
+        self.assertEqual(deleted, [])
+        # Task vẫn tồn tại: admin không nhận id trong "deleted"
+        data, deleted = self.sync(self.admin)
+        self.assertIn(task.pk, data)
+        self.assertEqual(deleted, [])
+
+    def test_reassign_back(self):
+        task = self.tasks[0]
+        self.reassign(task, self.other)
+        self.reassign(task, self.owner)
+        data, deleted = self.sync(self.owner)
+        self.assertCountEqual(data, [task.pk, self.tasks[1].pk])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync(self.other), ([self.tasks[2].pk], [task.pk]))
+
+    def test_reassign_then_delete(self):
+        task = self.tasks[0]
+        self.reassign(task, self.other)
+        self.admin_request('delete', f'/api/tasks/{task.pk}/')
+        self.assertEqual(self.sync(self.owner)[1], [task.pk])
+        self.assertEqual(self.sync(self.other)[1], [task.pk])
+        self.assertEqual(self.sync(self.admin)[1], [task.pk])
+
+    def test_soft_delete_employee(self):
+        employee = self.other.employee_profile
+        self.admin_request('delete', f'/api/employees/{employee.pk}/')
+        # Danh sách profile không đồng bộ theo updated_since: không ghi Tombstone
+        self.assertFalse(Tombstone.objects.filter(model='base.employee').exists())
+        # Xóa mềm nhân viên không xóa Task của họ
+        data, deleted = self.sync(self.admin)
+        self.assertCountEqual(data, [task.pk for task in self.tasks])
+        self.assertEqual(deleted, [])
+
+
+@override_settings(ROOT_URLCONF='CRM.urls_async')
+class AsyncTaskSyncTests(TaskSyncTests):
+    # Cùng các trường hợp với view async (AsyncTaskListView, AsyncTaskDetailView)
+    pass
+
+
+class TaskBoardViewTests(TestCase):
+    url = '/api/tasks/board/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'admin')
+        cls.employee = create_user('employee', 'employee').employee_profile
+        cls.other = create_user('other', 'employee').employee_profile
+        # employee: 5 todo (hạn giảm dần) và 2 in_progress; other: 3 todo
+        tasks = [('todo', cls.employee, day) for day in range(5, 0, -1)]
+        tasks += [('in_progress', cls.employee, day) for day in (1, 2)]
+        tasks += [('todo', cls.other, day) for day in (3, 3, 9)]
+        Task.objects.bulk_create([
+            Task(
+                title=f'Task {index}', description='Task', status=task_status, assigned_to=employee,
+                due_date=datetime.date(2030, 1, day)
+            )
+            for index, (task_status, employee, day) in enumerate(tasks)
+        ])
+
+    def board(self, user, **params):
+        response = self.client.get(self.url, params, **bearer(user))
+        self.assertEqual(response.status_code, 200, response.content)
+        return {column['status']: column for column in response.json()['data']}
+
+    def test_counts(self):
+        board = self.board(self.admin, by_employee=True)
+        self.assertEqual(list(board), ['todo', 'in_progress', 'done'])
+        self.assertEqual({name: column['count'] for name, column in board.items()}, {
+            'todo': 8, 'in_progress': 2, 'done': 0
+        })
+        self.assertEqual(board['todo']['by_employee'], [
+            {'assigned_to': self.employee.pk, 'count': 5}, {'assigned_to': self.other.pk, 'count': 3}
+        ])
+        self.assertEqual(board['done']['tasks'], [])
+        # Nhân viên chỉ thấy Task của mình; by_employee chỉ có khi được yêu cầu
+        board = self.board(self.employee.user)
+        self.assertEqual({name: column['count'] for name, column in board.items()}, {
+            'todo': 5, 'in_progress': 2, 'done': 0
+        })
+        self.assertNotIn('by_employee', board['todo'])
+        self.assertEqual(self.board(self.admin, assigned_to=self.other.pk)['todo']['count'], 3)
+
+    def test_per_column(self):
+        board = self.board(self.admin, per_column=3)
+        # N Task đầu mỗi cột theo hạn rồi theo id; count vẫn là tổng của cột
+        todo = Task.objects.filter(status='todo').order_by('due_date', 'id')[:3]
+        self.assertEqual([task['id'] for task in board['todo']['tasks']], [task.pk for task in todo])
+        self.assertEqual(board['todo']['count'], 8)
+        self.assertEqual(len(board['in_progress']['tasks']), 2)
+        self.assertEqual(len(self.board(self.admin)['todo']['tasks']), 8)
+        board = self.board(self.admin, per_column=0)
+        self.assertEqual([column['tasks'] for column in board.values()], [[], [], []])
+        self.assertEqual(board['todo']['count'], 8)
+        for per_column in (-1, 101, 'x'):
+            with self.subTest(per_column=per_column):
+                response = self.client.get(self.url, {'per_column': per_column}, **bearer(self.admin))
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('per_column', response.json()['errors'])
+
+    def test_updated_since_is_rejected(self):
+        # Bảng Kanban không có "deleted" / "sync_token": không đồng bộ từng phần được
+        response = self.client.get(self.url, {'updated_since': timezone.now().isoformat()}, **bearer(self.admin))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('updated_since', response.json()['errors'])
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import TaskListView, TaskDetailView
+from .views import TaskListView, TaskDetailView, TaskBoardView
 
 urlpatterns = [
     path('tasks/', TaskListView.as_view(), name='task-list'),
+    path('tasks/board/', TaskBoardView.as_view(), name='task-board'),
     path('tasks/<int:pk>/', TaskDetailView.as_view(), name='task-detail'),
 ]
\ No newline at end of file
@@ -1,21 +1,33 @@
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from base.models import Task
-from .serializers import TaskSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.authentication import BasicAuthentication
+from base.models import Employee, Task
+from .serializers import TaskSerializer, TaskFilterSerializer, TaskBoardFilterSerializer, TASK_INCLUDES
+from .resources import TaskListResource
+from base.authentication import ClaimsJWTAuthentication, CachedBasicAuthentication
+from base.conditional import set_validators
+from base.resources import (
+    object_queryset, object_conditional, object_payload, saved_payload,
+    error_payload, invalid_payload, not_found_payload, run, render, rest_response,
+)
+from base.serializers import parse_fields_and_includes, IncludedCollector, FIELDS_PARAMETER, INCLUDE_PARAMETER
+from base.pagination import KEYSET_PAGINATION_PARAMETERS
+from base.streaming import STREAM_PARAMETER
 from base.permissions import IsAdminOrAssignedEmployee, IsAdmin
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
-class TaskListView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
+class TaskListView(TaskListResource, APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
     permission_classes = [IsAdminOrAssignedEmployee]
+    max_queries = 4
 
     @extend_schema(
-        description="Retrieve a list of tasks. Admins can see all tasks, while employees can only see tasks assigned to them.",
-        responses={200: TaskSerializer(many=True)},
+        description="Retrieve a list of tasks, optionally filtered by status, assignee and due date. Admins can see all tasks, while employees can only see tasks assigned to them. Supports conditional requests with If-None-Match / If-Modified-Since (not when `include` is used).",
+        responses={200: TaskSerializer(many=True), 304: None},
+        parameters=[TaskFilterSerializer] + KEYSET_PAGINATION_PARAMETERS + [STREAM_PARAMETER, FIELDS_PARAMETER, INCLUDE_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -33,6 +45,7 @@ class TaskListView(APIView):
                             "updated_at": "2023-10-01T12:00:00Z"
                         }
                     ],
+                    "next": "eyJjcmVhdGVkX2F0IjoiMjAyMy0xMC0wMVQxMjowMDowMCswMDowMCIsImlkIjoxfQ",
                     "status": 200
                 }
             )
@@ -42,19 +55,7 @@ class TaskListView(APIView):
         """
         Lấy danh sách các Task.
         """
-        if request.user.is_staff:
-            tasks = Task.objects.all()
-        else:
-            tasks = Task.objects.filter(assigned_to__user=request.user)
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(
-            {
-                "message": "Tasks retrieved successfully",
-                "data": serializer.data,
-                "status": status.HTTP_200_OK
-            },
-            status=status.HTTP_200_OK
-        )
+        return render(run(self.list_flow(request)), rest_response)
 
     @extend_schema(
         description="Create a new task. Only admins have permission to create tasks.",
@@ -79,42 +80,37 @@ class TaskListView(APIView):
         """
         if not request.user.is_staff:
             return Response(
-                {"message": "You do not have permission to create a task", "status": status.HTTP_403_FORBIDDEN},
+                error_payload("You do not have permission to create a task", status.HTTP_403_FORBIDDEN),
                 status=status.HTTP_403_FORBIDDEN
             )
         serializer = TaskSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
             return Response(
-                {
-                    "message": "Task created successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_201_CREATED
-                },
+                saved_payload("Task created successfully", serializer, status.HTTP_201_CREATED),
                 status=status.HTTP_201_CREATED
             )
-        return Response(
-            {
-                "message": "Invalid data",
-                "errors": serializer.errors,
-                "status": status.HTTP_400_BAD_REQUEST
-            },
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
 
 class TaskDetailView(APIView):
-    authentication_classes = [JWTAuthentication, BasicAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
     permission_classes = [IsAdminOrAssignedEmployee]
+    max_queries = 6
 
-    def get_object(self, pk):
+    def get_object(self, pk, fields=None, included=None):
+        # updated_at cho ETag, assigned_to cho kiểm tra quyền (IsAdminOrAssignedEmployee)
+        queryset = object_queryset(Task.objects.all(), TaskSerializer, fields, included, ('updated_at', 'assigned_to'))
         try:
-            return Task.objects.get(pk=pk)
+            task = queryset.get(pk=pk)
         except Task.DoesNotExist:
             return None
+        self.check_object_permissions(self.request, task)
+        return task
 
     @extend_schema(
-        description="Retrieve details of a specific task.",
-        responses={200: TaskSerializer},
+        description="Retrieve details of a specific task. Supports conditional requests with If-None-Match / If-Modified-Since (not when `include` is used).",
+        responses={200: TaskSerializer, 304: None},
+        parameters=[FIELDS_PARAMETER, INCLUDE_PARAMETER],
         examples=[
             OpenApiExample(
                 name="Example Response",
@@ -139,24 +135,18 @@ class TaskDetailView(APIView):
         """
         Lấy thông tin chi tiết của một Task.
         """
-        task = self.get_object(pk)
-        if task:
-            serializer = TaskSerializer(task)
-            return Response(
-                {
-                    "message": "Task retrieved successfully",
-                    "data": serializer.data,
-                    "status": status.HTTP_200_OK
-                },
-                status=status.HTTP_200_OK
-            )
-        return Response(
-            {
-                "message": "Task not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
+        fields, includes, error = parse_fields_and_includes(request, TaskSerializer, TASK_INCLUDES)
+        if error is not None:
+            return Response(error, status=error['status'])
+        included = IncludedCollector(includes, TASK_INCLUDES) if includes else None
+        task = self.get_object(pk, fields, included)
+        if task is None:
+            return Response(not_found_payload("Task"), status=status.HTTP_404_NOT_FOUND)
+        etag, last_modified, response = object_conditional(request, task, included)
+        if response is None:
+            payload = object_payload("Task retrieved successfully", task, TaskSerializer, fields, included)
+            response = Response(payload, status=status.HTTP_200_OK)
+        return set_validators(response, etag, last_modified)
 
     @extend_schema(
         description="Update a specific task. Only admins or assigned employees have permission to update tasks.",
@@ -178,33 +168,13 @@ class TaskDetailView(APIView):
         Cập nhật thông tin của một Task (chỉ admin hoặc nhân viên được phân công mới có quyền).
         """
         task = self.get_object(pk)
-        if task:
-            serializer = TaskSerializer(task, data=request.data, partial=True)
-            if serializer.is_valid():
-                serializer.save()
-                return Response(
-                    {
-                        "message": "Task updated successfully",
-                        "data": serializer.data,
-                        "status": status.HTTP_200_OK
-                    },
-                    status=status.HTTP_200_OK
-                )
-            return Response(
-                {
-                    "message": "Invalid data",
-                    "errors": serializer.errors,
-                    "status": status.HTTP_400_BAD_REQUEST
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return Response(
-            {
-                "message": "Task not found",
-                "status": status.HTTP_404_NOT_FOUND
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
+        if task is None:
+            return Response(not_found_payload("Task"), status=status.HTTP_404_NOT_FOUND)
+        serializer = TaskSerializer(task, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(saved_payload("Task updated successfully", serializer), status=status.HTTP_200_OK)
+        return Response(invalid_payload(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
         description="Delete a specific task. Only admins have permission to delete tasks.",
@@ -225,23 +195,106 @@ class TaskDetailView(APIView):
         """
         if not request.user.is_staff:
             return Response(
-                {"message": "You do not have permission to delete a task", "status": status.HTTP_403_FORBIDDEN},
+                error_payload("You do not have permission to delete a task", status.HTTP_403_FORBIDDEN),
                 status=status.HTTP_403_FORBIDDEN
             )
         task = self.get_object(pk)
-        if task:
-            task.delete()
-            return Response(
-                {
-                    "message": "Task deleted successfully",
-                    "status": status.HTTP_204_NO_CONTENT
-                },
-                status=status.HTTP_204_NO_CONTENT
+        if task is None:
+            return Response(not_found_payload("Task"), status=status.HTTP_404_NOT_FOUND)
+        task.delete()
+        return Response(
+            {"message": "Task deleted successfully", "status": status.HTTP_204_NO_CONTENT},
+            status=status.HTTP_204_NO_CONTENT
+        )
+
+class TaskBoardView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication, CachedBasicAuthentication]
+    permission_classes = [IsAdminOrAssignedEmployee]
+    max_queries = 4
+
+    @extend_schema(
+        description=(
+            "Retrieve the Kanban board: for every status, the number of tasks (optionally per employee) "
+            "and the first tasks of the column ordered by due date. "
+            "Admins see all tasks, while employees only see tasks assigned to them."
+        ),
+        parameters=[TaskBoardFilterSerializer],
+        responses={200: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                name="Example Response",
+                value={
+                    "message": "Task board retrieved successfully",
+                    "data": [
+                        {
+                            "status": "todo",
+                            "label": "To Do",
+                            "count": 2,
+                            "by_employee": [
+                                {"assigned_to": 1, "count": 2}
+                            ],
+                            "tasks": [
+                                {
+                                    "id": 1,
+                                    "title": "Fix bug",
+                                    "description": "Fix the bug in the login module",
+                                    "status": "todo",
+                                    "assigned_to": 1,
+                                    "due_date": "2023-12-31",
+                                    "created_at": "2023-10-01T12:00:00Z",
+                                    "updated_at": "2023-10-01T12:00:00Z"
+                                }
+                            ]
+                        }
+                    ],
+                    "status": 200
+                }
+            )
+        ]
+    )
+    def get(self, request):
+        """
+        Lấy bảng Kanban: số lượng Task theo trạng thái (và theo nhân viên) cùng các Task đầu tiên của mỗi cột.
+        Chỉ dùng 2 query: một GROUP BY status, assigned_to và một query window lấy N Task đầu mỗi cột.
+        """
+        filters = TaskBoardFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(invalid_payload(filters.errors, "Invalid filters"), status=status.HTTP_400_BAD_REQUEST)
+        if request.user.is_staff:
+            tasks = Task.objects.all()
+        else:
+            tasks = Task.objects.filter(assigned_to_id=Employee.id_for_user(request.user))
+        tasks = filters.filter_queryset(tasks)
+
+        columns = {
+            value: {"status": value, "label": label, "count": 0, "by_employee": [], "tasks": []}
+            for value, label in Task.STATUS_CHOICES
+        }
+        counts = tasks.values('status', 'assigned_to').annotate(count=Count('id')).order_by('status', 'assigned_to')
+        for row in counts:
+            column = columns[row['status']]
+            column['count'] += row['count']
+            column['by_employee'].append({"assigned_to": row['assigned_to'], "count": row['count']})
+
+        per_column = filters.validated_data['per_column']
+        if per_column:
+            position = Window(
+                RowNumber(),
+                partition_by=[F('status')],
+                order_by=[F('due_date').asc(), F('id').asc()]
             )
+            top_tasks = tasks.annotate(position=position).filter(position__lte=per_column)
+            for task in TaskSerializer(top_tasks.order_by('status', 'position'), many=True).data:
+                columns[task['status']]['tasks'].append(task)
+
+        if not filters.validated_data['by_employee']:
+            for column in columns.values():
+                del column['by_employee']
         return Response(
             {
-                "message": "Task not found",
-                "status": status.HTTP_404_NOT_FOUND
+                "message": "Task board retrieved successfully",
+                "data": list(columns.values()),
+                "status": status.HTTP_200_OK
             },
-            status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+            status=status.HTTP_200_OK
+        )